@@ -0,0 +1,189 @@
+import re  # 导入re库，用于合并空白字符
+import threading  # 导入threading库，用于按主机限制并发
+import time  # 导入time库，用于限制单个页面的总下载时间
+from concurrent.futures import ThreadPoolExecutor  # 导入线程池用于并发获取文章
+from html.parser import HTMLParser  # 导入标准库 HTML 解析器
+from urllib.parse import urlsplit  # 导入URL解析函数，用于按主机区分
+from http_cache import HTTPCache  # 导入磁盘 LRU 缓存
+from http_transport import HTTPTransport  # 导入共享的 HTTP 传输层
+from logger import LOG  # 导入日志模块
+
+SKIP_TAGS = {'script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'svg', 'template'}
+TEXT_TAGS = {'p', 'h1', 'h2', 'h3', 'li', 'pre', 'blockquote'}  # 正文通常所在的标签
+SKIP_HOSTS = {'news.ycombinator.com'}  # Ask HN 等讨论页没有外部文章
+WHITESPACE = re.compile(r'\s+')
+CHUNK_SIZE = 16 * 1024
+
+
+class _TextExtractor(HTMLParser):
+    """
+    轻量的正文提取：跳过脚本、导航、页眉页脚等标签，收集段落、标题、列表等标签内的文本。
+    页面没有这些标签时退回到所有可见文本。
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = []  # 正文标签中的文本块
+        self.fallback = []  # 所有可见文本
+        self.title = []
+        self._skip_depth = 0
+        self._block_depth = 0
+        self._in_title = False
+        self._current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == 'title':
+            self._in_title = True
+        elif tag in TEXT_TAGS:
+            self._block_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == 'title':
+            self._in_title = False
+        elif tag in TEXT_TAGS and self._block_depth:
+            self._block_depth -= 1
+            if not self._block_depth:
+                self._flush()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title.append(data)
+        elif not self._skip_depth:
+            self.fallback.append(data)
+            if self._block_depth:
+                self._current.append(data)
+
+    def _flush(self):
+        text = WHITESPACE.sub(' ', ''.join(self._current)).strip()
+        if text:
+            self.blocks.append(text)
+        self._current = []
+
+
+def extract_text(html_content, max_chars=2000):
+    """
+    从 HTML 中提取正文，合并空白后截断为 max_chars 个字符。
+    """
+    extractor = _TextExtractor()
+    extractor.feed(html_content)
+    extractor.close()
+    text = ' '.join(extractor.blocks) or WHITESPACE.sub(' ', ''.join(extractor.fallback)).strip()
+    return text[:max_chars]
+
+
+class ArticleFetcher:
+    def __init__(self, transport=None, cache=None, max_workers=8, per_host_limit=2, max_bytes=512 * 1024,
+                 timeout=10, max_chars=1000):
+        """
+        初始化文章获取器：并发获取新闻链接的页面并提取正文，结果按 URL 保存在磁盘 LRU 缓存中，
+        同一篇文章在一天内的多次快照中只获取一次（获取失败的链接同样缓存为空文本，不会反复重试）。
+
+        :param transport: 可选的共享 HTTPTransport 实例。
+        :param cache: 可选的 HTTPCache 实例，为空时只在本次调用中去重。
+        :param max_workers: 最大并发请求数。
+        :param per_host_limit: 每个主机的最大并发请求数。
+        :param max_bytes: 每个页面最多下载的字节数，超出部分丢弃。
+        :param timeout: 每个页面的超时时间（秒），同时用作连接、读取超时和总下载时间上限。
+        :param max_chars: 提取的正文最多保留的字符数。
+        """
+        self.transport = transport or HTTPTransport()
+        self.cache = cache
+        self.max_workers = max(1, max_workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.max_chars = max_chars
+        self._host_slots = {}  # 主机 -> 信号量
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, transport=None):
+        """
+        根据配置对象创建 ArticleFetcher 实例。
+        """
+        cache = HTTPCache(config.hn_article_cache_dir) if config.hn_article_cache_dir else None
+        return cls(transport, cache, max_workers=config.hn_article_max_workers,
+                   per_host_limit=config.hn_article_per_host_limit, max_bytes=config.hn_article_max_bytes,
+                   timeout=config.hn_article_timeout, max_chars=config.hn_article_max_chars)
+
+    def enrich(self, stories):
+        """
+        为新闻补充 'excerpt' 字段（文章正文摘录），无法获取时为空字符串。
+        """
+        texts = self.fetch_many(story.get('link') for story in stories)
+        for story in stories:
+            story['excerpt'] = texts.get(story.get('link'), '')
+        return stories
+
+    def fetch_many(self, urls):
+        """
+        并发获取多个链接的正文，返回 URL 到正文的字典；无需获取的链接（如 HN 讨论页）会被忽略。
+        """
+        urls = list(dict.fromkeys(url for url in urls if self._should_fetch(url)))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            texts = dict(zip(urls, executor.map(self.fetch, urls)))
+        if self.cache:
+            LOG.debug(f"文章缓存统计：{self.cache.stats()}")
+        return texts
+
+    def fetch(self, url):
+        """
+        获取单个链接的正文，优先使用缓存。
+        """
+        key = HTTPCache.make_key(url)
+        if self.cache:
+            entry = self.cache.get(key)
+            if entry is not None:
+                self.cache.record_hit()
+                return entry['text']
+            self.cache.record_miss()
+
+        with self._host_slot(url):
+            text = self._download(url)
+        if self.cache:
+            self.cache.put(key, {'url': url, 'text': text})
+        return text
+
+    def _download(self, url):
+        # 以流式读取页面，超过字节上限或总时间上限时停止；非 HTML/文本内容和请求失败均返回空字符串
+        deadline = time.monotonic() + self.timeout
+        try:
+            response = self.transport.get(url, stream=True, timeout=(self.timeout, self.timeout))
+            with response:
+                content_type = response.headers.get('Content-Type', '')
+                if response.status_code >= 400 or not content_type.startswith(('text/html', 'text/plain')):
+                    LOG.debug(f"跳过文章 {url}：状态码 {response.status_code}，类型 {content_type}")
+                    return ''
+                chunks, size = [], 0
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.max_bytes or time.monotonic() > deadline:
+                        break
+                encoding = response.encoding if 'charset=' in content_type.lower() else 'utf-8'
+                body = b''.join(chunks)[:self.max_bytes].decode(encoding or 'utf-8', errors='replace')
+        except Exception as e:
+            LOG.warning(f"获取文章 {url} 失败：{str(e)}")
+            return ''
+        if content_type.startswith('text/plain'):
+            return WHITESPACE.sub(' ', body).strip()[:self.max_chars]
+        return extract_text(body, self.max_chars)
+
+    def _should_fetch(self, url):
+        if not url:
+            return False
+        parts = urlsplit(url)
+        return parts.scheme in ('http', 'https') and parts.hostname not in SKIP_HOSTS
+
+    def _host_slot(self, url):
+        # 获取（必要时创建）对应主机的信号量
+        host = urlsplit(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return slot
@@ -0,0 +1,196 @@
+import asyncio  # 导入asyncio库，在单个事件循环中并发请求
+from datetime import datetime  # 导入日期处理模块
+
+import httpx  # 导入httpx库，提供异步HTTP请求
+
+from github_client import GitHubClient, MAX_RATE_LIMIT_RETRIES
+from time_utils import parse_time, date_range  # 导入时间解析函数
+from logger import LOG  # 导入日志模块
+
+
+class AsyncGitHubClient:
+    def __init__(self, client):
+        """
+        基于 httpx.AsyncClient 的 GitHub 客户端，方法名与 GitHubClient 相同但均为协程，
+        可以在一个事件循环中并发获取大量仓库，而不需要为每个请求占用一个线程。
+        请求的构建、分页过滤、ETag 缓存、令牌池和增量同步都委托给内部的 GitHubClient，这里只负责异步发送请求。
+
+        :param client: GitHubClient 实例，提供请求构建和响应处理逻辑，以及缓存、令牌池和同步状态。
+        """
+        self.client = client
+        self._loop = None  # 当前 http_client 和信号量所属的事件循环
+        self._http_client = None
+        self._semaphore = None
+        self._users = 0  # 进入 async with 尚未退出的次数
+
+    @classmethod
+    def from_config(cls, config, transport=None):
+        # 根据配置创建内部的 GitHubClient，再包装为异步客户端
+        return cls(GitHubClient.from_config(config, transport))
+
+    @property
+    def cache(self):
+        return self.client.cache
+
+    @property
+    def rate_limiter(self):
+        return self.client.rate_limiter
+
+    @property
+    def transport(self):
+        return self.client.transport
+
+    @property
+    def sync_state(self):
+        return self.client.sync_state
+
+    async def __aenter__(self):
+        """
+        在当前事件循环中打开 httpx.AsyncClient 和并发信号量，二者都绑定事件循环。
+        每次 asyncio.run 都应在 async with 中使用客户端，退出时关闭连接；同一事件循环中嵌套或并发进入时共用一个连接池，
+        最后一个退出时关闭。
+        """
+        if self._http_client is None:
+            connect_timeout, read_timeout = self.transport.timeout
+            self._http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_connections=max(self.client.max_workers, self.transport.pool_maxsize)),
+                transport=httpx.AsyncHTTPTransport(retries=self.transport.max_retries),  # 连接失败时重试
+            )
+            self._semaphore = asyncio.Semaphore(self.client.max_workers)
+            self._loop = asyncio.get_running_loop()
+        self._users += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._users -= 1
+        if self._users == 0:
+            http_client = self._http_client
+            self._http_client, self._semaphore, self._loop = None, None, None
+            await http_client.aclose()
+
+    def _session(self):
+        # 获取当前事件循环中打开的 httpx.AsyncClient 和并发信号量
+        if self._http_client is None or self._loop is not asyncio.get_running_loop():
+            raise RuntimeError("AsyncGitHubClient 需要在当前事件循环的 async with 中使用")
+        return self._http_client, self._semaphore
+
+    async def fetch_updates(self, repo, since=None, until=None):
+        # 获取指定仓库的更新，可以指定开始和结束日期；三类数据并发获取
+        fetchers = {'commits': self.fetch_commits, 'issues': self.fetch_issues, 'pull_requests': self.fetch_pull_requests}
+        results = await asyncio.gather(*(fetcher(repo, since, until) for fetcher in fetchers.values()))
+        return dict(zip(fetchers, results))
+
+    async def fetch_updates_batch(self, repos, since=None, until=None):
+        """
+        并发获取多个仓库的更新，同时进行中的请求数不超过 max_workers。
+
+        :return: 异步生成器，按完成顺序逐个产出 (repo, updates)。
+        """
+        async def fetch(repo):
+            return repo, await self.fetch_updates(repo, since, until)
+
+        for task in asyncio.as_completed([fetch(repo) for repo in repos]):
+            yield await task
+
+    async def fetch_commits(self, repo, since=None, until=None):
+        return [item async for item in self.iter_commits(repo, since, until)]
+
+    async def fetch_issues(self, repo, since=None, until=None):
+        return [item async for item in self.iter_issues(repo, since, until)]
+
+    async def fetch_pull_requests(self, repo, since=None, until=None):
+        return [item async for item in self.iter_pull_requests(repo, since, until)]
+
+    def iter_commits(self, repo, since=None, until=None, strict=False):
+        return self._paginate(repo, 'commits', *self.client._list_request(repo, 'commits', since, until), strict=strict)
+
+    def iter_issues(self, repo, since=None, until=None, strict=False):
+        return self._paginate(repo, 'issues', *self.client._list_request(repo, 'issues', since, until), strict=strict)
+
+    def iter_pull_requests(self, repo, since=None, until=None, strict=False):
+        return self._paginate(repo, 'pull_requests',
+                              *self.client._list_request(repo, 'pull_requests', since, until), strict=strict)
+
+    async def sync(self, repo, resource, since, until=None):
+        """
+        增量同步：从本地记录的高水位开始只获取新数据，与本地保存的数据合并后返回完整时间窗口的数据。
+        本地存储的读写是阻塞操作，放到线程中执行，避免阻塞事件循环。
+        """
+        iterators = {'commits': self.iter_commits, 'issues': self.iter_issues, 'pull_requests': self.iter_pull_requests}
+        fetch_since = await asyncio.to_thread(self.client._begin_sync, repo, resource, since)
+        try:
+            delta = [item async for item in iterators[resource](repo, since=fetch_since, until=until, strict=True)]
+        except Exception:
+            delta = None
+        return await asyncio.to_thread(self.client._finish_sync, repo, resource, since, until, fetch_since, delta)
+
+    async def _paginate(self, repo, resource, url, params, since=None, strict=False):
+        # 逐页获取列表数据，翻页、提前停止和错误处理与 GitHubClient._paginate 共用同一套辅助方法
+        since_time = parse_time(since) if since else None
+        while url:
+            try:
+                items, next_url = await self._get_page(url, params, since)
+            except Exception as e:
+                self.client._log_fetch_error(repo, resource, e)
+                if strict:
+                    raise
+                return
+
+            page, finished = self.client._filter_page(resource, items, since_time)
+            for item in page:
+                yield item
+            if finished:
+                return  # 之后的数据都早于 since，无需继续翻页
+
+            url, params = next_url, None  # 后续页的参数已包含在 next 链接中
+
+    async def _get_page(self, url, params, since=None):
+        # 获取一页数据，条件请求和响应解析由 GitHubClient 完成，配额耗尽时异步等待；
+        # 缓存读写是阻塞的磁盘操作，放到线程中执行，避免阻塞事件循环
+        http_client, semaphore = self._session()
+        key, entry, headers, params = await asyncio.to_thread(self.client._conditional_request, url, params, since)
+        if params:
+            params = {name: value for name, value in params.items() if value is not None}  # 与 requests 一样忽略 None
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            token, wait = self.rate_limiter.reserve()
+            while wait > 0:
+                LOG.warning(f"GitHub API 配额已耗尽，等待 {wait:.0f} 秒后继续请求。")
+                await asyncio.sleep(wait)
+                token, wait = self.rate_limiter.reserve()
+            if token:
+                headers['Authorization'] = f'token {token}'
+            async with semaphore:
+                response = await http_client.get(url, headers=headers, params=params)
+            if not self.rate_limiter.update(token, response):
+                break
+        return await asyncio.to_thread(self.client._read_page, key, entry, response, since)
+
+    async def export_daily_progress(self, repo):
+        LOG.debug(f"[准备导出项目进度]：{repo}")
+        today = datetime.now().date().isoformat()  # 获取今天的日期
+        if self.sync_state:
+            issues = await self.sync(repo, 'issues', today)  # 只获取增量并与本地数据合并
+        else:
+            issues = await self.fetch_issues(repo, since=today)
+        return self.client._write_daily_progress_file(repo, today, issues)
+
+    async def export_progress_by_date_range(self, repo, days):
+        since, today = date_range(days)  # 计算开始和结束日期
+        if self.sync_state:
+            issues = await self.sync(repo, 'issues', since.isoformat(), today.isoformat())  # 只获取增量并与本地数据合并
+        else:
+            issues = await self.fetch_issues(repo, since=since.isoformat(), until=today.isoformat())
+        return self.client._write_progress_file(repo, days, since, today, issues)
+
+    async def export_progress_batch(self, repos, days):
+        """
+        并发导出多个仓库指定日期范围内的进展。
+
+        :return: 异步生成器，按完成顺序逐个产出 (repo, file_path)。
+        """
+        async def export(repo):
+            return repo, await self.export_progress_by_date_range(repo, days)
+
+        for task in asyncio.as_completed([export(repo) for repo in repos]):
+            yield await task
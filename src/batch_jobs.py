@@ -0,0 +1,70 @@
+import json  # 导入json库用于读写任务文件
+import os  # 导入os模块用于文件和目录操作
+import threading  # 导入threading库，保证多线程访问安全
+import uuid  # 导入uuid库，用于生成任务编号
+from logger import LOG  # 导入日志模块
+
+
+class BatchJobStore:
+    def __init__(self, path=None):
+        """
+        保存已提交、尚未收取结果的批量生成任务。定时任务提交批量任务后立即返回，由单独的定时检查收取结果；
+        任务写入文件，守护进程重启后仍可继续收取。
+
+        :param path: 任务文件路径，为空时只在内存中保存。
+        """
+        self.path = path
+        self._jobs = {}  # 任务编号 -> 任务描述
+        self._lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        根据配置对象创建 BatchJobStore 实例。
+        """
+        return cls(config.llm_batch_jobs_path)
+
+    def add(self, job):
+        """
+        保存任务并返回任务编号。
+        """
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = job
+            self._save()
+        return job_id
+
+    def items(self):
+        """
+        返回 [(任务编号, 任务描述), ...]，按提交顺序排列。
+        """
+        with self._lock:
+            return list(self._jobs.items())
+
+    def remove(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._save()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._jobs)
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                self._jobs = json.load(file)
+        except (OSError, ValueError) as e:
+            LOG.warning(f"批量任务文件损坏，未收取的任务将被忽略：{str(e)}")
+
+    def _save(self):
+        # 先写临时文件再替换，避免进程中断导致任务文件损坏（调用方需持有锁）
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump(self._jobs, file, ensure_ascii=False)
+        os.replace(self.path + '.tmp', self.path)
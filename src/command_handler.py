@@ -1,6 +1,8 @@
 # src/command_handler.py
 
 import argparse  # 导入argparse库，用于处理命令行参数解析
+import asyncio  # 导入asyncio库，用于执行异步后端的协程
+import inspect  # 导入inspect库，用于识别协程
 
 class CommandHandler:
     def __init__(self, github_client, subscription_manager, report_generator):
@@ -70,16 +72,27 @@ class CommandHandler:
             print(f"  - {sub}")
 
     def export_daily_progress(self, args):
-        self.github_client.export_daily_progress(args.repo)
+        self._run(self.github_client.export_daily_progress(args.repo))
         print(f"Exported daily progress for repository: {args.repo}")
 
     def export_progress_by_date_range(self, args):
-        self.github_client.export_progress_by_date_range(args.repo, days=args.days)
+        self._run(self.github_client.export_progress_by_date_range(args.repo, days=args.days))
         print(f"Exported progress for the last {args.days} days for repository: {args.repo}")
 
     def generate_daily_report(self, args):
         self.report_generator.generate_github_report(args.file)
         print(f"Generated daily report from file: {args.file}")
 
+    def _run(self, result):
+        # 异步后端的方法返回协程，在新的事件循环中执行，退出时关闭该事件循环上的连接
+        if not inspect.iscoroutine(result):
+            return result
+
+        async def run():
+            async with self.github_client:
+                return await result
+
+        return asyncio.run(run())
+
     def print_help(self, args=None):
         self.parser.print_help()  # 输出帮助信息
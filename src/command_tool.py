@@ -1,18 +1,23 @@
 import shlex  # 导入shlex库，用于正确解析命令行输入
 
 from config import Config  # 从config模块导入Config类，用于配置管理
-from github_client import GitHubClient  # 从github_client模块导入GitHubClient类，用于GitHub API操作
+from github_backends import create_github_client  # 从github_backends模块导入GitHub客户端工厂，按配置选择后端
 from report_generator import ReportGenerator  # 从report_generator模块导入ReportGenerator类，用于报告生成
 from llm import LLM  # 从llm模块导入LLM类，可能用于语言模型相关操作
+from llm_cache import LLMCache  # 从llm_cache模块导入LLMCache类，缓存重复请求的生成结果
+from llm_metrics import LLMMetrics  # 从llm_metrics模块导入LLMMetrics类，记录每次调用的token数和耗时
+from http_transport import HTTPTransport  # 从http_transport模块导入HTTPTransport类，共享HTTP连接
 from subscription_manager import SubscriptionManager  # 从subscription_manager模块导入SubscriptionManager类，管理订阅
 from command_handler import CommandHandler  # 从command_handler模块导入CommandHandler类，处理命令行命令
 from logger import LOG  # 从logger模块导入LOG对象，用于日志记录
 
 def main():
     config = Config()  # 创建配置实例
-    github_client = GitHubClient(config.github_token)  # 创建GitHub客户端实例
-    llm = LLM(config)  # 创建语言模型实例
-    report_generator = ReportGenerator(llm, config.report_types)  # 创建报告生成器实例
+    transport = HTTPTransport.from_config(config)  # 创建各客户端共享的 HTTP 传输层
+    github_client = create_github_client(config, transport)  # 根据配置创建 REST、GraphQL 或异步后端的GitHub客户端
+    # 创建语言模型实例，相同的请求直接使用缓存
+    llm = LLM(config, transport, LLMCache.from_config(config), LLMMetrics.from_config(config))
+    report_generator = ReportGenerator.from_config(llm, config)  # 创建报告生成器实例
     subscription_manager = SubscriptionManager(config.subscriptions_file)  # 创建订阅管理器实例
     command_handler = CommandHandler(github_client, subscription_manager, report_generator)  # 创建命令处理器实例
     
@@ -15,19 +15,87 @@ class Config:
             # 加载 GitHub 相关配置
             github_config = config.get('github', {})
             self.github_token = os.getenv('GITHUB_TOKEN', github_config.get('token'))
+            # 令牌池：主令牌加上额外令牌（GITHUB_TOKENS 环境变量以逗号分隔），请求会分散到各个令牌
+            extra_tokens = os.getenv('GITHUB_TOKENS')
+            extra_tokens = extra_tokens.split(',') if extra_tokens else github_config.get('extra_tokens', [])
+            self.github_tokens = [self.github_token] + [t.strip() for t in extra_tokens if t.strip()]
             self.subscriptions_file = github_config.get('subscriptions_file')
             self.freq_days = github_config.get('progress_frequency_days', 1)
             self.exec_time = github_config.get('progress_execution_time', "08:00")
+            self.github_api_url = github_config.get('api_url', 'https://api.github.com')  # 可指向本地 fake_github_server
+            self.github_max_concurrent_requests = github_config.get('max_concurrent_requests', 8)
+            self.github_cache_dir = github_config.get('cache_dir', '.cache/github')  # 为空时不启用 HTTP 缓存
+            self.github_cache_max_mb = github_config.get('cache_max_mb', 200)
+            self.github_backend = github_config.get('backend', 'rest')  # rest、graphql 或 async
+            self.github_sync_state_dir = github_config.get('sync_state_dir', '.cache/sync')  # 为空时每次获取完整时间窗口
+            self.github_sync_retention_days = github_config.get('sync_retention_days', 90)
+            # SQLite 事件存储路径，配置后优先于 sync_state_dir 作为增量同步的本地存储
+            self.github_event_store_path = github_config.get('event_store_path')
+            self.github_compact_records = github_config.get('compact_records', True)  # 只保留导出和报告需要的字段
+            self.github_graphql_batch_size = github_config.get('graphql_batch_size', 20)
 
             # 加载 LLM 相关配置
             llm_config = config.get('llm', {})
             self.llm_model_type = llm_config.get('model_type', 'openai')
             self.openai_model_name = llm_config.get('openai_model_name', 'gpt-4o-mini')
             self.ollama_model_name = llm_config.get('ollama_model_name', 'llama3')
+            self.openai_api_url = llm_config.get('openai_api_url', 'https://api.openai.com/v1')  # 可指向本地 fake_openai_server
             self.ollama_api_url = llm_config.get('ollama_api_url', 'http://localhost:11434/api/chat')
+            # Ollama 模型的驻留时间（如 "5m"、"4h10m" 或秒数），为空时守护进程按定时任务的间隔计算
+            self.ollama_keep_alive = llm_config.get('ollama_keep_alive')
+            self.llm_request_timeout = llm_config.get('request_timeout', 300)  # 生成报告请求的读取超时（秒）
+            # LLM 响应缓存：内存 LRU 加 SQLite 数据库，cache_path 为空时只使用内存缓存
+            self.llm_cache_path = llm_config.get('cache_path')
+            self.llm_cache_ttl_hours = llm_config.get('cache_ttl_hours', 24)
+            self.llm_cache_memory_entries = llm_config.get('cache_memory_entries', 128)
+            self.llm_cache_max_entries = llm_config.get('cache_max_entries', 5000)
+            # 输入超出模型上下文时分块提取要点：context_tokens 为空时按模型名称查表，map_concurrency 为并发请求数
+            self.llm_context_tokens = llm_config.get('context_tokens')
+            self.llm_map_concurrency = llm_config.get('map_concurrency', 4)
+            # 每个后端同时进行的最大请求数（整数或 {后端: 并发数}），以及每个请求从排队到完成的超时时间（秒）
+            self.llm_max_concurrency = llm_config.get('max_concurrency', {'openai': 8, 'ollama': 1})
+            self.llm_dispatch_timeout = llm_config.get('dispatch_timeout', 1800)
+            # 每次调用的 token 数和耗时追加到 metrics_path（为空时只在内存中统计），按模型和报告类型保留最近 metrics_window 次
+            self.llm_metrics_path = llm_config.get('metrics_path')
+            self.llm_metrics_window = llm_config.get('metrics_window', 500)
+            # 定时 GitHub 报告是否通过 OpenAI Batch API 批量生成，以及检查结果的间隔和最长等待时间（秒）；
+            # 已提交、尚未收取结果的任务保存在 batch_jobs_path（为空时只在内存中保存）
+            self.llm_batch_mode = llm_config.get('batch_mode', False)
+            self.llm_batch_poll_interval = llm_config.get('batch_poll_interval', 30)
+            self.llm_batch_timeout = llm_config.get('batch_timeout', 24 * 3600)
+            self.llm_batch_jobs_path = llm_config.get('batch_jobs_path')
             
+            # 加载 Hacker News 相关配置
+            hacker_news_config = config.get('hacker_news', {})
+            self.hn_parser = hacker_news_config.get('parser', 'stdlib')  # 首页 HTML 解析器：stdlib、lxml 或 bs4
+            self.hn_source = hacker_news_config.get('source', 'html')  # html 抓取首页，api 使用官方 Firebase API
+            self.hn_story_limit = hacker_news_config.get('story_limit', 100)  # api 模式下获取的热门新闻条数
+            self.hn_max_concurrent_requests = hacker_news_config.get('max_concurrent_requests', 16)
+            self.hn_item_cache_path = hacker_news_config.get('item_cache_path', '.cache/hacker_news/items.json')
+            self.hn_item_ttl = hacker_news_config.get('item_ttl', 3600)  # 条目缓存有效期（秒）
+            # 已出现新闻的索引，配置后每小时的热点报告只总结新出现的新闻；为空时每次导出完整列表
+            self.hn_seen_index_path = hacker_news_config.get('seen_index_path')
+            self.hn_seen_window_hours = hacker_news_config.get('seen_window_hours', 24)
+            # 快照时序存储目录，配置后每日趋势报告基于快照统计生成；为空时汇总每小时的话题报告
+            self.hn_snapshot_dir = hacker_news_config.get('snapshot_dir')
+            # 链接文章正文摘录：启用后话题报告基于标题和正文摘录生成
+            self.hn_enrich_articles = hacker_news_config.get('enrich_articles', False)
+            self.hn_article_cache_dir = hacker_news_config.get('article_cache_dir', '.cache/hacker_news/articles')
+            self.hn_article_max_workers = hacker_news_config.get('article_max_workers', 8)
+            self.hn_article_per_host_limit = hacker_news_config.get('article_per_host_limit', 2)  # 每个站点的并发请求数
+            self.hn_article_max_bytes = hacker_news_config.get('article_max_bytes', 512 * 1024)  # 每个页面最多下载的字节数
+            self.hn_article_timeout = hacker_news_config.get('article_timeout', 10)  # 每个页面的超时时间（秒）
+            self.hn_article_max_chars = hacker_news_config.get('article_max_chars', 1000)  # 每篇摘录最多保留的字符数
+
+            # 加载网络连接配置（连接池、重试和超时）
+            self.network = config.get('network', {})
+
             # 加载报告类型配置
             self.report_types = config.get('report_types', ["github", "hacker_news"])  # 默认报告类型
+            # 报告内容哈希索引，输入、提示和模型均未变化时复用已有报告；为空时每次都调用 LLM
+            self.report_cache_path = config.get('report_cache_path')
+            # GitHub 报告输入中近似重复条目（SimHash 汉明距离不超过该值）合并为一行，为空或 0 时不合并
+            self.report_dedup_threshold = config.get('report_dedup_threshold', 3)
             
             # 加载 Slack 配置
             slack_config = config.get('slack', {})
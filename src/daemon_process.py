@@ -1,53 +1,181 @@
+import asyncio  # 导入asyncio库，用于运行异步 GitHub 客户端
 import schedule # 导入 schedule 实现定时任务执行器
 import time  # 导入time库，用于控制时间间隔
 import os   # 导入os模块用于文件和目录操作
 import signal  # 导入signal库，用于信号处理
 import sys  # 导入sys库，用于执行系统相关的操作
+import threading  # 导入threading库，用于在后台预热模型
+from concurrent.futures import ThreadPoolExecutor  # 导入线程池，用于同时为多个仓库生成报告
 from datetime import datetime  # 导入 datetime 模块用于获取当前日期
 
 from config import Config  # 导入配置管理类
-from github_client import GitHubClient  # 导入GitHub客户端类，处理GitHub API请求
+from async_github_client import AsyncGitHubClient  # 导入异步GitHub客户端类
+from batch_jobs import BatchJobStore  # 导入未收取的批量生成任务存储
+from github_backends import create_github_client  # 导入按配置选择后端的GitHub客户端工厂
 from hacker_news_client import HackerNewsClient
+from http_transport import HTTPTransport  # 导入共享的 HTTP 传输层
 from notifier import Notifier  # 导入通知器类，用于发送通知
 from report_generator import ReportGenerator  # 导入报告生成器类
 from llm import LLM  # 导入语言模型类，可能用于生成报告内容
+from llm_cache import LLMCache  # 导入 LLM 响应缓存
+from llm_dispatcher import LLMDispatcher  # 导入 LLM 请求队列
+from llm_metrics import LLMMetrics  # 导入 LLM 调用指标
 from subscription_manager import SubscriptionManager  # 导入订阅管理器类，管理GitHub仓库订阅
 from logger import LOG  # 导入日志记录器
 
+HN_TOPIC_INTERVAL_HOURS = 4  # Hacker News 热点话题任务的执行间隔（小时）
+KEEP_ALIVE_MARGIN_SECONDS = 600  # 模型驻留时间在任务间隔之外额外保留的时间
+
 
 def graceful_shutdown(signum, frame):
     # 优雅关闭程序的函数，处理信号时调用
     LOG.info("[优雅退出]守护进程接收到终止信号")
     sys.exit(0)  # 安全退出程序
 
-def github_job(subscription_manager, github_client, report_generator, notifier, days):
+def warm_up(report_generator):
+    # 在后台预热模型，与获取数据同时进行；同一批报告的所有请求都使用已加载的模型
+    threading.Thread(target=report_generator.llm.warmup, name='llm-warmup', daemon=True).start()
+
+
+def log_llm_metrics(report_generator):
+    # 按模型和报告类型输出最近调用的 token 数、耗时分布和费用
+    if report_generator.llm.metrics:
+        for name, stats in report_generator.llm.metrics.stats().items():
+            LOG.info(f"LLM 调用统计 {name}：{stats}")
+
+
+def github_job(subscription_manager, github_client, report_generator, notifier, days, report_workers=1,
+               batch_jobs=None):
     LOG.info("[开始执行定时任务]GitHub Repo 项目进展报告")
+    warm_up(report_generator)
     subscriptions = subscription_manager.list_subscriptions()  # 获取当前所有订阅
     LOG.info(f"订阅列表：{subscriptions}")
-    for repo in subscriptions:
-        # 遍历每个订阅的仓库，执行以下操作
-        markdown_file_path = github_client.export_progress_by_date_range(repo, days)
-        # 从Markdown文件自动生成进展简报
+    # 并发获取所有订阅仓库的进展，按完成顺序提交报告生成；最多 report_workers 个仓库同时生成报告，
+    # 实际同时进行的 LLM 请求数由 LLMDispatcher 按后端限制。批量模式（传入 batch_jobs）下先导出所有仓库，
+    # 再一次提交所有报告，结果由 batch_check_job 收取
+    if batch_jobs is not None:
+        batch_export_and_submit(subscriptions, github_client, report_generator, notifier, days, batch_jobs)
+    elif isinstance(github_client, AsyncGitHubClient):
+        asyncio.run(async_export_and_notify(subscriptions, github_client, report_generator, notifier, days,
+                                            report_workers))
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, report_workers)) as executor:
+            for repo, markdown_file_path in github_client.export_progress_batch(subscriptions, days):
+                executor.submit(report_and_notify, repo, markdown_file_path, report_generator, notifier)
+    if github_client.cache:
+        LOG.info(f"GitHub 缓存统计：{github_client.cache.stats()}")
+    LOG.info(f"GitHub 令牌配额：{github_client.rate_limiter.stats()}")
+    LOG.info(f"HTTP 请求耗时统计：{github_client.transport.stats()}")
+    LOG.info(f"报告生成统计：{report_generator.stats()}")
+    if report_generator.llm.cache:
+        LOG.info(f"LLM 响应缓存统计：{report_generator.llm.cache.stats()}")
+    if isinstance(report_generator.llm, LLMDispatcher):
+        LOG.info(f"LLM 请求队列统计：{report_generator.llm.stats()}")
+        LOG.info(f"LLM 耗时统计：{report_generator.llm.llm.stats()}")
+    log_llm_metrics(report_generator)
+    LOG.info(f"[定时任务执行完毕]")
+
+
+def report_and_notify(repo, markdown_file_path, report_generator, notifier):
+    # 从Markdown文件自动生成进展简报并发送通知；单个仓库失败不影响其他仓库
+    try:
         report, _ = report_generator.generate_github_report(markdown_file_path)
         notifier.notify_github_report(repo, report)
-    LOG.info(f"[定时任务执行完毕]")
+    except Exception as e:
+        LOG.error(f"生成 {repo} 的项目进展报告失败：{str(e)}")
+
+
+def batch_export_and_submit(subscriptions, github_client, report_generator, notifier, days, batch_jobs):
+    # 导出所有仓库的进展后一次提交批量生成，不等待结果，避免阻塞其他定时任务
+    if isinstance(github_client, AsyncGitHubClient):
+        exported = asyncio.run(async_export_all(subscriptions, github_client, days))
+    else:
+        exported = list(github_client.export_progress_batch(subscriptions, days))
+    repos = {markdown_file_path: repo for repo, markdown_file_path in exported}
+    try:
+        job = report_generator.submit_github_reports_batch(list(repos))
+    except Exception as e:
+        LOG.error(f"提交批量生成项目进展报告失败：{str(e)}")
+        return
+    job['repos'] = repos
+    batch_jobs.add(job)
+    # 全部命中缓存或 Ollama 后端的任务已经完成，立即收取
+    batch_check_job(report_generator, notifier, batch_jobs)
+
+
+def batch_check_job(report_generator, notifier, batch_jobs):
+    # 查询一次每个未收取的批量任务，完成的任务保存报告并发送通知。任务失败、过期或超时时丢弃，
+    # 等待下一次定时任务重新提交；网络错误等其他异常保留任务，下次检查时重试
+    for job_id, job in batch_jobs.items():
+        try:
+            results = report_generator.collect_github_reports_batch(job)
+        except RuntimeError as e:
+            LOG.error(f"批量生成项目进展报告失败：{str(e)}")
+            batch_jobs.remove(job_id)
+            continue
+        except Exception as e:
+            LOG.error(f"查询批量生成任务失败，稍后重试：{str(e)}")
+            continue
+        if results is None:
+            continue
+        batch_jobs.remove(job_id)
+        for markdown_file_path, (report, _) in results.items():
+            try:
+                notifier.notify_github_report(job['repos'][markdown_file_path], report)
+            except Exception as e:
+                LOG.error(f"发送 {job['repos'][markdown_file_path]} 的项目进展报告失败：{str(e)}")
+
+
+async def async_export_all(subscriptions, github_client, days):
+    async with github_client:
+        return [item async for item in github_client.export_progress_batch(subscriptions, days)]
+
+
+async def async_export_and_notify(subscriptions, github_client, report_generator, notifier, days, report_workers=1):
+    # 在一个事件循环中并发导出所有仓库；生成报告和发送通知是阻塞操作，放到线程中执行，
+    # 导出完成的仓库立即开始生成报告，最多 report_workers 个仓库同时进行
+    slots = asyncio.Semaphore(max(1, report_workers))
+
+    async def report_in_thread(repo, markdown_file_path):
+        async with slots:
+            await asyncio.to_thread(report_and_notify, repo, markdown_file_path, report_generator, notifier)
+
+    tasks = []
+    async with github_client:  # 导出完成后即关闭连接，不等待报告生成
+        async for repo, markdown_file_path in github_client.export_progress_batch(subscriptions, days):
+            tasks.append(asyncio.create_task(report_in_thread(repo, markdown_file_path)))
+    await asyncio.gather(*tasks)
 
 
 def hn_topic_job(hacker_news_client, report_generator):
     LOG.info("[开始执行定时任务]Hacker News 热点话题跟踪")
-    markdown_file_path = hacker_news_client.export_top_stories()
-    _, _ = report_generator.generate_hn_topic_report(markdown_file_path)
+    warm_up(report_generator)
+    markdown_file_path = hacker_news_client.export_top_stories()  # 只导出上次快照之后新出现的新闻
+    if markdown_file_path is None:
+        LOG.info("没有新的热门新闻，跳过本次热点话题报告。")
+    else:
+        _, _ = report_generator.generate_hn_topic_report(markdown_file_path)
+        hacker_news_client.mark_exported()  # 报告生成成功后才将这些新闻记为已总结
+    LOG.info(f"报告生成统计：{report_generator.stats()}")
+    log_llm_metrics(report_generator)
     LOG.info(f"[定时任务执行完毕]")
 
 
 def hn_daily_job(hacker_news_client, report_generator, notifier):
     LOG.info("[开始执行定时任务]Hacker News 今日前沿技术趋势")
+    warm_up(report_generator)
     # 获取当前日期，并格式化为 'YYYY-MM-DD' 格式
     date = datetime.now().strftime('%Y-%m-%d')
     # 生成每日汇总报告的目录路径
     directory_path = os.path.join('hacker_news', date)
-    # 生成每日汇总报告并保存
-    report, _ = report_generator.generate_hn_daily_report(directory_path)
+    # 生成每日汇总报告并保存；有快照存储时使用预先计算的统计，而不是拼接每小时的话题报告。
+    # 最近 24 小时没有快照时统计为空，改用每小时话题报告的汇总
+    statistics = None
+    if hacker_news_client.snapshot_store:
+        statistics = hacker_news_client.snapshot_store.summary_markdown(hours=24)
+        if statistics is None:
+            LOG.warning("最近 24 小时没有 Hacker News 快照，使用每小时话题报告生成每日报告。")
+    report, _ = report_generator.generate_hn_daily_report(directory_path, statistics)
     notifier.notify_hn_report(date, report)
     LOG.info(f"[定时任务执行完毕]")
 
@@ -57,24 +185,38 @@ def main():
     signal.signal(signal.SIGTERM, graceful_shutdown)
 
     config = Config()  # 创建配置实例
-    github_client = GitHubClient(config.github_token)  # 创建GitHub客户端实例
-    hacker_news_client = HackerNewsClient() # 创建 Hacker News 客户端实例
+    transport = HTTPTransport.from_config(config)  # 创建各客户端共享的 HTTP 传输层
+    github_client = create_github_client(config, transport)  # 根据配置创建 REST、GraphQL 或异步后端的GitHub客户端
+    hacker_news_client = HackerNewsClient.from_config(config, transport) # 创建 Hacker News 客户端实例
     notifier = Notifier(config.email)  # 创建通知器实例
-    llm = LLM(config)  # 创建语言模型实例
-    report_generator = ReportGenerator(llm, config.report_types)  # 创建报告生成器实例
+    # 创建语言模型实例，相同的请求直接使用缓存，每次调用的 token 数和耗时写入指标文件
+    llm = LLM(config, transport, LLMCache.from_config(config), LLMMetrics.from_config(config))
+    if llm.keep_alive is None:
+        # 模型驻留时间覆盖最频繁的定时任务间隔，避免每次任务都重新加载模型
+        llm.keep_alive = HN_TOPIC_INTERVAL_HOURS * 3600 + KEEP_ALIVE_MARGIN_SECONDS
+    dispatcher = LLMDispatcher.from_config(llm, config)  # 按后端限制同时进行的 LLM 请求数
+    report_generator = ReportGenerator.from_config(dispatcher, config)  # 创建报告生成器实例
     subscription_manager = SubscriptionManager(config.subscriptions_file)  # 创建订阅管理器实例
 
     # 启动时立即执行（如不需要可注释）
     # github_job(subscription_manager, github_client, report_generator, notifier, config.freq_days)
     hn_daily_job(hacker_news_client, report_generator, notifier)
 
+    # 批量模式下提交的任务由单独的定时检查收取结果；启动时继续收取重启前提交的任务
+    batch_jobs = None
+    if config.llm_batch_mode:
+        batch_jobs = BatchJobStore.from_config(config)
+        schedule.every(config.llm_batch_poll_interval).seconds.do(batch_check_job, report_generator, notifier,
+                                                                   batch_jobs)
+
     # 安排 GitHub 的定时任务
     schedule.every(config.freq_days).days.at(
         config.exec_time
-    ).do(github_job, subscription_manager, github_client, report_generator, notifier, config.freq_days)
+    ).do(github_job, subscription_manager, github_client, report_generator, notifier, config.freq_days,
+         dispatcher.max_concurrency, batch_jobs)
     
     # 安排 hn_topic_job 每4小时执行一次，从0点开始
-    schedule.every(4).hours.at(":00").do(hn_topic_job, hacker_news_client, report_generator)
+    schedule.every(HN_TOPIC_INTERVAL_HOURS).hours.at(":00").do(hn_topic_job, hacker_news_client, report_generator)
 
     # 安排 hn_daily_job 每天早上10点执行一次
     schedule.every().day.at("10:00").do(hn_daily_job, hacker_news_client, report_generator, notifier)
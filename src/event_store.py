@@ -0,0 +1,181 @@
+import os  # 导入os模块用于文件和目录操作
+import sqlite3  # 导入sqlite3库，作为嵌入式事件存储
+import threading  # 导入threading库，保证多线程访问安全
+from datetime import datetime, timedelta, timezone  # 导入日期处理模块
+from sync_state import item_time  # 导入数据条目时间的提取函数
+from time_utils import parse_time  # 导入时间解析函数
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commits (
+    repo TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    message TEXT,
+    author TEXT,
+    committed_at TEXT,
+    PRIMARY KEY (repo, sha)
+);
+CREATE INDEX IF NOT EXISTS idx_commits_committed_at ON commits (repo, committed_at);
+
+CREATE TABLE IF NOT EXISTS issues (
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    title TEXT,
+    state TEXT,
+    author TEXT,
+    closed_at TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (repo, number)
+);
+DROP INDEX IF EXISTS idx_issues_closed_at;
+CREATE INDEX IF NOT EXISTS idx_issues_updated_at ON issues (repo, updated_at);
+
+CREATE TABLE IF NOT EXISTS pull_requests (
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    title TEXT,
+    state TEXT,
+    author TEXT,
+    closed_at TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (repo, number)
+);
+DROP INDEX IF EXISTS idx_pull_requests_closed_at;
+CREATE INDEX IF NOT EXISTS idx_pull_requests_updated_at ON pull_requests (repo, updated_at);
+
+CREATE TABLE IF NOT EXISTS sync_marks (
+    repo TEXT NOT NULL,
+    resource TEXT NOT NULL,
+    mark TEXT,
+    covered_since TEXT,
+    PRIMARY KEY (repo, resource)
+);
+"""
+
+# 各数据类型用于范围查询和保留期限的时间列，与 SyncStateStore 的 item_time 一致：
+# Issues 和 Pull Requests 使用更新时间（与 REST 接口的 since 过滤和高水位相同），未关闭的数据也有该时间
+TIME_COLUMNS = {'commits': 'committed_at', 'issues': 'updated_at', 'pull_requests': 'updated_at'}
+
+
+def to_utc(value):
+    # 将时间统一为 UTC 的 YYYY-MM-DDTHH:MM:SSZ 格式，保证字符串比较与时间顺序一致
+    if value is None:
+        return None
+    return parse_time(value).astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class EventStore:
+    def __init__(self, db_path, retention_days=90):
+        """
+        初始化基于 SQLite（WAL 模式）的 GitHub 事件存储，按仓库保存 Commits、Issues 和 Pull Requests，
+        并按 committed_at / updated_at 建立索引。接口与 SyncStateStore 相同，可作为 GitHubClient 的增量同步存储。
+
+        :param db_path: 数据库文件路径。
+        :param retention_days: 数据保留天数。
+        """
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self._local = threading.local()  # 每个线程使用独立的连接
+        self._write_lock = threading.Lock()  # 写操作串行执行
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)  # 确保目录存在
+        connection = self._connection()
+        connection.execute('PRAGMA journal_mode=WAL')  # WAL 模式下读操作不会被写操作阻塞
+        connection.executescript(SCHEMA)
+
+    def fetch_since(self, repo, resource, since):
+        """
+        计算本次需要从 API 获取数据的起始时间：本地数据已覆盖 since 时返回高水位，否则返回 since。
+        """
+        row = self._connection().execute(
+            'SELECT mark, covered_since FROM sync_marks WHERE repo = ? AND resource = ?', (repo, resource)
+        ).fetchone()
+        if row and row[0] and row[1] and row[1] <= to_utc(since):
+            return max(row[0], to_utc(since))
+        return since
+
+    def merge(self, repo, resource, items, fetched_since):
+        """
+        批量写入（存在则更新）从 fetched_since 开始获取到的全部数据，并推进高水位。
+        """
+        rows = [self._to_row(repo, resource, item) for item in items]
+        newest = max((to_utc(item_time(resource, item)) for item in items if item_time(resource, item)), default=None)
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.retention_days)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        fetched_since = to_utc(fetched_since)
+        with self._write_lock:
+            connection = self._connection()
+            with connection:  # 在同一个事务中写入数据和同步状态
+                if resource == 'commits':
+                    connection.executemany(
+                        'INSERT INTO commits (repo, sha, message, author, committed_at) VALUES (?, ?, ?, ?, ?) '
+                        'ON CONFLICT (repo, sha) DO UPDATE SET message = excluded.message, '
+                        'author = excluded.author, committed_at = excluded.committed_at', rows)
+                else:
+                    connection.executemany(
+                        f'INSERT INTO {resource} (repo, number, title, state, author, closed_at, updated_at) '
+                        f'VALUES (?, ?, ?, ?, ?, ?, ?) '
+                        f'ON CONFLICT (repo, number) DO UPDATE SET title = excluded.title, state = excluded.state, '
+                        f'author = excluded.author, closed_at = excluded.closed_at, updated_at = excluded.updated_at',
+                        rows)
+                connection.execute(
+                    'INSERT INTO sync_marks (repo, resource, mark, covered_since) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (repo, resource) DO UPDATE SET '
+                    'mark = CASE WHEN excluded.mark > IFNULL(mark, \'\') THEN excluded.mark ELSE mark END, '
+                    'covered_since = MIN(IFNULL(covered_since, excluded.covered_since), excluded.covered_since)',
+                    (repo, resource, newest, fetched_since))
+                # 删除超过保留期限的数据，并相应推后完整覆盖的起始时间
+                # 按更新时间判断，未关闭（closed_at 为空）的数据同样会过期删除
+                column = TIME_COLUMNS[resource]
+                connection.execute(f'DELETE FROM {resource} WHERE repo = ? AND {column} < ?', (repo, cutoff))
+                connection.execute('UPDATE sync_marks SET covered_since = ? WHERE repo = ? AND resource = ? '
+                                   'AND covered_since < ?', (cutoff, repo, resource, cutoff))
+
+    def items_since(self, repo, resource, since, until=None):
+        """
+        通过索引查询时间在 [since, until] 范围内的数据，按时间倒序排列。
+        Commits 按提交时间过滤，Issues 和 Pull Requests 按更新时间过滤，与 SyncStateStore 相同。
+        """
+        column = TIME_COLUMNS[resource]
+        query = f'SELECT * FROM {resource} WHERE repo = ? AND {column} >= ?'
+        params = [repo, to_utc(since)]
+        if until:
+            query += f' AND {column} <= ?'
+            params.append(to_utc(until))
+        query += f' ORDER BY {column} DESC'
+        cursor = self._connection().execute(query, params)
+        names = [description[0] for description in cursor.description]
+        return [self._to_item(resource, dict(zip(names, row))) for row in cursor]
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _connection(self):
+        # 获取当前线程的数据库连接
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _to_row(repo, resource, item):
+        # 将 API 数据转换为数据库行，只保留导出和报告需要的字段
+        if resource == 'commits':
+            commit = item.get('commit', {})
+            author = commit.get('author') or {}
+            return (repo, item['sha'], commit.get('message'), author.get('name'), to_utc(item_time(resource, item)))
+        user = item.get('user') or {}
+        return (repo, item['number'], item.get('title'), item.get('state'), user.get('login'),
+                to_utc(item.get('closed_at')), to_utc(item.get('updated_at')))
+
+    @staticmethod
+    def _to_item(resource, row):
+        # 将数据库行转换回与 REST 接口相同的结构
+        if resource == 'commits':
+            return {'sha': row['sha'],
+                    'commit': {'message': row['message'], 'author': {'name': row['author'], 'date': row['committed_at']}}}
+        return {'number': row['number'], 'title': row['title'], 'state': row['state'],
+                'user': {'login': row['author']} if row['author'] else None,
+                'closed_at': row['closed_at'], 'updated_at': row['updated_at']}
@@ -0,0 +1,449 @@
+"""
+本地 GitHub API 替身服务器，用于离线测试和基准测试。
+
+- 回放模式：从 fixtures 目录（{owner}/{repo}/{resource}.json）或合成数据中读取数据，
+  按 REST / GraphQL 接口返回，支持 Link 分页、ETag 条件请求和 X-RateLimit-* 速率限制响应头，
+  并可注入延迟和错误。
+- 录制模式：将请求转发到真实的 GitHub API，原样返回响应，同时把获取到的数据写入 fixtures 目录。
+
+用法：
+    python src/fake_github_server.py serve --fixtures tests/fixtures/github --port 8765
+    python src/fake_github_server.py serve --fixtures fixtures --record https://api.github.com
+    python src/fake_github_server.py bench --repos 50 --items 300 --workers 8 --latency 50
+"""
+import argparse  # 导入argparse库，用于解析命令行参数
+import hashlib  # 导入hashlib库，用于生成 ETag
+import json  # 导入json库，用于读写数据
+import os  # 导入os模块用于文件和目录操作
+import random  # 导入random库，用于注入延迟抖动和错误
+import re  # 导入re库，用于解析 GraphQL 查询
+import threading  # 导入threading库，保证多线程访问安全
+import time  # 导入time库，用于注入延迟和计算配额重置时间
+from datetime import datetime, timedelta, timezone  # 导入日期处理模块
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # 导入标准库 HTTP 服务器
+from urllib.parse import parse_qsl, urlencode, urlsplit  # 导入URL解析函数
+
+import requests  # 导入requests库，用于录制模式转发请求
+
+from sync_state import item_key, item_time  # 导入数据条目的唯一标识和时间提取函数
+from time_utils import parse_time  # 导入时间解析函数
+
+RESOURCES = ('commits', 'issues', 'pull_requests')
+PATH_RESOURCES = {'commits': 'commits', 'issues': 'issues', 'pulls': 'pull_requests'}  # URL 路径 -> 数据类型
+REPO_PATH = re.compile(r'^/repos/([^/]+)/([^/]+)/(commits|issues|pulls)$')
+DEFAULT_PER_PAGE = 30  # 与 GitHub 一致的默认分页大小
+MAX_PER_PAGE = 100
+FORWARD_HEADERS = ('ETag', 'Last-Modified', 'X-RateLimit-Limit', 'X-RateLimit-Remaining', 'X-RateLimit-Reset',
+                   'Retry-After')  # 录制模式下转发给客户端的响应头
+
+GRAPHQL_REPOSITORY = re.compile(r'r(\d+): repository\(owner: ("(?:[^"\\]|\\.)*"), name: ("(?:[^"\\]|\\.)*")\)')
+GRAPHQL_CONNECTION = re.compile(r'\b(history|issues|pullRequests)\(([^)]*)\)')
+GRAPHQL_ARGUMENT = re.compile(r'(\w+): ("(?:[^"\\]|\\.)*"|null|\d+)')
+
+
+def load_fixtures(fixtures_dir):
+    """
+    读取 fixtures 目录，结构为 {owner}/{repo}/{resource}.json，每个文件是 REST 接口返回的数据列表。
+
+    :return: {repo: {resource: [item, ...]}}
+    """
+    fixtures = {}
+    if not fixtures_dir or not os.path.isdir(fixtures_dir):
+        return fixtures
+    for owner in sorted(os.listdir(fixtures_dir)):
+        owner_dir = os.path.join(fixtures_dir, owner)
+        if not os.path.isdir(owner_dir):
+            continue
+        for name in sorted(os.listdir(owner_dir)):
+            for resource in RESOURCES:
+                path = os.path.join(owner_dir, name, f'{resource}.json')
+                if os.path.exists(path):
+                    with open(path, 'r', encoding='utf-8') as file:
+                        fixtures.setdefault(f'{owner}/{name}', {})[resource] = json.load(file)
+    return fixtures
+
+
+def synthetic_fixtures(repos, count, now=None):
+    """
+    生成合成数据：每个仓库每类数据 count 条，时间均匀分布在最近 30 天内。与 GitHub 一样，
+    Issues 中每 5 条有 1 条是 Pull Request（带 pull_request 字段），这些条目同时出现在 Pull Requests 中。
+
+    :return: {repo: {resource: [item, ...]}}
+    """
+    now = now or datetime.now(timezone.utc)
+    step = timedelta(days=30) / max(count, 1)
+    fixtures = {}
+    for repo in repos:
+        data = {resource: [] for resource in RESOURCES}
+        for index in range(count):
+            timestamp = (now - step * index).strftime('%Y-%m-%dT%H:%M:%SZ')
+            user = {'login': f'user{index % 50}', 'type': 'User'}
+            data['commits'].append({
+                'sha': hashlib.sha1(f'{repo}#{index}'.encode('utf-8')).hexdigest(),
+                'commit': {'message': f'Commit {index} of {repo}',
+                           'author': {'name': user['login'], 'date': timestamp},
+                           'committer': {'name': user['login'], 'date': timestamp}},
+            })
+            item = {'number': index + 1, 'title': f'issues {index + 1} of {repo}', 'state': 'closed',
+                    'user': user, 'created_at': timestamp, 'updated_at': timestamp, 'closed_at': timestamp}
+            if index % 5 == 4:
+                item['title'] = f'pull_requests {index + 1} of {repo}'
+                data['pull_requests'].append(dict(item, merged_at=timestamp))
+                item['pull_request'] = {'url': f'https://api.github.com/repos/{repo}/pulls/{index + 1}'}
+            data['issues'].append(item)
+        fixtures[repo] = data
+    return fixtures
+
+
+class FakeGitHubServer:
+    def __init__(self, fixtures_dir=None, fixtures=None, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, rate_limit=5000, rate_limit_window=3600, upstream=None, seed=None):
+        """
+        初始化 GitHub API 替身服务器。
+
+        :param fixtures_dir: fixtures 目录，回放模式从中读取数据，录制模式向其中写入数据。
+        :param fixtures: 额外的数据（如合成数据），格式与 load_fixtures 的返回值相同。
+        :param port: 监听端口，0 表示随机选择可用端口。
+        :param latency: 每个请求注入的固定延迟（秒）。
+        :param jitter: 在固定延迟之外随机增加的最大延迟（秒）。
+        :param error_rate: 返回 502 错误的概率（0 到 1）。
+        :param rate_limit: 每个令牌在一个窗口内的请求配额，304 响应不计入配额（与 GitHub 一致）。
+        :param rate_limit_window: 配额重置的周期（秒）。
+        :param upstream: 录制模式下转发请求的真实 API 地址，例如 https://api.github.com。
+        :param seed: 随机数种子，便于复现延迟和错误注入。
+        """
+        self.fixtures_dir = fixtures_dir
+        self.fixtures = load_fixtures(fixtures_dir)
+        self.fixtures.update(fixtures or {})
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.upstream = upstream.rstrip('/') if upstream else None
+        self.counters = {'requests': 0, 'not_modified': 0, 'rate_limited': 0, 'errors': 0, 'recorded': 0}
+        self._quotas = {}  # 令牌 -> [剩余配额, 重置时间戳]
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._upstream_session = requests.Session() if upstream else None
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        # 在后台线程中启动服务器，返回自身便于链式调用
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        # 在当前线程中运行服务器，直到被中断
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._upstream_session:
+            self._upstream_session.close()
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # 支持持久连接，与真实 API 的连接复用行为一致
+
+            def do_GET(self):
+                server._handle(self, 'GET')
+
+            def do_POST(self):
+                server._handle(self, 'POST')
+
+            def log_message(self, format, *args):
+                pass  # 不输出每个请求的访问日志
+
+        return Handler
+
+    def _handle(self, handler, method):
+        self._count('requests')
+        body = handler.rfile.read(int(handler.headers.get('Content-Length') or 0)) if method == 'POST' else b''
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and self._random.random() < self.error_rate:
+            self._count('errors')
+            return self._send_json(handler, 502, {'message': 'Server Error'})
+        if self.upstream:
+            return self._record(handler, method, body)
+
+        parts = urlsplit(handler.path)
+        query = dict(parse_qsl(parts.query))
+        if method == 'POST' and parts.path == '/graphql':
+            quota_headers = self._consume_quota(handler)
+            if quota_headers is None:
+                return
+            data = self._resolve_graphql(json.loads(body or b'{}').get('query', ''))
+            return self._send_json(handler, 200, {'data': data}, quota_headers)
+
+        match = REPO_PATH.match(parts.path) if method == 'GET' else None
+        if not match:
+            return self._send_json(handler, 404, {'message': 'Not Found'})
+        repo, resource = f'{match.group(1)}/{match.group(2)}', PATH_RESOURCES[match.group(3)]
+        if repo not in self.fixtures:
+            return self._send_json(handler, 404, {'message': 'Not Found'})
+        items = self._select(resource, self.fixtures[repo].get(resource, []), query)
+        per_page = min(int(query.get('per_page', DEFAULT_PER_PAGE)), MAX_PER_PAGE)
+        page = max(int(query.get('page', 1)), 1)
+        payload = json.dumps(items[(page - 1) * per_page:page * per_page]).encode('utf-8')
+        etag = f'W/"{hashlib.sha1(payload).hexdigest()}"'
+        headers = {'ETag': etag}
+        if page * per_page < len(items):
+            next_query = urlencode(dict(query, page=page + 1))
+            headers['Link'] = f'<{self._base_url(handler)}{parts.path}?{next_query}>; rel="next"'
+        if handler.headers.get('If-None-Match') == etag:
+            self._count('not_modified')
+            headers.update(self._consume_quota(handler, cost=0))  # 304 不计入配额，但同样返回配额响应头
+            return self._send(handler, 304, b'', headers)
+        quota_headers = self._consume_quota(handler)
+        if quota_headers is None:
+            return
+        headers.update(quota_headers)
+        return self._send(handler, 200, payload, headers)
+
+    def _consume_quota(self, handler, cost=1):
+        # 扣减请求令牌的配额；配额耗尽时直接返回 403 响应并返回 None
+        token = handler.headers.get('Authorization', '')
+        now = time.time()
+        with self._lock:
+            quota = self._quotas.get(token)
+            if quota is None or now >= quota[1]:
+                quota = self._quotas[token] = [self.rate_limit, int(now + self.rate_limit_window)]
+            limited = cost > 0 and quota[0] <= 0
+            if not limited:
+                quota[0] -= cost
+            headers = {'X-RateLimit-Limit': str(self.rate_limit), 'X-RateLimit-Remaining': str(quota[0]),
+                       'X-RateLimit-Reset': str(quota[1])}
+        if limited:
+            self._count('rate_limited')
+            self._send_json(handler, 403, {'message': 'API rate limit exceeded'}, headers)
+            return None
+        return headers
+
+    @staticmethod
+    def _select(resource, items, query):
+        # 按 REST 接口的语义过滤和排序：Commits 按提交时间过滤，Issues 按更新时间过滤，Pulls 忽略 since
+        state = query.get('state', 'open')
+        since = parse_time(query['since']) if query.get('since') else None
+        until = parse_time(query['until']) if query.get('until') else None
+        selected = []
+        for item in items:
+            if resource != 'commits' and state != 'all' and item.get('state') != state:
+                continue
+            timestamp = item_time(resource, item)
+            timestamp = parse_time(timestamp) if timestamp else None
+            if resource != 'pull_requests' and since and (timestamp is None or timestamp < since):
+                continue
+            if resource == 'commits' and until and timestamp and timestamp > until:
+                continue
+            selected.append((timestamp, item))
+        oldest = datetime.min.replace(tzinfo=timezone.utc)
+        selected.sort(key=lambda pair: pair[0] or oldest, reverse=query.get('direction', 'desc') == 'desc')
+        return [item for _, item in selected]
+
+    def _resolve_graphql(self, query):
+        # 解析 GitHubGraphQLClient 生成的别名查询（r0、r1...），逐个仓库返回连接数据
+        data = {}
+        matches = list(GRAPHQL_REPOSITORY.finditer(query))
+        for index, match in enumerate(matches):
+            end = matches[index + 1].start() if index + 1 < len(matches) else len(query)
+            repo = f'{json.loads(match.group(2))}/{json.loads(match.group(3))}'
+            if repo not in self.fixtures:
+                data[f'r{match.group(1)}'] = None
+                continue
+            node = {}
+            for connection in GRAPHQL_CONNECTION.finditer(query, match.end(), end):
+                arguments = {name: json.loads(value) for name, value in GRAPHQL_ARGUMENT.findall(connection.group(2))}
+                name = connection.group(1)
+                if name == 'history':
+                    items = self._select('commits', self.fixtures[repo].get('commits', []),
+                                         {'since': arguments.get('since'), 'until': arguments.get('until')})
+                    page = self._graphql_page(items, arguments, _commit_node)
+                    node['defaultBranchRef'] = {'target': {'history': page}}
+                else:
+                    resource = 'issues' if name == 'issues' else 'pull_requests'
+                    since = arguments.get('since') if resource == 'issues' else None
+                    items = self._select(resource, self.fixtures[repo].get(resource, []),
+                                         {'state': 'closed', 'since': since})
+                    if resource == 'issues':
+                        # GraphQL 的 issues 连接不包含 Pull Requests，REST 的 /issues 接口包含
+                        items = [item for item in items if 'pull_request' not in item]
+                    node[name] = self._graphql_page(items, arguments, _issue_node)
+            data[f'r{match.group(1)}'] = node
+        return data
+
+    @staticmethod
+    def _graphql_page(items, arguments, convert):
+        # 游标为条目在结果中的偏移量
+        first = min(int(arguments.get('first') or MAX_PER_PAGE), MAX_PER_PAGE)
+        offset = int(arguments.get('after') or 0)
+        page = items[offset:offset + first]
+        has_next = offset + first < len(items)
+        return {'pageInfo': {'hasNextPage': has_next, 'endCursor': str(offset + first) if has_next else None},
+                'nodes': [convert(item) for item in page]}
+
+    def _record(self, handler, method, body):
+        # 录制模式：转发请求到真实 API，返回响应，并把列表数据合并写入 fixtures 目录
+        parts = urlsplit(handler.path)
+        headers = {name: value for name, value in handler.headers.items()
+                   if name.lower() in ('authorization', 'accept', 'if-none-match', 'if-modified-since', 'content-type')}
+        response = self._upstream_session.request(method, self.upstream + handler.path, headers=headers,
+                                                  data=body or None, timeout=30)
+        forward = {name: response.headers[name] for name in FORWARD_HEADERS if name in response.headers}
+        match = REPO_PATH.match(parts.path) if method == 'GET' else None
+        next_url = response.links.get('next', {}).get('url')
+        if match and next_url:
+            # 真实 API 的 next 链接可能使用 /repositories/{id} 路径，改写为本地服务器上的原始路径
+            next_query = dict(parse_qsl(parts.query), **dict(parse_qsl(urlsplit(next_url).query)))
+            forward['Link'] = f'<{self._base_url(handler)}{parts.path}?{urlencode(next_query)}>; rel="next"'
+        if match and response.status_code == 200:
+            repo, resource = f'{match.group(1)}/{match.group(2)}', PATH_RESOURCES[match.group(3)]
+            self._save_fixture(repo, resource, response.json())
+        self._send(handler, response.status_code, response.content if response.status_code != 304 else b'', forward)
+
+    def _save_fixture(self, repo, resource, items):
+        # 按唯一标识合并数据并写入 {owner}/{repo}/{resource}.json
+        with self._lock:
+            existing = self.fixtures.setdefault(repo, {}).setdefault(resource, [])
+            merged = {item_key(resource, item): item for item in existing}
+            merged.update((item_key(resource, item), item) for item in items)
+            self.fixtures[repo][resource] = list(merged.values())
+            self.counters['recorded'] += len(items)
+            if self.fixtures_dir:
+                repo_dir = os.path.join(self.fixtures_dir, *repo.split('/', 1))
+                os.makedirs(repo_dir, exist_ok=True)
+                path = os.path.join(repo_dir, f'{resource}.json')
+                with open(path + '.tmp', 'w', encoding='utf-8') as file:
+                    json.dump(self.fixtures[repo][resource], file, ensure_ascii=False, indent=2)
+                os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def _base_url(handler):
+        return f"http://{handler.headers.get('Host')}"
+
+    def _send_json(self, handler, status, body, headers=None):
+        self._send(handler, status, json.dumps(body).encode('utf-8'), headers)
+
+    @staticmethod
+    def _send(handler, status, payload, headers=None):
+        handler.send_response(status)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        if status != 304:
+            handler.send_header('Content-Type', 'application/json; charset=utf-8')
+        handler.send_header('Content-Length', str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+
+def _commit_node(item):
+    commit = item.get('commit') or {}
+    author = commit.get('author') or {}
+    return {'oid': item['sha'], 'message': commit.get('message'), 'committedDate': item_time('commits', item),
+            'author': {'name': author.get('name')}}
+
+
+def _issue_node(item):
+    user = item.get('user')
+    return {'number': item['number'], 'title': item.get('title'), 'state': (item.get('state') or 'open').upper(),
+            'closedAt': item.get('closed_at'), 'updatedAt': item.get('updated_at'),
+            'author': {'login': user['login']} if user else None}
+
+
+def benchmark(args):
+    # 启动合成数据的替身服务器，分别测量冷缓存和热缓存（304）下批量获取的耗时
+    import shutil
+    import tempfile
+    from github_client import GitHubClient
+    from github_graphql_client import GitHubGraphQLClient
+    from http_cache import HTTPCache
+    from http_transport import HTTPTransport
+
+    repos = [f'bench/repo{index}' for index in range(args.repos)]
+    server = FakeGitHubServer(fixtures=synthetic_fixtures(repos, args.items), latency=args.latency / 1000,
+                              jitter=args.jitter / 1000, error_rate=args.error_rate, rate_limit=args.rate_limit,
+                              seed=0).start()
+    cache_dir = tempfile.mkdtemp()
+    try:
+        client_class = GitHubGraphQLClient if args.backend == 'graphql' else GitHubClient
+        transport = HTTPTransport(pool_maxsize=max(16, args.workers))
+        client = client_class(['bench_token'], args.workers, cache=HTTPCache(cache_dir), transport=transport,
+                              api_url=server.url)
+        since = (datetime.now(timezone.utc) - timedelta(days=args.days)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        for label in ('冷缓存', '热缓存'):
+            start = time.perf_counter()
+            total = sum(len(items) for _, updates in client.fetch_updates_batch(repos, since)
+                        for items in updates.values())
+            elapsed = time.perf_counter() - start
+            print(f"{label}：{len(repos)} 个仓库，{total} 条数据，耗时 {elapsed:.2f} 秒")
+        print(f"服务器统计：{server.stats()}")
+        print(f"缓存统计：{client.cache.stats()}")
+        print(f"请求耗时统计：{transport.stats()}")
+    finally:
+        server.stop()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地 GitHub API 替身服务器')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve = subparsers.add_parser('serve', help='启动回放或录制服务器')
+    serve.add_argument('--fixtures', help='fixtures 目录')
+    serve.add_argument('--synthetic', type=int, default=0, help='为 --repos 中的仓库生成的合成数据条数')
+    serve.add_argument('--repos', nargs='*', default=[], help='生成合成数据的仓库列表')
+    serve.add_argument('--record', metavar='UPSTREAM', help='录制模式：转发到该 API 地址并写入 fixtures')
+
+    bench = subparsers.add_parser('bench', help='使用合成数据测量 GitHubClient 的批量获取性能')
+    bench.add_argument('--repos', type=int, default=20, help='仓库数量')
+    bench.add_argument('--items', type=int, default=200, help='每个仓库每类数据的条数')
+    bench.add_argument('--workers', type=int, default=8, help='并发请求数')
+    bench.add_argument('--days', type=int, default=7, help='获取最近多少天的数据')
+    bench.add_argument('--backend', choices=('rest', 'graphql'), default='rest')
+
+    for command in (serve, bench):
+        command.add_argument('--latency', type=float, default=0, help='每个请求注入的延迟（毫秒）')
+        command.add_argument('--jitter', type=float, default=0, help='随机增加的最大延迟（毫秒）')
+        command.add_argument('--error-rate', type=float, default=0, help='返回 502 错误的概率')
+        command.add_argument('--rate-limit', type=int, default=5000, help='每个令牌每小时的请求配额')
+    serve.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.command == 'bench':
+        return benchmark(args)
+    fixtures = synthetic_fixtures(args.repos, args.synthetic) if args.synthetic else None
+    server = FakeGitHubServer(args.fixtures, fixtures, port=args.port, latency=args.latency / 1000,
+                              jitter=args.jitter / 1000, error_rate=args.error_rate, rate_limit=args.rate_limit,
+                              upstream=args.record)
+    print(f"GitHub API 替身服务器已启动：{server.url}（将 config.json 中的 github.api_url 设置为该地址）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == '__main__':
+    main()
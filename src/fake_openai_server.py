@@ -0,0 +1,218 @@
+"""
+本地 OpenAI Batch API 替身服务器，用于离线测试批量生成模式。
+
+实现 Batch API 用到的接口：上传文件（POST /v1/files）、创建任务（POST /v1/batches）、
+查询任务（GET /v1/batches/{id}）、取消任务（POST /v1/batches/{id}/cancel）和下载结果（GET /v1/files/{id}/content）。
+任务在 processing_time 秒后完成，每个请求的回复由 reply 函数根据消息生成。
+
+用法：
+    python src/fake_openai_server.py --port 8766 --processing-time 2
+"""
+import argparse  # 导入argparse库，用于解析命令行参数
+import email  # 导入email库，用于解析 multipart/form-data 上传
+import email.policy  # 导入email策略，用于按 HTTP 规则解析表单
+import itertools  # 导入itertools库，用于生成对象编号
+import json  # 导入json库，用于读写数据
+import threading  # 导入threading库，保证多线程访问安全
+import time  # 导入time库，用于模拟任务处理时间
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # 导入标准库 HTTP 服务器
+from urllib.parse import urlsplit  # 导入URL解析函数
+
+
+def echo_reply(messages):
+    """
+    默认的回复：以用户内容的第一行作为标题，便于测试中核对结果与请求的对应关系。
+    """
+    first_line = messages[-1]['content'].strip().split('\n', 1)[0]
+    return f"# 批量报告\n\n{first_line}"
+
+
+class FakeOpenAIServer:
+    def __init__(self, host='127.0.0.1', port=0, processing_time=0.0, reply=echo_reply, fail_ids=()):
+        """
+        初始化 OpenAI Batch API 替身服务器。
+
+        :param port: 监听端口，0 表示随机选择可用端口。
+        :param processing_time: 创建任务到任务完成的时间（秒）。
+        :param reply: 根据消息列表生成回复内容的函数。
+        :param fail_ids: 需要返回失败结果的 custom_id，失败结果写入 error_file_id 对应的文件。
+        """
+        self.processing_time = processing_time
+        self.reply = reply
+        self.fail_ids = set(fail_ids)
+        self.counters = {'requests': 0, 'uploads': 0, 'batches': 0, 'polls': 0}
+        self.files = {}  # 文件 ID -> 文件内容
+        self.batches = {}  # 任务 ID -> 任务对象
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def start(self):
+        # 在后台线程中启动服务器，返回自身便于链式调用
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        # 在当前线程中运行服务器，直到被中断
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _new_id(self, prefix):
+        with self._lock:
+            return f'{prefix}-{next(self._ids)}'
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server._handle(self, 'GET')
+
+            def do_POST(self):
+                server._handle(self, 'POST')
+
+            def log_message(self, format, *args):
+                pass  # 不输出每个请求的访问日志
+
+        return Handler
+
+    def _handle(self, handler, method):
+        self._count('requests')
+        body = handler.rfile.read(int(handler.headers.get('Content-Length') or 0)) if method == 'POST' else b''
+        if not handler.headers.get('Authorization', '').startswith('Bearer '):
+            return self._send_json(handler, 401, {'error': {'message': 'Missing API key'}})
+        path = urlsplit(handler.path).path.rstrip('/')
+        parts = path.split('/')[2:]  # 去掉开头的 /v1
+        if method == 'POST' and parts == ['files']:
+            return self._send_json(handler, 200, self._upload(handler, body))
+        if method == 'POST' and parts == ['batches']:
+            return self._create_batch(handler, json.loads(body or b'{}'))
+        if len(parts) >= 2 and parts[0] == 'batches' and parts[1] in self.batches:
+            batch = self._refresh(parts[1])
+            if method == 'POST' and parts[2:] == ['cancel']:
+                with self._lock:
+                    if batch['status'] not in ('completed', 'failed', 'expired'):
+                        batch['status'] = 'cancelled'
+                return self._send_json(handler, 200, batch)
+            if method == 'GET' and len(parts) == 2:
+                self._count('polls')
+                return self._send_json(handler, 200, batch)
+        if method == 'GET' and len(parts) == 3 and parts[0] == 'files' and parts[2] == 'content' \
+                and parts[1] in self.files:
+            return self._send(handler, 200, self.files[parts[1]], 'application/jsonl')
+        return self._send_json(handler, 404, {'error': {'message': 'Not Found'}})
+
+    def _upload(self, handler, body):
+        # 解析 multipart/form-data，保存 file 字段的内容
+        message = email.message_from_bytes(
+            f"Content-Type: {handler.headers.get('Content-Type')}\r\n\r\n".encode('utf-8') + body,
+            policy=email.policy.HTTP)
+        fields = {part.get_param('name', header='content-disposition'): part.get_payload(decode=True)
+                  for part in message.iter_parts()}
+        file_id = self._new_id('file')
+        self.files[file_id] = fields.get('file') or b''
+        self._count('uploads')
+        return {'id': file_id, 'object': 'file', 'bytes': len(self.files[file_id]),
+                'purpose': (fields.get('purpose') or b'').decode('utf-8')}
+
+    def _create_batch(self, handler, request):
+        if request.get('input_file_id') not in self.files:
+            return self._send_json(handler, 400, {'error': {'message': 'Unknown input_file_id'}})
+        batch_id = self._new_id('batch')
+        lines = [json.loads(line) for line in self.files[request['input_file_id']].splitlines() if line.strip()]
+        batch = {'id': batch_id, 'object': 'batch', 'endpoint': request.get('endpoint'),
+                 'input_file_id': request['input_file_id'], 'status': 'in_progress', 'created_at': int(time.time()),
+                 'output_file_id': None, 'error_file_id': None,
+                 'request_counts': {'total': len(lines), 'completed': 0, 'failed': 0},
+                 '_lines': lines, '_ready_at': time.monotonic() + self.processing_time}
+        with self._lock:
+            self.batches[batch_id] = batch
+        self._count('batches')
+        return self._send_json(handler, 200, batch)
+
+    def _refresh(self, batch_id):
+        # 处理时间已到的任务生成结果文件并标记为完成
+        with self._lock:
+            batch = self.batches[batch_id]
+            if batch['status'] != 'in_progress' or time.monotonic() < batch['_ready_at']:
+                return batch
+        outputs, errors = [], []
+        for line in batch['_lines']:
+            if line['custom_id'] in self.fail_ids:
+                errors.append({'id': self._new_id('response'), 'custom_id': line['custom_id'], 'response': None,
+                               'error': {'code': 'server_error', 'message': 'Injected failure'}})
+                continue
+            messages = line['body']['messages']
+            content = self.reply(messages)
+            prompt_tokens = sum(len(message['content'].split()) for message in messages)
+            body = {'id': self._new_id('chatcmpl'), 'object': 'chat.completion', 'model': line['body']['model'],
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                                 'finish_reason': 'stop'}],
+                    'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': len(content.split()),
+                              'total_tokens': prompt_tokens + len(content.split())}}
+            outputs.append({'id': self._new_id('response'), 'custom_id': line['custom_id'],
+                            'response': {'status_code': 200, 'body': body}, 'error': None})
+        result_files = {}  # 先分配文件 ID（_new_id 需要获取锁），再在锁内更新任务状态
+        for name, entries in (('output_file_id', outputs), ('error_file_id', errors)):
+            if entries:
+                content = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries)
+                result_files[name] = (self._new_id('file'), content.encode('utf-8'))
+        with self._lock:
+            if batch['status'] == 'in_progress':
+                for name, (file_id, content) in result_files.items():
+                    self.files[file_id] = content
+                    batch[name] = file_id
+                batch['request_counts'].update(completed=len(outputs), failed=len(errors))
+                batch['status'] = 'completed'
+            return batch
+
+    def _send_json(self, handler, status, body):
+        public = {key: value for key, value in body.items() if not key.startswith('_')}
+        self._send(handler, status, json.dumps(public, ensure_ascii=False).encode('utf-8'), 'application/json')
+
+    @staticmethod
+    def _send(handler, status, payload, content_type):
+        handler.send_response(status)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地 OpenAI Batch API 替身服务器')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--processing-time', type=float, default=2.0, help='任务完成所需的时间（秒）')
+    args = parser.parse_args()
+    server = FakeOpenAIServer(args.host, args.port, processing_time=args.processing_time)
+    print(f"OpenAI Batch API 替身服务器已启动：{server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
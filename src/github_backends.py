@@ -0,0 +1,15 @@
+from async_github_client import AsyncGitHubClient  # 导入异步GitHub客户端
+from github_client import GitHubClient  # 导入REST客户端
+from github_graphql_client import GitHubGraphQLClient  # 导入GraphQL批量获取客户端
+
+BACKENDS = {'rest': GitHubClient, 'graphql': GitHubGraphQLClient, 'async': AsyncGitHubClient}  # 配置项 github.backend 的可选值
+
+
+def create_github_client(config, transport=None):
+    """
+    根据配置中的 github_backend 创建 REST、GraphQL 或异步后端的 GitHub 客户端，未知的后端使用 REST 客户端。
+    守护进程、Gradio 界面和命令行工具都通过这里创建客户端。
+
+    :param transport: 可选的共享 HTTPTransport 实例。
+    """
+    return BACKENDS.get(config.github_backend, GitHubClient).from_config(config, transport)
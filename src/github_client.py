@@ -1,73 +1,289 @@
 # src/github_client.py
 
-import requests  # 导入requests库用于HTTP请求
-from datetime import datetime, date, timedelta  # 导入日期处理模块
+from datetime import datetime  # 导入日期处理模块
 import os  # 导入os模块用于文件和目录操作
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit  # 导入URL解析函数，用于生成缓存键
+from concurrent.futures import ThreadPoolExecutor, as_completed  # 导入线程池用于并发请求
+from http_cache import HTTPCache  # 导入磁盘 HTTP 缓存
+from http_transport import HTTPTransport  # 导入共享的 HTTP 传输层
+from rate_limiter import RateLimitScheduler  # 导入速率限制调度器
+from records import project  # 导入精简记录的投影函数
+from event_store import EventStore  # 导入 SQLite 事件存储
+from sync_state import SyncStateStore  # 导入增量同步状态存储
+from time_utils import parse_time, date_range  # 导入时间解析函数
 from logger import LOG  # 导入日志模块
 
+DEFAULT_API_URL = 'https://api.github.com'  # GitHub REST API 地址
+PER_PAGE = 100  # 每页获取的最大条目数（GitHub API 上限）
+MAX_RATE_LIMIT_RETRIES = 5  # 因速率限制失败时的最大重试次数
+RESOURCE_LABELS = {'commits': 'Commits', 'issues': 'Issues', 'pull_requests': 'Pull Requests'}  # 用于日志的数据类型名称
+
 class GitHubClient:
-    def __init__(self, token):
-        self.token = token  # GitHub API令牌
+    def __init__(self, token, max_workers=8, cache=None, transport=None, sync_state=None, compact_records=False,
+                 api_url=DEFAULT_API_URL):
+        tokens = list(token) if isinstance(token, (list, tuple)) else [token]  # 支持传入多个令牌组成令牌池
+        self.token = tokens[0]  # GitHub API令牌
         self.headers = {'Authorization': f'token {self.token}'}  # 设置HTTP头部认证信息
+        self.max_workers = max(1, max_workers)  # 同时进行中的最大请求数
+        self.cache = cache  # 可选的 HTTPCache 实例，用于 ETag 条件请求
+        self.rate_limiter = RateLimitScheduler(tokens)  # 在令牌池中分配请求并跟踪剩余配额
+        self.transport = transport or HTTPTransport(pool_maxsize=max(16, self.max_workers))  # 复用连接并自动重试
+        self.sync_state = sync_state  # 可选的 SyncStateStore 或 EventStore 实例，启用后导出时只获取增量数据
+        self.compact_records = compact_records  # 为 True 时将 API 数据投影为精简记录，减少长时间运行时的内存占用
+        self.api_url = api_url.rstrip('/')  # API 地址，可指向本地的 fake_github_server 进行离线测试
 
-    def fetch_updates(self, repo, since=None, until=None):
-        # 获取指定仓库的更新，可以指定开始和结束日期
-        updates = {
-            'commits': self.fetch_commits(repo, since, until),  # 获取提交记录
-            'issues': self.fetch_issues(repo, since, until),  # 获取问题
-            'pull_requests': self.fetch_pull_requests(repo, since, until)  # 获取拉取请求
+    @classmethod
+    def from_config(cls, config, transport=None):
+        """
+        根据配置对象创建 GitHubClient 实例。
+
+        :param config: 配置对象，包含 GitHub 令牌池、并发数和缓存等配置。
+        :param transport: 可选的共享 HTTPTransport 实例。
+        """
+        cache = None
+        if config.github_cache_dir:
+            cache = HTTPCache(config.github_cache_dir, max_bytes=config.github_cache_max_mb * 1024 * 1024)
+        sync_state = None
+        if config.github_event_store_path:
+            sync_state = EventStore(config.github_event_store_path, config.github_sync_retention_days)
+        elif config.github_sync_state_dir:
+            sync_state = SyncStateStore(config.github_sync_state_dir, config.github_sync_retention_days)
+        return cls(config.github_tokens, config.github_max_concurrent_requests, cache=cache, transport=transport,
+                   sync_state=sync_state, compact_records=config.github_compact_records, api_url=config.github_api_url)
+
+    def _fetchers(self):
+        # 返回各类更新数据对应的获取方法
+        return {
+            'commits': self.fetch_commits,  # 获取提交记录
+            'issues': self.fetch_issues,  # 获取问题
+            'pull_requests': self.fetch_pull_requests  # 获取拉取请求
         }
+
+    def fetch_updates(self, repo, since=None, until=None):
+        # 获取指定仓库的更新，可以指定开始和结束日期；三类数据并发获取
+        fetchers = self._fetchers()
+        with ThreadPoolExecutor(max_workers=min(len(fetchers), self.max_workers)) as executor:
+            futures = {name: executor.submit(fetcher, repo, since, until) for name, fetcher in fetchers.items()}
+            updates = {name: future.result() for name, future in futures.items()}
         return updates
 
-    def fetch_commits(self, repo, since=None, until=None):
-        LOG.debug(f"准备获取 {repo} 的 Commits")
-        url = f'https://api.github.com/repos/{repo}/commits'  # 构建获取提交的API URL
-        params = {}
-        if since:
-            params['since'] = since  # 如果指定了开始日期，添加到参数中
-        if until:
-            params['until'] = until  # 如果指定了结束日期，添加到参数中
+    def fetch_updates_batch(self, repos, since=None, until=None):
+        """
+        并发获取多个仓库的更新，所有仓库的三类数据共用一个有界线程池。
 
-        try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            response.raise_for_status()  # 检查请求是否成功
-            return response.json()  # 返回JSON格式的数据
-        except Exception as e:
-            LOG.error(f"从 {repo} 获取 Commits 失败：{str(e)}")
-            LOG.error(f"响应详情：{response.text if 'response' in locals() else '无响应数据可用'}")
-            return []  # Handle failure case
+        :param repos: 仓库名称列表。
+        :param since: 开始日期（ISO 格式）。
+        :param until: 结束日期（ISO 格式）。
+        :return: 生成器，按完成顺序逐个产出 (repo, updates)。
+        """
+        fetchers = self._fetchers()
+        pending = {repo: {} for repo in repos}  # 尚未获取完整的仓库数据
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(fetcher, repo, since, until): (repo, name)
+                for repo in pending for name, fetcher in fetchers.items()
+            }
+            for future in as_completed(futures):
+                repo, name = futures[future]
+                pending[repo][name] = future.result()
+                if len(pending[repo]) == len(fetchers):  # 该仓库三类数据均已就绪
+                    yield repo, pending.pop(repo)
+
+    def fetch_commits(self, repo, since=None, until=None):
+        return list(self.iter_commits(repo, since, until))
 
     def fetch_issues(self, repo, since=None, until=None):
-        LOG.debug(f"准备获取 {repo} 的 Issues。")
-        url = f'https://api.github.com/repos/{repo}/issues'  # 构建获取问题的API URL
-        params = {'state': 'closed', 'since': since, 'until': until}
-        try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            LOG.error(f"从 {repo} 获取 Issues 失败：{str(e)}")
-            LOG.error(f"响应详情：{response.text if 'response' in locals() else '无响应数据可用'}")
-            return []
+        return list(self.iter_issues(repo, since, until))
 
     def fetch_pull_requests(self, repo, since=None, until=None):
-        LOG.debug(f"准备获取 {repo} 的 Pull Requests。")
-        url = f'https://api.github.com/repos/{repo}/pulls'  # 构建获取拉取请求的API URL
-        params = {'state': 'closed', 'since': since, 'until': until}
+        return list(self.iter_pull_requests(repo, since, until))
+
+    def iter_commits(self, repo, since=None, until=None, strict=False):
+        return self._paginate(repo, 'commits', *self._list_request(repo, 'commits', since, until), strict=strict)
+
+    def iter_issues(self, repo, since=None, until=None, strict=False):
+        return self._paginate(repo, 'issues', *self._list_request(repo, 'issues', since, until), strict=strict)
+
+    def iter_pull_requests(self, repo, since=None, until=None, strict=False):
+        return self._paginate(repo, 'pull_requests', *self._list_request(repo, 'pull_requests', since, until),
+                              strict=strict)
+
+    def _list_request(self, repo, resource, since=None, until=None):
+        """
+        构建列表接口第一页的请求。
+
+        :return: (url, params, stop_since)，stop_since 不为空时数据按 updated_at 倒序返回，遇到早于它的数据即可停止翻页。
+        """
+        LOG.debug(f"准备获取 {repo} 的 {RESOURCE_LABELS[resource]}")
+        if resource == 'commits':
+            url = f'{self.api_url}/repos/{repo}/commits'  # 构建获取提交的API URL
+            params = {'per_page': PER_PAGE}
+            if since:
+                params['since'] = since  # 如果指定了开始日期，添加到参数中
+            if until:
+                params['until'] = until  # 如果指定了结束日期，添加到参数中
+            # Commits 接口按 since/until 在服务端过滤，逐页读取即可
+            return url, params, None
+        # Pulls 接口不支持 since 过滤，与 Issues 一样按更新时间倒序读取，遇到早于 since 的数据即停止
+        path = 'issues' if resource == 'issues' else 'pulls'
+        url = f'{self.api_url}/repos/{repo}/{path}'  # 构建获取问题或拉取请求的API URL
+        params = {'state': 'closed', 'since': since, 'until': until,
+                  'sort': 'updated', 'direction': 'desc', 'per_page': PER_PAGE}
+        return url, params, since
+
+    def sync(self, repo, resource, since, until=None):
+        """
+        增量同步：从本地记录的高水位开始只获取新数据，与本地保存的数据合并后返回完整时间窗口的数据。
+
+        :param resource: 数据类型，'commits'、'issues' 或 'pull_requests'。
+        :param since: 时间窗口的起始时间。
+        :param until: 时间窗口的结束时间，仅用于 Commits（与 REST 接口的过滤语义一致）。
+        :return: 时间窗口内的数据列表，按时间倒序排列。
+        """
+        iterators = {'commits': self.iter_commits, 'issues': self.iter_issues, 'pull_requests': self.iter_pull_requests}
+        fetch_since = self._begin_sync(repo, resource, since)
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            response.raise_for_status()  # 确保成功响应
-            return response.json()
-        except Exception as e:
-            LOG.error(f"从 {repo} 获取 Pull Requests 失败：{str(e)}")
-            LOG.error(f"响应详情：{response.text if 'response' in locals() else '无响应数据可用'}")
-            return []
+            delta = list(iterators[resource](repo, since=fetch_since, until=until, strict=True))
+        except Exception:
+            delta = None
+        return self._finish_sync(repo, resource, since, until, fetch_since, delta)
+
+    def _begin_sync(self, repo, resource, since):
+        # 返回本次增量同步的起始时间（本地记录的高水位）
+        fetch_since = self.sync_state.fetch_since(repo, resource, since)
+        LOG.debug(f"增量同步 {repo} 的 {resource}，从 {fetch_since} 开始获取")
+        return fetch_since
+
+    def _finish_sync(self, repo, resource, since, until, fetch_since, delta):
+        # 合并获取到的增量数据并返回完整时间窗口的数据；delta 为 None 表示获取失败
+        if delta is None:
+            # 获取失败时不推进高水位，下次运行会重新获取这段数据
+            LOG.warning(f"{repo} 的 {resource} 增量同步失败，使用本地已有数据生成报告")
+        else:
+            self.sync_state.merge(repo, resource, delta, fetch_since)
+        return self.sync_state.items_since(repo, resource, since, until if resource == 'commits' else None)
+
+    def _paginate(self, repo, resource, url, params, since=None, strict=False):
+        """
+        逐页获取列表数据，跟随响应头中的 Link: rel="next" 翻页，并逐条产出。
+
+        :param repo: 仓库名称，用于日志。
+        :param resource: 数据类型，'commits'、'issues' 或 'pull_requests'。
+        :param url: 第一页的 API URL。
+        :param params: 第一页的查询参数，后续页的参数已包含在 next 链接中。
+        :param since: 若指定，数据需按 updated_at 倒序返回，遇到更新时间早于 since 的数据时提前停止。
+        :param strict: 为 True 时获取失败会抛出异常，而不是记录日志后提前结束。
+        :return: 生成器，逐条产出数据。
+        """
+        since_time = parse_time(since) if since else None
+        while url:
+            try:
+                items, next_url = self._get_page(url, params, since)
+            except Exception as e:
+                self._log_fetch_error(repo, resource, e)
+                if strict:
+                    raise
+                return  # Handle failure case
+
+            page, finished = self._filter_page(resource, items, since_time)
+            yield from page
+            if finished:
+                return  # 之后的数据都早于 since，无需继续翻页
+
+            url, params = next_url, None  # 后续页的参数已包含在 next 链接中
+
+    def _log_fetch_error(self, repo, resource, error):
+        # 记录获取一页数据失败的原因和响应内容
+        response = getattr(error, 'response', None)
+        LOG.error(f"从 {repo} 获取 {RESOURCE_LABELS[resource]} 失败：{str(error)}")
+        LOG.error(f"响应详情：{response.text if response is not None else '无响应数据可用'}")
+
+    def _filter_page(self, resource, items, since_time):
+        # 投影一页数据；遇到更新时间早于 since 的数据时截断，并返回 True 表示停止翻页
+        page = []
+        for item in items:
+            updated_at = item.get('updated_at')
+            if since_time and updated_at and parse_time(updated_at) < since_time:
+                return page, True
+            page.append(self._project(resource, item))
+        return page, False
+
+    def _project(self, resource, item):
+        # 启用精简记录时，在解析后立即丢弃导出和报告用不到的字段
+        return project(resource, item) if self.compact_records else item
+
+    def _get_page(self, url, params, since=None):
+        """
+        获取一页数据。启用缓存时携带 If-None-Match / If-Modified-Since 条件请求头，
+        服务端返回 304 时直接使用缓存内容（GitHub 不将 304 计入速率限制）。
+
+        :param since: 按 updated_at 倒序读取时的停止时间，见 _conditional_request。
+        :return: (数据列表, 下一页 URL 或 None)
+        """
+        key, entry, headers, params = self._conditional_request(url, params, since)
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            token = self.rate_limiter.acquire()  # 选择配额充足的令牌，必要时等待配额重置
+            if token:
+                headers['Authorization'] = f'token {token}'
+            response = self.transport.get(url, headers=headers, params=params)
+            if not self.rate_limiter.update(token, response):
+                break
+            # 被限流时不丢弃数据，等待后换用其他令牌重试；重试次数用尽后由 raise_for_status 报错
+        return self._read_page(key, entry, response, since)
+
+    def _conditional_request(self, url, params, since=None):
+        """
+        查找缓存条目并生成条件请求头。缓存键不包含 since 参数：增量同步每次运行的 since 都会推进，
+        包含 since 时缓存键总是新的，ETag 永远不会命中。
+
+        请求第一页时传入 since（数据按 updated_at 倒序读取，可在客户端按 since 截断）且缓存条目的 since 不晚于它时，
+        沿用缓存条目的 since 发送请求：数据没有变化时服务端返回 304，缓存内容再由 _filter_page 按 since 截断。
+
+        :return: (缓存键, 缓存条目, 请求头, 实际发送的查询参数)
+        """
+        headers = {}
+        if not self.cache:
+            return None, None, headers, params
+        key = self.cache.make_key(*_without_since(url, params))
+        entry = self.cache.get(key)
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+            if since and params and entry.get('since') and parse_time(entry['since']) <= parse_time(since):
+                params = dict(params, since=entry['since'])
+        return key, entry, headers, params
+
+    def _read_page(self, key, entry, response, since=None):
+        # 解析一页响应（requests 或 httpx 响应对象），304 时使用缓存内容，否则更新缓存并记录请求的 since
+        if entry and response.status_code == 304:
+            self.cache.record_hit()
+            return entry['body'], entry.get('next_url')
+
+        response.raise_for_status()  # 检查请求是否成功
+        body = response.json()  # JSON格式的数据
+        next_url = response.links.get('next', {}).get('url')  # 下一页的 URL，没有则结束
+        if self.cache:
+            self.cache.record_miss()
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag or last_modified:
+                self.cache.put(key, {'etag': etag, 'last_modified': last_modified,
+                                     'body': body, 'next_url': next_url, 'since': since})
+        return body, next_url
 
     def export_daily_progress(self, repo):
         LOG.debug(f"[准备导出项目进度]：{repo}")
         today = datetime.now().date().isoformat()  # 获取今天的日期
-        updates = self.fetch_updates(repo, since=today)  # 获取今天的更新数据
-        
+        if self.sync_state:
+            issues = self.sync(repo, 'issues', today)  # 只获取增量并与本地数据合并
+        else:
+            issues = self.iter_issues(repo, since=today)  # 逐页获取今天的问题，边获取边写入
+        return self._write_daily_progress_file(repo, today, issues)
+
+    def _write_daily_progress_file(self, repo, today, issues):
+        # 将今天关闭的问题写入 Markdown 文件，issues 可以是列表或生成器
         repo_dir = os.path.join('daily_progress', repo.replace("/", "_"))  # 构建存储路径
         os.makedirs(repo_dir, exist_ok=True)  # 确保目录存在
         
@@ -75,18 +291,23 @@ class GitHubClient:
         with open(file_path, 'w') as file:
             file.write(f"# Daily Progress for {repo} ({today})\n\n")
             file.write("\n## Issues Closed Today\n")
-            for issue in updates['issues']:  # 写入今天关闭的问题
+            for issue in issues:  # 写入今天关闭的问题
                 file.write(f"- {issue['title']} #{issue['number']}\n")
         
         LOG.info(f"[{repo}]项目每日进展文件生成： {file_path}")  # 记录日志
         return file_path
 
     def export_progress_by_date_range(self, repo, days):
-        today = date.today()  # 获取当前日期
-        since = today - timedelta(days=days)  # 计算开始日期
-        
-        updates = self.fetch_updates(repo, since=since.isoformat(), until=today.isoformat())  # 获取指定日期范围内的更新
-        
+        since, today = date_range(days)  # 计算开始和结束日期
+        if self.sync_state:
+            issues = self.sync(repo, 'issues', since.isoformat(), today.isoformat())  # 只获取增量并与本地数据合并
+        else:
+            # 逐页获取指定日期范围内的问题，边获取边写入
+            issues = self.iter_issues(repo, since=since.isoformat(), until=today.isoformat())
+        return self._write_progress_file(repo, days, since, today, issues)
+
+    def _write_progress_file(self, repo, days, since, today, issues):
+        # 将指定日期范围内关闭的问题写入 Markdown 文件，issues 可以是列表或生成器
         repo_dir = os.path.join('daily_progress', repo.replace("/", "_"))  # 构建目录路径
         os.makedirs(repo_dir, exist_ok=True)  # 确保目录存在
         
@@ -97,8 +318,29 @@ class GitHubClient:
         with open(file_path, 'w') as file:
             file.write(f"# Progress for {repo} ({since} to {today})\n\n")
             file.write(f"\n## Issues Closed in the Last {days} Days\n")
-            for issue in updates['issues']:  # 写入在指定日期内关闭的问题
+            for issue in issues:  # 写入在指定日期内关闭的问题
                 file.write(f"- {issue['title']} #{issue['number']}\n")
         
         LOG.info(f"[{repo}]项目最新进展文件生成： {file_path}")  # 记录日志
         return file_path
+
+    def export_progress_batch(self, repos, days):
+        """
+        并发导出多个仓库指定日期范围内的进展。
+
+        :param repos: 仓库名称列表。
+        :param days: 导出最近多少天的进展。
+        :return: 生成器，按完成顺序逐个产出 (repo, file_path)。
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.export_progress_by_date_range, repo, days): repo for repo in repos}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+
+def _without_since(url, params):
+    # 去掉查询参数和 URL（后续页的 next 链接）中的 since，用于生成缓存键
+    parts = urlsplit(url)
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if name != 'since']
+    url = urlunsplit(parts._replace(query=urlencode(query)))
+    return url, {name: value for name, value in (params or {}).items() if name != 'since'}
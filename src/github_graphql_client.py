@@ -0,0 +1,242 @@
+import json  # 导入json库，用于生成 GraphQL 字符串字面量
+from datetime import date, timedelta  # 导入日期处理模块
+from concurrent.futures import ThreadPoolExecutor, as_completed  # 导入线程池用于并发请求
+from github_client import GitHubClient, DEFAULT_API_URL, MAX_RATE_LIMIT_RETRIES, PER_PAGE
+from time_utils import parse_time  # 导入时间解析函数
+from logger import LOG  # 导入日志模块
+
+RESOURCES = ('commits', 'issues', 'pull_requests')
+# 每类数据需要查询的连接：REST 的 /issues 接口同时返回 Pull Requests，GraphQL 的 issues 连接不包含，
+# 因此 Issues 由 issues 和 pullRequests 两个连接合并而成，两种后端导出的内容保持一致
+CONNECTIONS = {'commits': ('commits',), 'issues': ('issues', 'pull_requests'), 'pull_requests': ('pull_requests',)}
+
+# 只选择导出和报告需要的字段
+PAGE_INFO = 'pageInfo { hasNextPage endCursor }'
+COMMIT_FIELDS = 'nodes { oid message committedDate author { name } }'
+ISSUE_FIELDS = 'nodes { number title state closedAt updatedAt author { login } }'
+
+
+class GitHubGraphQLClient(GitHubClient):
+    def __init__(self, token, max_workers=8, cache=None, transport=None, sync_state=None, compact_records=False,
+                 api_url=DEFAULT_API_URL, batch_size=20):
+        """
+        基于 GitHub GraphQL API 的客户端，使用别名把多个仓库的 Commits、Issues 和 Pull Requests
+        合并到一次请求中，返回的数据结构与 GitHubClient 相同。
+
+        :param batch_size: 每次 GraphQL 请求包含的仓库数量。
+        """
+        super().__init__(token, max_workers, cache=cache, transport=transport, sync_state=sync_state,
+                         compact_records=compact_records, api_url=api_url)
+        self.batch_size = max(1, batch_size)
+        self.graphql_url = f'{self.api_url}/graphql'  # GitHub GraphQL API 地址
+
+    @classmethod
+    def from_config(cls, config, transport=None):
+        client = super().from_config(config, transport)
+        client.batch_size = max(1, config.github_graphql_batch_size)
+        return client
+
+    def fetch_updates(self, repo, since=None, until=None):
+        return self._fetch_batch([repo], since, until, RESOURCES)[repo]
+
+    def fetch_updates_batch(self, repos, since=None, until=None):
+        return self._fetch_batches(repos, since, until, RESOURCES)
+
+    def iter_commits(self, repo, since=None, until=None, strict=False):
+        return iter(self._fetch_batch([repo], since, until, ('commits',), strict)[repo]['commits'])
+
+    def iter_issues(self, repo, since=None, until=None, strict=False):
+        return iter(self._fetch_batch([repo], since, until, ('issues',), strict)[repo]['issues'])
+
+    def iter_pull_requests(self, repo, since=None, until=None, strict=False):
+        return iter(self._fetch_batch([repo], since, until, ('pull_requests',), strict)[repo]['pull_requests'])
+
+    def export_progress_batch(self, repos, days):
+        """
+        批量导出多个仓库指定日期范围内的进展，每次请求只获取导出所需的 Issues。
+
+        :return: 生成器，按完成顺序逐个产出 (repo, file_path)。
+        """
+        if self.sync_state:
+            # 增量同步时每个仓库的高水位不同，逐个仓库并发同步
+            yield from super().export_progress_batch(repos, days)
+            return
+        today = date.today()  # 获取当前日期
+        since = today - timedelta(days=days)  # 计算开始日期
+        for repo, updates in self._fetch_batches(repos, since.isoformat(), today.isoformat(), ('issues',)):
+            yield repo, self._write_progress_file(repo, days, since, today, updates['issues'])
+
+    def _fetch_batches(self, repos, since, until, resources):
+        # 将仓库按 batch_size 分组，各组并发请求，按完成顺序逐个产出 (repo, updates)
+        batches = [repos[i:i + self.batch_size] for i in range(0, len(repos), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._fetch_batch, batch, since, until, resources) for batch in batches]
+            for future in as_completed(futures):
+                yield from future.result().items()
+
+    def _fetch_batch(self, repos, since, until, resources, strict=False):
+        """
+        使用一次 GraphQL 请求获取一组仓库的数据，超过一页的连接再单独翻页。
+        strict 为 True 时获取失败会抛出异常，而不是返回空列表。
+
+        :return: {repo: {resource: [item, ...]}}
+        """
+        LOG.debug(f"准备通过 GraphQL 获取 {len(repos)} 个仓库的数据：{repos}")
+        since_time = parse_time(since) if since else None
+        names = [name for name in ('commits', 'issues', 'pull_requests')
+                 if any(name in CONNECTIONS[resource] for resource in resources)]
+        fields = [self._connection_query(name, since, until) for name in names]
+        try:
+            data = self._post_query(self._build_query(repos, fields), strict)
+        except Exception as e:
+            LOG.error(f"通过 GraphQL 获取 {repos} 失败：{str(e)}")
+            if strict:
+                raise
+            return {repo: {resource: [] for resource in resources} for repo in repos}
+
+        results = {}
+        for index, repo in enumerate(repos):
+            node = data.get(f'r{index}')
+            if node is None:
+                LOG.error(f"GraphQL 响应中缺少 {repo} 的数据（仓库不存在或无访问权限）")
+            collected = {}
+            for name in names:
+                items = collected[name] = []
+                connection = _connection(node, name)
+                while connection:
+                    finished = _collect(name, connection['nodes'], items, since_time)
+                    page_info = connection['pageInfo']
+                    if finished or not page_info['hasNextPage']:
+                        break
+                    # 该连接超过一页，单独请求下一页
+                    query = self._build_query([repo], [self._connection_query(name, since, until,
+                                                                              page_info['endCursor'])])
+                    try:
+                        connection = _connection(self._post_query(query, strict).get('r0'), name)
+                    except Exception as e:
+                        LOG.error(f"通过 GraphQL 获取 {repo} 的 {name} 下一页失败：{str(e)}")
+                        if strict:
+                            raise
+                        break
+            updates = {}
+            for resource in resources:
+                items = [item for name in CONNECTIONS[resource] for item in collected[name]]
+                if len(CONNECTIONS[resource]) > 1:
+                    items.sort(key=lambda item: item['updated_at'] or '', reverse=True)  # 与 REST 接口的排序一致
+                updates[resource] = [self._project(resource, item) for item in items]
+            results[repo] = updates
+        return results
+
+    def _post_query(self, query, strict=False):
+        """
+        发送 GraphQL 请求，遵循与 REST 请求相同的令牌池和速率限制策略。GraphQL 的速率限制以 200 响应中
+        type 为 RATE_LIMITED 的错误返回，同样暂停该令牌后重试。其他错误在 strict 为 True 时抛出异常，
+        否则记录日志并返回部分数据（部分仓库出错时其余仓库的数据仍然有效）。
+        """
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            token = self.rate_limiter.acquire()
+            headers = {'Authorization': f'bearer {token}'} if token else {}
+            response = self.transport.post(self.graphql_url, headers=headers, json={'query': query},
+                                           idempotent=True)  # 只读查询，可以安全重试
+            errors = _errors(response)
+            if not self.rate_limiter.update(token, response, rate_limited=_rate_limited(errors)):
+                break
+        response.raise_for_status()
+        if _rate_limited(errors):
+            raise RuntimeError(f"GraphQL 请求多次触发速率限制：{errors}")
+        if errors:
+            if strict:
+                raise RuntimeError(f"GraphQL 响应包含错误：{errors}")
+            LOG.error(f"GraphQL 响应包含错误：{errors}")
+        return response.json().get('data') or {}
+
+    @staticmethod
+    def _build_query(repos, fields):
+        # 为每个仓库生成带别名 r0、r1... 的 repository 查询
+        body = ' '.join(fields)
+        parts = []
+        for index, repo in enumerate(repos):
+            owner, name = repo.split('/', 1)
+            parts.append(f'r{index}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{ {body} }}')
+        return 'query { ' + ' '.join(parts) + ' }'
+
+    @staticmethod
+    def _connection_query(resource, since, until, after=None):
+        # 生成单个连接的查询片段，字段与 REST 接口的过滤条件保持一致
+        since = _literal(parse_time(since).isoformat() if since else None)
+        until = _literal(parse_time(until).isoformat() if until else None)
+        after = _literal(after)
+        if resource == 'commits':
+            return (f'defaultBranchRef {{ target {{ ... on Commit {{ '
+                    f'history(first: {PER_PAGE}, since: {since}, until: {until}, after: {after}) '
+                    f'{{ {PAGE_INFO} {COMMIT_FIELDS} }} }} }} }}')
+        if resource == 'issues':
+            return (f'issues(first: {PER_PAGE}, after: {after}, states: CLOSED, filterBy: {{since: {since}}}, '
+                    f'orderBy: {{field: UPDATED_AT, direction: DESC}}) {{ {PAGE_INFO} {ISSUE_FIELDS} }}')
+        # Pull Requests 不支持 since 过滤，按更新时间倒序读取，遇到早于 since 的数据即停止
+        return (f'pullRequests(first: {PER_PAGE}, after: {after}, states: [CLOSED, MERGED], '
+                f'orderBy: {{field: UPDATED_AT, direction: DESC}}) {{ {PAGE_INFO} {ISSUE_FIELDS} }}')
+
+
+def _errors(response):
+    # 返回 200 响应正文中的 GraphQL 错误列表
+    if response.status_code != 200:
+        return []
+    try:
+        return response.json().get('errors') or []
+    except ValueError:
+        return []
+
+
+def _rate_limited(errors):
+    return any(error.get('type') == 'RATE_LIMITED' for error in errors)
+
+
+def _literal(value):
+    # 将 Python 值转换为 GraphQL 字面量
+    return 'null' if value is None else json.dumps(value)
+
+
+def _connection(node, resource):
+    # 从 repository 节点中取出资源对应的连接，不存在时返回 None
+    if not node:
+        return None
+    if resource == 'commits':
+        target = (node.get('defaultBranchRef') or {}).get('target') or {}
+        return target.get('history')
+    return node.get('issues' if resource == 'issues' else 'pullRequests')
+
+
+def _collect(name, nodes, items, since_time):
+    # 将 GraphQL 节点转换为与 REST 接口相同的结构；遇到早于 since 的 Pull Request 时返回 True 表示停止翻页
+    for node in nodes:
+        if name == 'commits':
+            items.append(_convert_commit(node))
+            continue
+        if name == 'pull_requests' and since_time and parse_time(node['updatedAt']) < since_time:
+            return True
+        items.append(_convert_issue(node))
+    return False
+
+
+def _convert_commit(node):
+    author = node.get('author') or {}
+    return {
+        'sha': node['oid'],
+        'commit': {
+            'message': node['message'],
+            'author': {'name': author.get('name'), 'date': node.get('committedDate')},
+        },
+    }
+
+
+def _convert_issue(node):
+    author = node.get('author')
+    return {
+        'number': node['number'],
+        'title': node['title'],
+        'state': 'open' if node['state'] == 'OPEN' else 'closed',  # REST 接口中已合并的 PR 状态同样为 closed
+        'closed_at': node.get('closedAt'),
+        'updated_at': node.get('updatedAt'),
+        'user': {'login': author['login']} if author else None,
+    }
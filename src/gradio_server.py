@@ -1,20 +1,28 @@
+import asyncio  # 导入asyncio库，用于运行异步 GitHub 客户端
 import gradio as gr  # 导入gradio库用于创建GUI
 
 from config import Config  # 导入配置管理模块
-from github_client import GitHubClient  # 导入用于GitHub API操作的客户端
+from async_github_client import AsyncGitHubClient  # 导入异步GitHub客户端
+from github_backends import create_github_client  # 导入按配置选择后端的GitHub客户端工厂
 from hacker_news_client import HackerNewsClient
 from report_generator import ReportGenerator  # 导入报告生成器模块
 from llm import LLM  # 导入可能用于处理语言模型的LLM类
+from llm_cache import LLMCache  # 导入 LLM 响应缓存
+from llm_metrics import LLMMetrics  # 导入 LLM 调用指标
+from http_transport import HTTPTransport  # 导入共享的 HTTP 传输层
 from subscription_manager import SubscriptionManager  # 导入订阅管理器
 from logger import LOG  # 导入日志记录器
 
 # 创建各个组件的实例
 config = Config()
-github_client = GitHubClient(config.github_token)
-hacker_news_client = HackerNewsClient() # 创建 Hacker News 客户端实例
+transport = HTTPTransport.from_config(config)  # 各客户端共享的 HTTP 传输层
+github_client = create_github_client(config, transport)  # 根据配置创建 REST、GraphQL 或异步后端的GitHub客户端
+hacker_news_client = HackerNewsClient.from_config(config, transport) # 创建 Hacker News 客户端实例
 subscription_manager = SubscriptionManager(config.subscriptions_file)
+llm_cache = LLMCache.from_config(config)  # 各次请求共享的 LLM 响应缓存
+llm_metrics = LLMMetrics.from_config(config)  # 各次请求共享的 LLM 调用指标
 
-def generate_github_report(model_type, model_name, repo, days):
+async def generate_github_report(model_type, model_name, repo, days):
     config.llm_model_type = model_type
 
     if model_type == "openai":
@@ -22,14 +30,20 @@ def generate_github_report(model_type, model_name, repo, days):
     else:
         config.ollama_model_name = model_name
 
-    llm = LLM(config)  # 创建语言模型实例
-    report_generator = ReportGenerator(llm, config.report_types)  # 创建报告生成器实例
+    llm = LLM(config, transport, llm_cache, llm_metrics)  # 创建语言模型实例，重复点击生成时直接使用缓存
+    report_generator = ReportGenerator.from_config(llm, config)  # 创建报告生成器实例
 
     # 定义一个函数，用于导出和生成指定时间范围内项目的进展报告
-    raw_file_path = github_client.export_progress_by_date_range(repo, days)  # 导出原始数据文件路径
-    report, report_file_path = report_generator.generate_github_report(raw_file_path)  # 生成并获取报告内容及文件路径
-
-    return report, report_file_path  # 返回报告内容和报告文件路径
+    if isinstance(github_client, AsyncGitHubClient):
+        async with github_client:
+            raw_file_path = await github_client.export_progress_by_date_range(repo, days)  # 在 Gradio 的事件循环中直接获取
+    else:
+        raw_file_path = await asyncio.to_thread(github_client.export_progress_by_date_range, repo, days)
+    # 流式生成报告：每收到一段模型输出就刷新界面，生成完成后再提供文件下载；读取模型输出是阻塞操作，放到线程中执行
+    report, report_file_path = "", None
+    async for report, report_file_path in iterate_in_thread(report_generator.stream_github_report(raw_file_path)):
+        yield report, None
+    yield report, report_file_path  # 返回报告内容和报告文件路径
 
 def generate_hn_hour_topic(model_type, model_name):
     config.llm_model_type = model_type
@@ -39,13 +53,24 @@ def generate_hn_hour_topic(model_type, model_name):
     else:
         config.ollama_model_name = model_name
 
-    llm = LLM(config)  # 创建语言模型实例
-    report_generator = ReportGenerator(llm, config.report_types)  # 创建报告生成器实例
-
-    markdown_file_path = hacker_news_client.export_top_stories()
-    report, report_file_path = report_generator.generate_hn_topic_report(markdown_file_path)
-
-    return report, report_file_path  # 返回报告内容和报告文件路径
+    llm = LLM(config, transport, llm_cache, llm_metrics)  # 创建语言模型实例，重复点击生成时直接使用缓存
+    report_generator = ReportGenerator.from_config(llm, config)  # 创建报告生成器实例
+
+    markdown_file_path = hacker_news_client.export_top_stories(delta=False)  # 界面上始终总结完整的热门列表
+    # 流式生成报告，生成完成后再提供文件下载
+    report, report_file_path = "", None
+    for report, report_file_path in report_generator.stream_hn_topic_report(markdown_file_path):
+        yield report, None
+    yield report, report_file_path  # 返回报告内容和报告文件路径
+
+async def iterate_in_thread(iterator):
+    # 在线程中逐个读取同步生成器的结果，避免阻塞 Gradio 的事件循环
+    sentinel = object()
+    while True:
+        item = await asyncio.to_thread(next, iterator, sentinel)
+        if item is sentinel:
+            return
+        yield item
 
 
 # 定义一个回调函数，用于根据 Radio 组件的选择返回不同的 Dropdown 选项
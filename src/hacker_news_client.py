@@ -1,17 +1,63 @@
-import requests  # 导入requests库用于HTTP请求
-from bs4 import BeautifulSoup  # 导入BeautifulSoup库用于解析HTML内容
-from datetime import datetime  # 导入datetime模块用于获取日期和时间
+from datetime import datetime, timezone  # 导入datetime模块用于获取日期和时间
 import os  # 导入os模块用于文件和目录操作
+from concurrent.futures import ThreadPoolExecutor  # 导入线程池用于并发获取条目
+from article_fetcher import ArticleFetcher  # 导入链接文章获取器
+from hn_item_cache import HNItemCache  # 导入条目缓存
+from hn_parser import get_parser  # 导入可替换的首页 HTML 解析器
+from hn_snapshot_store import HNSnapshotStore  # 导入快照时序存储
+from http_transport import HTTPTransport  # 导入共享的 HTTP 传输层
+from seen_stories import SeenStoryIndex  # 导入已出现新闻的索引
 from logger import LOG  # 导入日志模块
 
+API_URL = 'https://hacker-news.firebaseio.com/v0'  # Hacker News 官方 Firebase API 地址
+
 class HackerNewsClient:
-    def __init__(self):
+    def __init__(self, transport=None, parser='stdlib', source='html', story_limit=100, max_workers=16,
+                 item_cache=None, seen_index=None, snapshot_store=None, article_fetcher=None):
+        """
+        :param parser: 首页 HTML 解析器：stdlib（流式，默认）、lxml 或 bs4。
+        :param source: 数据来源：html 抓取首页（30 条），api 使用官方 Firebase API。
+        :param story_limit: api 模式下获取的热门新闻条数（topstories 最多 500 条）。
+        :param max_workers: api 模式下并发获取条目的最大请求数。
+        :param item_cache: 可选的 HNItemCache 实例，未变化的条目不会重复获取。
+        :param seen_index: 可选的 SeenStoryIndex 实例，启用后导出时只列出新出现的新闻。
+        :param snapshot_store: 可选的 HNSnapshotStore 实例，导出时记录每条新闻的排名、分数和评论数。
+        :param article_fetcher: 可选的 ArticleFetcher 实例，导出时为新闻附上链接文章的正文摘录。
+        """
         self.url = 'https://news.ycombinator.com/'  # Hacker News的URL
+        self.api_url = API_URL
+        self.transport = transport or HTTPTransport()  # 复用连接并自动重试
+        self.parser = get_parser(parser)
+        self.source = source
+        self.story_limit = story_limit
+        self.max_workers = max(1, max_workers)
+        self.item_cache = item_cache if item_cache is not None else HNItemCache()
+        self.seen_index = seen_index
+        self.snapshot_store = snapshot_store
+        self.article_fetcher = article_fetcher
+        self._unmarked_stories = []  # 最近一次导出、尚未记入 seen_index 的新闻
+
+    @classmethod
+    def from_config(cls, config, transport=None):
+        """
+        根据配置对象创建 HackerNewsClient 实例。
+        """
+        item_cache = HNItemCache(config.hn_item_cache_path, ttl=config.hn_item_ttl)
+        seen_index = None
+        if config.hn_seen_index_path:
+            seen_index = SeenStoryIndex(config.hn_seen_index_path, config.hn_seen_window_hours)
+        snapshot_store = HNSnapshotStore(config.hn_snapshot_dir) if config.hn_snapshot_dir else None
+        article_fetcher = ArticleFetcher.from_config(config, transport) if config.hn_enrich_articles else None
+        return cls(transport, parser=config.hn_parser, source=config.hn_source, story_limit=config.hn_story_limit,
+                   max_workers=config.hn_max_concurrent_requests, item_cache=item_cache, seen_index=seen_index,
+                   snapshot_store=snapshot_store, article_fetcher=article_fetcher)
 
     def fetch_top_stories(self):
         LOG.debug("准备获取Hacker News的热门新闻。")
+        if self.source == 'api':
+            return self.fetch_top_stories_from_api()
         try:
-            response = requests.get(self.url, timeout=10)
+            response = self.transport.get(self.url)
             response.raise_for_status()  # 检查请求是否成功
             top_stories = self.parse_stories(response.text)  # 解析新闻数据
             return top_stories
@@ -19,29 +65,91 @@ class HackerNewsClient:
             LOG.error(f"获取Hacker News的热门新闻失败：{str(e)}")
             return []
 
+    def fetch_top_stories_from_api(self):
+        """
+        通过官方 Firebase API 获取热门新闻：读取 topstories 的前 story_limit 个 id，
+        并发获取缓存中没有、已过期或出现在 updates 变更列表中的条目。
+
+        :return: 与 parse_stories 结构相同的新闻列表，按排名排序。
+        """
+        try:
+            ids = self._get_json('topstories.json')[:self.story_limit]
+        except Exception as e:
+            LOG.error(f"获取Hacker News的热门新闻失败：{str(e)}")
+            return []
+        try:
+            # updates 接口返回最近分数或评论数发生变化的条目 id，这些条目需要重新获取
+            self.item_cache.invalidate(self._get_json('updates.json').get('items') or [])
+        except Exception as e:
+            LOG.warning(f"获取Hacker News的变更列表失败，仅按缓存有效期判断：{str(e)}")
+
+        items = {item_id: self.item_cache.get(item_id) for item_id in ids}
+        missing = [item_id for item_id, item in items.items() if item is None]
+        LOG.debug(f"Hacker News 热门新闻 {len(ids)} 条，需要获取 {len(missing)} 条，其余使用缓存。")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for item_id, item in zip(missing, executor.map(self._fetch_item, missing)):
+                items[item_id] = item
+                if item:
+                    self.item_cache.put(item)
+        self.item_cache.save()
+
+        top_stories = [_story_from_item(items[item_id], rank) for rank, item_id in enumerate(ids, start=1)
+                       if items[item_id] and not items[item_id].get('deleted') and not items[item_id].get('dead')]
+        LOG.info(f"成功获取 {len(top_stories)} 条Hacker News新闻。")
+        return top_stories
+
+    def _fetch_item(self, item_id):
+        # 获取单个条目，失败时返回 None（该条目在本次快照中被跳过）
+        try:
+            return self._get_json(f'item/{item_id}.json')
+        except Exception as e:
+            LOG.error(f"获取Hacker News条目 {item_id} 失败：{str(e)}")
+            return None
+
+    def _get_json(self, path):
+        response = self.transport.get(f'{self.api_url}/{path}')
+        response.raise_for_status()  # 检查请求是否成功
+        return response.json()
+
     def parse_stories(self, html_content):
         LOG.debug("解析Hacker News的HTML内容。")
-        soup = BeautifulSoup(html_content, 'html.parser')
-        stories = soup.find_all('tr', class_='athing')  # 查找所有包含新闻的<tr>标签
-        
-        top_stories = []
-        for story in stories:
-            title_tag = story.find('span', class_='titleline').find('a')
-            if title_tag:
-                title = title_tag.text
-                link = title_tag['href']
-                top_stories.append({'title': title, 'link': link})
-        
+        # 除标题和链接外，同时提取 id、排名、分数、作者、评论数和发布时间
+        top_stories = self.parser(html_content)
         LOG.info(f"成功解析 {len(top_stories)} 条Hacker News新闻。")
         return top_stories
 
-    def export_top_stories(self, date=None, hour=None):
+    def export_top_stories(self, date=None, hour=None, delta=None):
+        """
+        导出热门新闻到 hacker_news/{date}/{hour}.md。
+
+        :param delta: 为 True 时只完整列出时间窗口内新出现的新闻，之前出现过的新闻以精简的标题列表附在后面；
+                      没有新新闻时不生成文件并返回 None。默认在配置了 seen_index 时启用。
+                      导出的新闻不会立即记入 seen_index，需在报告生成成功后调用 mark_exported。
+        :return: 文件路径，没有可导出的新闻时返回 None。
+        """
         LOG.debug("准备导出Hacker News的热门新闻。")
         top_stories = self.fetch_top_stories()  # 获取新闻数据
         
         if not top_stories:
             LOG.warning("未找到任何Hacker News的新闻。")
             return None
+        if self.snapshot_store:
+            self.snapshot_store.append(top_stories)  # 记录完整快照，用于每日统计
+
+        trending_stories = []
+        if delta is None:
+            delta = self.seen_index is not None
+        if delta:
+            new_stories, trending_stories = self.seen_index.partition(top_stories)
+            LOG.info(f"Hacker News 新出现 {len(new_stories)} 条新闻，持续热门 {len(trending_stories)} 条。")
+            if not new_stories:
+                self.seen_index.mark(top_stories)  # 没有需要总结的新闻，只更新最近出现时间
+                LOG.info("没有新出现的Hacker News新闻，跳过导出。")
+                return None
+            self._unmarked_stories = top_stories
+            top_stories = new_stories
+        if self.article_fetcher:
+            self.article_fetcher.enrich(top_stories)  # 只为需要完整列出的新闻获取文章
         
         # 如果未提供 date 和 hour 参数，使用当前日期和时间
         if date is None:
@@ -56,12 +164,41 @@ class HackerNewsClient:
         file_path = os.path.join(dir_path, f'{hour}.md')  # 定义文件路径
         with open(file_path, 'w') as file:
             file.write(f"# Hacker News Top Stories ({date} {hour}:00)\n\n")
+            if trending_stories:
+                file.write("## New Stories\n\n")
             for idx, story in enumerate(top_stories, start=1):
                 file.write(f"{idx}. [{story['title']}]({story['link']})\n")
+                if story.get('excerpt'):
+                    file.write(f"   > {story['excerpt']}\n")
+            if trending_stories:
+                # 之前已总结过的新闻只列出标题，作为背景信息
+                file.write("\n## Still Trending\n\n")
+                for story in trending_stories:
+                    file.write(f"- {story['title']}\n")
         
         LOG.info(f"Hacker News热门新闻文件生成：{file_path}")
         return file_path
 
+    def mark_exported(self):
+        """
+        将最近一次增量导出的新闻记入 seen_index。应在热点话题报告生成成功后调用；
+        报告生成失败时不调用，这些新闻在下一次导出时仍视为新新闻。
+        """
+        if self.seen_index is not None and self._unmarked_stories:
+            self.seen_index.mark(self._unmarked_stories)
+        self._unmarked_stories = []
+
+
+def _story_from_item(item, rank):
+    # 将 API 条目转换为与 HTML 解析结果相同的结构；Ask HN 等没有外部链接的条目使用讨论页链接
+    posted_at = None
+    if item.get('time'):
+        posted_at = datetime.fromtimestamp(item['time'], timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+    return {'id': item['id'], 'rank': rank, 'title': item.get('title'),
+            'link': item.get('url') or f"https://news.ycombinator.com/item?id={item['id']}",
+            'score': item.get('score'), 'author': item.get('by'), 'comments': item.get('descendants'),
+            'age': None, 'posted_at': posted_at}
+
 
 if __name__ == "__main__":
     client = HackerNewsClient()
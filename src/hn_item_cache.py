@@ -0,0 +1,73 @@
+import json  # 导入json库用于读写缓存文件
+import os  # 导入os模块用于文件和目录操作
+import threading  # 导入threading库，保证多线程访问安全
+import time  # 导入time库，用于记录获取时间
+from logger import LOG  # 导入日志模块
+
+
+class HNItemCache:
+    def __init__(self, path=None, ttl=3600, max_items=5000, clock=time.time):
+        """
+        初始化 Hacker News 条目缓存，按条目 id 保存 item/<id> 接口返回的数据。
+        条目在 ttl 秒内、且未出现在 updates 接口的变更列表中时视为未变化，不需要重新获取。
+
+        :param path: 缓存文件路径，为空时只在内存中缓存。
+        :param ttl: 条目的最长有效时间（秒），超过后即使没有出现在变更列表中也重新获取分数和评论数。
+        :param max_items: 最多保留的条目数，超出时淘汰最早获取的条目。
+        :param clock: 获取当前时间戳的函数，便于测试。
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_items = max_items
+        self.clock = clock
+        self._entries = {}  # id -> {'item': 条目数据, 'fetched_at': 获取时间}
+        self._lock = threading.Lock()
+        self._load()
+
+    def get(self, item_id):
+        """
+        返回未过期的缓存条目，不存在或已过期时返回 None。
+        """
+        with self._lock:
+            entry = self._entries.get(item_id)
+            if entry and self.clock() - entry['fetched_at'] < self.ttl:
+                return entry['item']
+            return None
+
+    def put(self, item):
+        with self._lock:
+            self._entries[item['id']] = {'item': item, 'fetched_at': self.clock()}
+
+    def invalidate(self, item_ids):
+        """
+        使指定条目失效（例如 updates 接口报告分数或评论发生变化的条目）。
+        """
+        with self._lock:
+            for item_id in item_ids:
+                self._entries.pop(item_id, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def save(self):
+        # 淘汰超出上限的最早条目后写入文件；先写临时文件再替换，避免进程中断导致缓存损坏
+        if not self.path:
+            return
+        with self._lock:
+            if len(self._entries) > self.max_items:
+                newest = sorted(self._entries.items(), key=lambda pair: pair[1]['fetched_at'])[-self.max_items:]
+                self._entries = dict(newest)
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as file:
+                json.dump(list(self._entries.values()), file, ensure_ascii=False)
+            os.replace(self.path + '.tmp', self.path)
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                self._entries = {entry['item']['id']: entry for entry in json.load(file)}
+        except (OSError, ValueError, KeyError) as e:
+            LOG.warning(f"Hacker News 条目缓存损坏，将重新建立：{str(e)}")
@@ -0,0 +1,244 @@
+"""
+Hacker News 首页 HTML 解析器。
+
+提供三种可替换的实现，返回相同结构的新闻列表：
+- stdlib：基于 html.parser 的流式解析，只提取 tr.athing 行及其后的 subtext 行，不构建文档树（默认）；
+- lxml：基于 lxml 的 XPath 解析（需要安装 lxml）；
+- bs4：基于 BeautifulSoup 的解析（需要安装 beautifulsoup4）。
+
+每条新闻为字典：{'id', 'rank', 'title', 'link', 'score', 'author', 'comments', 'age', 'posted_at'}，
+招聘等没有 subtext 信息的条目对应字段为 None。
+
+基准测试：python src/hn_parser.py [HTML 文件]
+"""
+import re  # 导入re库，用于提取数字
+from html.parser import HTMLParser  # 导入标准库 HTML 解析器
+
+try:
+    from bs4 import BeautifulSoup  # 可选依赖
+except ImportError:
+    BeautifulSoup = None
+
+try:
+    import lxml.html  # 可选依赖
+except ImportError:
+    lxml = None
+
+NUMBER = re.compile(r'\d+')
+
+
+def _to_int(text):
+    # 从 "123 points"、"45 comments" 等文本中提取数字，没有数字（如 "discuss"）时返回 0
+    match = NUMBER.search(text or '')
+    return int(match.group()) if match else 0
+
+
+def _new_story(story_id):
+    return {'id': int(story_id) if story_id and story_id.isdigit() else None, 'rank': None, 'title': None,
+            'link': None, 'score': None, 'author': None, 'comments': None, 'age': None, 'posted_at': None}
+
+
+def _set_age(story, title, text):
+    # age 的 title 属性形如 "2024-08-20T10:00:00 1724148000"，取 ISO 时间部分
+    story['age'] = text.strip() or None
+    story['posted_at'] = title.split()[0] if title else None
+
+
+def _set_comments(story, text):
+    # subtext 中以 comment(s) 或 discuss 结尾的链接为评论数
+    text = text.replace('\xa0', ' ').strip()
+    if text.endswith(('comment', 'comments', 'discuss')):
+        story['comments'] = _to_int(text)
+
+
+class _StoryExtractor(HTMLParser):
+    """
+    流式提取新闻：遇到 tr.athing 时开始一条新闻，之后的 td.subtext 补充分数、作者、评论数和发布时间。
+    只在需要的标签内收集文本，不保存任何文档结构。
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stories = []
+        self._story = None  # 当前新闻
+        self._in_titleline = False  # 位于 span.titleline 内且尚未读到标题链接
+        self._in_subtext = False
+        self._field = None  # 正在收集文本的字段
+        self._end_tag = None  # 结束收集的标签
+        self._text = []
+        self._age_title = None
+
+    def handle_starttag(self, tag, attrs):
+        if self._field:
+            return  # 收集的文本内部的标签（如 age 中的链接）不需要处理
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if tag == 'tr':
+            self._in_subtext = False
+            if 'athing' in classes:
+                self._story = _new_story(attrs.get('id'))
+                self.stories.append(self._story)
+            return
+        if self._story is None:
+            return
+        if tag == 'span':
+            if 'titleline' in classes:
+                self._in_titleline = True
+            elif 'rank' in classes:
+                self._start('rank', 'span')
+            elif self._in_subtext and 'score' in classes:
+                self._start('score', 'span')
+            elif self._in_subtext and 'age' in classes:
+                self._age_title = attrs.get('title')
+                self._start('age', 'span')
+        elif tag == 'a':
+            if self._in_titleline:
+                self._in_titleline = False  # 只取第一个链接，忽略来源站点链接
+                self._story['link'] = attrs.get('href')
+                self._start('title', 'a')
+            elif self._in_subtext:
+                self._start('author' if 'hnuser' in classes else 'link_text', 'a')
+        elif tag == 'td' and 'subtext' in classes:
+            self._in_subtext = True
+
+    def handle_endtag(self, tag):
+        if not self._field or tag != self._end_tag:
+            return
+        text = ''.join(self._text)
+        field, self._field = self._field, None
+        story = self._story
+        if field == 'title':
+            story['title'] = text
+        elif field == 'rank':
+            story['rank'] = _to_int(text) or None
+        elif field == 'score':
+            story['score'] = _to_int(text)
+        elif field == 'author':
+            story['author'] = text
+        elif field == 'age':
+            _set_age(story, self._age_title, text)
+        else:
+            _set_comments(story, text)
+
+    def handle_data(self, data):
+        if self._field:
+            self._text.append(data)
+
+    def _start(self, field, end_tag):
+        self._field = field
+        self._end_tag = end_tag
+        self._text = []
+
+
+def parse_stdlib(html_content):
+    extractor = _StoryExtractor()
+    extractor.feed(html_content)
+    extractor.close()
+    return [story for story in extractor.stories if story['title'] is not None]
+
+
+def parse_lxml(html_content):
+    if lxml is None:
+        raise ImportError("使用 lxml 解析器需要安装 lxml")
+    document = lxml.html.fromstring(html_content)
+    stories = []
+    for row in document.xpath('//tr[contains(concat(" ", normalize-space(@class), " "), " athing ")]'):
+        title_tag = row.xpath('.//span[contains(@class, "titleline")]/a[1]')
+        if not title_tag:
+            continue
+        story = _new_story(row.get('id'))
+        story['title'] = title_tag[0].text_content()
+        story['link'] = title_tag[0].get('href')
+        rank = row.xpath('.//span[contains(@class, "rank")]')
+        story['rank'] = _to_int(rank[0].text_content()) or None if rank else None
+        subtext = row.xpath('following-sibling::tr[1]/td[contains(@class, "subtext")]')
+        if subtext:
+            _fill_subtext_lxml(story, subtext[0])
+        stories.append(story)
+    return stories
+
+
+def _fill_subtext_lxml(story, subtext):
+    score = subtext.xpath('.//span[contains(@class, "score")]')
+    if score:
+        story['score'] = _to_int(score[0].text_content())
+    author = subtext.xpath('.//a[contains(@class, "hnuser")]')
+    if author:
+        story['author'] = author[0].text_content()
+    age = subtext.xpath('.//span[contains(@class, "age")]')
+    if age:
+        _set_age(story, age[0].get('title'), age[0].text_content())
+    for link in subtext.xpath('.//a[not(contains(@class, "hnuser"))]'):
+        _set_comments(story, link.text_content())
+
+
+def parse_bs4(html_content):
+    if BeautifulSoup is None:
+        raise ImportError("使用 bs4 解析器需要安装 beautifulsoup4")
+    soup = BeautifulSoup(html_content, 'html.parser')
+    stories = []
+    for row in soup.find_all('tr', class_='athing'):  # 查找所有包含新闻的<tr>标签
+        titleline = row.find('span', class_='titleline')
+        title_tag = titleline.find('a') if titleline else None
+        if not title_tag:
+            continue
+        story = _new_story(row.get('id'))
+        story['title'] = title_tag.text
+        story['link'] = title_tag['href']
+        rank = row.find('span', class_='rank')
+        story['rank'] = _to_int(rank.text) or None if rank else None
+        subtext_row = row.find_next_sibling('tr')
+        subtext = subtext_row.find('td', class_='subtext') if subtext_row else None
+        if subtext:
+            score = subtext.find('span', class_='score')
+            if score:
+                story['score'] = _to_int(score.text)
+            author = subtext.find('a', class_='hnuser')
+            if author:
+                story['author'] = author.text
+            age = subtext.find('span', class_='age')
+            if age:
+                _set_age(story, age.get('title'), age.text)
+            for link in subtext.find_all('a'):
+                if 'hnuser' not in (link.get('class') or []):
+                    _set_comments(story, link.text)
+        stories.append(story)
+    return stories
+
+
+PARSERS = {'stdlib': parse_stdlib, 'lxml': parse_lxml, 'bs4': parse_bs4}
+
+
+def get_parser(name='stdlib'):
+    """
+    按名称返回解析函数，未知名称时抛出 ValueError。
+    """
+    if name not in PARSERS:
+        raise ValueError(f"未知的 Hacker News 解析器：{name}，可选值：{', '.join(PARSERS)}")
+    return PARSERS[name]
+
+
+if __name__ == '__main__':
+    # 基准测试：比较各解析器解析同一份首页 HTML 的耗时
+    import os
+    import sys
+    import timeit
+
+    default_path = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures', 'hacker_news', 'front_page.html')
+    with open(sys.argv[1] if len(sys.argv) > 1 else default_path, 'r', encoding='utf-8') as file:
+        html = file.read()
+
+    results = {}
+    for name, parser in PARSERS.items():
+        try:
+            count = len(parser(html))
+        except ImportError as e:
+            print(f"{name:>6}：跳过（{e}）")
+            continue
+        runs = 50
+        results[name] = min(timeit.repeat(lambda: parser(html), number=runs, repeat=3)) / runs
+        print(f"{name:>6}：{results[name] * 1000:.2f} 毫秒/页，解析出 {count} 条新闻")
+    if 'bs4' in results:
+        for name, seconds in results.items():
+            if name != 'bs4':
+                print(f"{name} 相对 bs4 加速 {results['bs4'] / seconds:.1f} 倍")
@@ -0,0 +1,225 @@
+import json  # 导入json库用于读写快照数据
+import os  # 导入os模块用于文件和目录操作
+import threading  # 导入threading库，保证多线程访问安全
+import time  # 导入time库，用于记录快照时间
+from datetime import datetime  # 导入datetime模块用于格式化日期
+from logger import LOG  # 导入日志模块
+
+try:
+    import numpy as np  # 可选依赖：安装后使用列式数组压缩存储，并以向量化方式统计
+except ImportError:
+    np = None
+
+COLUMNS = ('t', 'id', 'rank', 'score', 'comments')  # 每条观测记录的列：快照时间、条目 id、排名、分数、评论数
+DTYPES = ('int64', 'int64', 'int32', 'int32', 'int32')
+
+
+class HNSnapshotStore:
+    def __init__(self, data_dir, compact_threshold=5000, clock=time.time):
+        """
+        初始化 Hacker News 快照存储。每次快照中的每条新闻记录为一条观测 (t, id, rank, score, comments)，
+        以 JSONL 追加写入 observations.jsonl；标题和链接等元数据按 id 只保存一次（stories.jsonl）。
+        安装了 numpy 时，观测数超过 compact_threshold 后压缩为列式的 observations.npz。
+
+        :param data_dir: 数据目录。
+        :param compact_threshold: 触发压缩的 JSONL 观测条数。
+        :param clock: 获取当前时间戳的函数，便于测试。
+        """
+        self.data_dir = data_dir
+        self.compact_threshold = compact_threshold
+        self.clock = clock
+        self.observations_file = os.path.join(data_dir, 'observations.jsonl')
+        self.stories_file = os.path.join(data_dir, 'stories.jsonl')
+        self.columns_file = os.path.join(data_dir, 'observations.npz')
+        self._lock = threading.Lock()
+        os.makedirs(data_dir, exist_ok=True)  # 确保目录存在
+        self.stories = self._load_stories()  # id -> {'title', 'link', 'posted_at'}
+        self._pending = self._count_lines(self.observations_file)  # 尚未压缩的观测条数
+
+    def append(self, stories, timestamp=None):
+        """
+        追加一次快照。没有 id 的新闻无法跨快照关联，会被忽略。
+        """
+        timestamp = int(timestamp if timestamp is not None else self.clock())
+        rows = []
+        new_stories = []
+        for rank, story in enumerate(stories, start=1):
+            if not story.get('id'):
+                continue
+            rows.append([timestamp, story['id'], story.get('rank') or rank, story.get('score') or 0,
+                         story.get('comments') or 0])
+            if story['id'] not in self.stories:
+                meta = {'id': story['id'], 'title': story.get('title'), 'link': story.get('link'),
+                        'posted_at': story.get('posted_at')}
+                new_stories.append(meta)
+        with self._lock:
+            with open(self.observations_file, 'a', encoding='utf-8') as file:
+                file.writelines(json.dumps(row) + '\n' for row in rows)
+            with open(self.stories_file, 'a', encoding='utf-8') as file:
+                for meta in new_stories:
+                    self.stories[meta['id']] = meta
+                    file.write(json.dumps(meta, ensure_ascii=False) + '\n')
+            self._pending += len(rows)
+            if np is not None and self._pending >= self.compact_threshold:
+                self._compact()
+        LOG.debug(f"Hacker News 快照已保存：{len(rows)} 条观测，新增 {len(new_stories)} 条新闻。")
+
+    def compact(self):
+        """
+        将 JSONL 中的观测合并到列式的 observations.npz（需要 numpy）。
+        """
+        if np is None:
+            LOG.warning("未安装 numpy，快照保持 JSONL 格式。")
+            return
+        with self._lock:
+            self._compact()
+
+    def top_movers(self, hours=24, limit=10):
+        """
+        返回最近 hours 小时内分数上升最多的新闻。
+        """
+        return _top_movers(self._groups(hours), limit)
+
+    def longest_on_front_page(self, hours=24, limit=10):
+        """
+        返回最近 hours 小时内出现在快照中次数最多（停留最久）的新闻。
+        """
+        return _longest_on_front_page(self._groups(hours), limit)
+
+    def summary_markdown(self, hours=24, limit=15):
+        """
+        生成最近 hours 小时的统计摘要（Markdown），作为每日趋势报告的输入。
+        时间窗口内没有任何观测时返回 None，由调用方改用其他输入。
+        """
+        groups = self._groups(hours)
+        if not groups:
+            return None
+        date = datetime.fromtimestamp(self.clock()).strftime('%Y-%m-%d')
+        lines = [f"# Hacker News Statistics ({date}, last {hours} hours)\n"]
+        lines.append("\n## Longest on Front Page\n")
+        for idx, group in enumerate(_longest_on_front_page(groups, limit), start=1):
+            lines.append(f"{idx}. [{group['title']}]({group['link']}) - {group['snapshots']} snapshots, "
+                         f"best rank {group['best_rank']}, {group['score']} points, {group['comments']} comments\n")
+        lines.append("\n## Top Movers\n")
+        for idx, group in enumerate(_top_movers(groups, limit), start=1):
+            lines.append(f"{idx}. [{group['title']}]({group['link']}) - +{group['score_delta']} points, "
+                         f"+{group['comments_delta']} comments\n")
+        return ''.join(lines)
+
+    def _groups(self, hours):
+        # 按条目 id 聚合时间窗口内的观测：快照次数、最好排名以及首末两次观测的分数和评论数
+        since = int(self.clock() - hours * 3600)
+        columns = self._load_columns(since)
+        aggregate = _aggregate_numpy if np is not None else _aggregate_python
+        groups = aggregate(columns)
+        for group in groups:
+            meta = self.stories.get(group['id'], {})
+            group['title'] = meta.get('title')
+            group['link'] = meta.get('link')
+        return groups
+
+    def _load_columns(self, since):
+        # 读取 t >= since 的观测，安装 numpy 时返回数组，否则返回列表
+        with self._lock:
+            rows = []
+            if os.path.exists(self.observations_file):
+                with open(self.observations_file, 'r', encoding='utf-8') as file:
+                    rows = [row for row in map(json.loads, file) if row[0] >= since]
+            if np is None:
+                return {name: [row[index] for row in rows] for index, name in enumerate(COLUMNS)}
+            columns = self._read_compacted()
+            mask = columns['t'] >= since
+            recent = _to_arrays(rows)
+            return {name: np.concatenate([columns[name][mask], recent[name]]) for name in COLUMNS}
+
+    def _compact(self):
+        # 合并已压缩的列和 JSONL 中的观测，写入新的 npz 后清空 JSONL（调用方需持有锁）
+        rows = []
+        if os.path.exists(self.observations_file):
+            with open(self.observations_file, 'r', encoding='utf-8') as file:
+                rows = [json.loads(line) for line in file]
+        if not rows:
+            return
+        existing = self._read_compacted()
+        recent = _to_arrays(rows)
+        merged = {name: np.concatenate([existing[name], recent[name]]) for name in COLUMNS}
+        with open(self.columns_file + '.tmp', 'wb') as file:
+            np.savez(file, **merged)
+        os.replace(self.columns_file + '.tmp', self.columns_file)
+        open(self.observations_file, 'w').close()
+        self._pending = 0
+        LOG.info(f"Hacker News 快照已压缩：共 {len(merged['t'])} 条观测。")
+
+    def _read_compacted(self):
+        if not os.path.exists(self.columns_file):
+            return _to_arrays([])
+        with np.load(self.columns_file) as data:
+            return {name: data[name] for name in COLUMNS}
+
+    def _load_stories(self):
+        stories = {}
+        if os.path.exists(self.stories_file):
+            with open(self.stories_file, 'r', encoding='utf-8') as file:
+                for line in file:
+                    meta = json.loads(line)
+                    stories[meta['id']] = meta
+        return stories
+
+    @staticmethod
+    def _count_lines(path):
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as file:
+            return sum(1 for _ in file)
+
+
+def _top_movers(groups, limit):
+    return sorted(groups, key=lambda group: group['score_delta'], reverse=True)[:limit]
+
+
+def _longest_on_front_page(groups, limit):
+    return sorted(groups, key=lambda group: (group['snapshots'], -group['best_rank']), reverse=True)[:limit]
+
+
+def _to_arrays(rows):
+    return {name: np.array([row[index] for row in rows], dtype=dtype)
+            for index, (name, dtype) in enumerate(zip(COLUMNS, DTYPES))}
+
+
+def _aggregate_numpy(columns):
+    # 按 (id, t) 排序后找到每个 id 的起止位置，用向量化操作计算各项统计
+    if not len(columns['id']):
+        return []
+    order = np.lexsort((columns['t'], columns['id']))
+    ids, ranks, scores, comments = (columns[name][order] for name in ('id', 'rank', 'score', 'comments'))
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], len(ids)] - 1
+    snapshots = ends - starts + 1
+    best_ranks = np.minimum.reduceat(ranks, starts)
+    score_deltas = scores[ends] - scores[starts]
+    comment_deltas = comments[ends] - comments[starts]
+    return [{'id': int(ids[start]), 'snapshots': int(count), 'best_rank': int(best_rank),
+             'score': int(scores[end]), 'comments': int(comments[end]),
+             'score_delta': int(score_delta), 'comments_delta': int(comment_delta)}
+            for start, end, count, best_rank, score_delta, comment_delta
+            in zip(starts, ends, snapshots, best_ranks, score_deltas, comment_deltas)]
+
+
+def _aggregate_python(columns):
+    # 未安装 numpy 时的等价实现
+    groups = {}
+    for t, item_id, rank, score, comment_count in sorted(zip(*(columns[name] for name in COLUMNS))):
+        group = groups.get(item_id)
+        if group is None:
+            group = groups[item_id] = {'id': item_id, 'snapshots': 0, 'best_rank': rank,
+                                       'first_score': score, 'first_comments': comment_count}
+        group['snapshots'] += 1
+        group['best_rank'] = min(group['best_rank'], rank)
+        group['score'] = score
+        group['comments'] = comment_count
+    result = []
+    for group in sorted(groups.values(), key=lambda group: group['id']):
+        group['score_delta'] = group['score'] - group.pop('first_score')
+        group['comments_delta'] = group['comments'] - group.pop('first_comments')
+        result.append(group)
+    return result
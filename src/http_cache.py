@@ -0,0 +1,124 @@
+import hashlib  # 导入hashlib库用于生成缓存键
+import json  # 导入json库用于读写缓存文件
+import os  # 导入os模块用于文件和目录操作
+import threading  # 导入threading库，保证多线程访问安全
+from collections import OrderedDict  # 导入有序字典，用于维护 LRU 顺序
+from logger import LOG  # 导入日志模块
+
+
+class HTTPCache:
+    def __init__(self, cache_dir, max_entries=5000, max_bytes=200 * 1024 * 1024):
+        """
+        初始化磁盘缓存，每个条目保存为一个 JSON 文件，按最近使用顺序淘汰。
+
+        :param cache_dir: 缓存目录。
+        :param max_entries: 最多保留的条目数。
+        :param max_bytes: 所有条目文件的总大小上限（字节）。
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.index_file = os.path.join(cache_dir, 'index.json')  # 记录条目大小和使用顺序的索引文件
+        self.hits = 0  # 命中次数（无需重新下载）
+        self.misses = 0  # 未命中次数（需要完整下载）
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)  # 确保目录存在
+        self.index = self._load_index()
+
+    @staticmethod
+    def make_key(url, params=None):
+        """
+        根据 URL 和查询参数生成缓存键，值为 None 的参数会被忽略（与 requests 行为一致）。
+        """
+        items = sorted((k, str(v)) for k, v in (params or {}).items() if v is not None)
+        raw = json.dumps([url, items], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        读取缓存条目，并将其标记为最近使用；不存在时返回 None。
+        """
+        with self._lock:
+            if key not in self.index:
+                return None
+            try:
+                with open(self._entry_path(key), 'r', encoding='utf-8') as file:
+                    entry = json.load(file)
+            except (OSError, ValueError) as e:
+                LOG.warning(f"读取缓存条目失败，已丢弃：{str(e)}")
+                self._remove(key)
+                return None
+            self.index.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        """
+        写入缓存条目，超出条目数或总大小上限时淘汰最久未使用的条目。
+        """
+        data = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+        with self._lock:
+            if key in self.index:
+                self._remove(key)
+            with open(self._entry_path(key), 'wb') as file:
+                file.write(data)
+            self.index[key] = len(data)
+            self.total_bytes += len(data)
+            while self.index and (len(self.index) > self.max_entries or self.total_bytes > self.max_bytes):
+                oldest = next(iter(self.index))
+                self._remove(oldest)
+            self._save_index()
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def stats(self):
+        """
+        返回缓存统计信息。
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self.index),
+                'bytes': self.total_bytes,
+            }
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def _remove(self, key):
+        # 删除条目文件并更新索引（调用方需持有锁）
+        self.total_bytes -= self.index.pop(key, 0)
+        try:
+            os.remove(self._entry_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _load_index(self):
+        # 加载索引，忽略已不存在的条目文件
+        index = OrderedDict()
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r') as file:
+                    for key, size in json.load(file):
+                        if os.path.exists(self._entry_path(key)):
+                            index[key] = size
+            except (OSError, ValueError) as e:
+                LOG.warning(f"缓存索引损坏，将重新建立：{str(e)}")
+        self.total_bytes = sum(index.values())
+        return index
+
+    def _save_index(self):
+        # 先写临时文件再替换，避免进程中断导致索引损坏（调用方需持有锁）
+        tmp_file = self.index_file + '.tmp'
+        with open(tmp_file, 'w') as file:
+            json.dump(list(self.index.items()), file)
+        os.replace(tmp_file, self.index_file)
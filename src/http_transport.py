@@ -0,0 +1,127 @@
+import threading  # 导入threading库，保证多线程访问安全
+import time  # 导入time库，用于统计请求耗时
+from collections import deque  # 导入双端队列，用于保存最近的耗时样本
+from urllib.parse import urlsplit  # 导入URL解析函数，用于按主机区分会话
+
+import requests  # 导入requests库用于HTTP请求
+from requests.adapters import HTTPAdapter  # 导入HTTP适配器，用于配置连接池和重试
+from urllib3.util.retry import Retry  # 导入重试策略
+
+RETRY_STATUSES = (500, 502, 503, 504)  # 需要自动重试的服务端错误状态码
+LATENCY_SAMPLES = 1000  # 每个主机保留的最近耗时样本数
+
+
+class HTTPTransport:
+    def __init__(self, pool_maxsize=16, max_retries=3, backoff_factor=0.5, connect_timeout=5, read_timeout=30):
+        """
+        初始化共享的 HTTP 传输层：每个主机使用一个持久化的 Session，复用 TCP/TLS 连接，
+        对连接错误和 5xx 响应按指数退避自动重试，并统计每个主机的请求耗时。
+        非幂等的请求（默认包括 POST）只在连接失败、请求尚未发出时重试，避免超时的 LLM 生成被重复执行。
+
+        :param pool_maxsize: 每个主机连接池的最大连接数，应不小于并发请求数。
+        :param max_retries: 连接错误和 5xx 响应的最大重试次数。
+        :param backoff_factor: 指数退避系数，第 n 次重试前等待 backoff_factor * 2^(n-1) 秒。
+        :param connect_timeout: 默认连接超时（秒）。
+        :param read_timeout: 默认读取超时（秒）。
+        """
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = (connect_timeout, read_timeout)
+        self._sessions = {}  # (主机, 是否幂等) -> Session
+        self._latencies = {}  # 主机 -> 最近的耗时样本（秒）
+        self._counters = {}  # 主机 -> {'requests': 请求数, 'errors': 失败数}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        根据配置对象创建 HTTPTransport 实例，连接池大小不小于 GitHub 并发请求数。
+        """
+        network = config.network
+        return cls(
+            pool_maxsize=max(network.get('pool_maxsize', 16), config.github_max_concurrent_requests),
+            max_retries=network.get('max_retries', 3),
+            backoff_factor=network.get('backoff_factor', 0.5),
+            connect_timeout=network.get('connect_timeout', 5),
+            read_timeout=network.get('read_timeout', 30),
+        )
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, timeout=None, idempotent=None, **kwargs):
+        """
+        通过对应主机的 Session 发送请求，未指定 timeout 时使用默认的连接和读取超时。
+
+        :param idempotent: 请求是否可以安全地重复执行，为空时按方法判断（GET、HEAD 等为幂等，POST 不是）。
+                           只读的 POST 请求（如 GraphQL 查询）可以传入 True，读取超时和 5xx 响应时同样重试。
+        """
+        host = urlsplit(url).netloc
+        if idempotent is None:
+            idempotent = method.upper() in Retry.DEFAULT_ALLOWED_METHODS
+        session = self._session(url, idempotent)
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            self._record(host, time.perf_counter() - start, failed)
+
+    def stats(self):
+        """
+        返回每个主机的请求统计：请求数、失败数以及耗时（毫秒）的平均值、P50、P95 和最大值。
+        """
+        with self._lock:
+            result = {}
+            for host, samples in self._latencies.items():
+                ordered = sorted(samples)
+                result[host] = dict(self._counters[host])
+                if ordered:
+                    result[host].update({
+                        'avg_ms': round(sum(ordered) / len(ordered) * 1000, 1),
+                        'p50_ms': round(ordered[len(ordered) // 2] * 1000, 1),
+                        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+                        'max_ms': round(ordered[-1] * 1000, 1),
+                    })
+            return result
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def _session(self, url, idempotent):
+        # 获取（必要时创建）对应主机的 Session；幂等和非幂等请求使用不同的重试策略
+        parts = urlsplit(url)
+        base = f'{parts.scheme}://{parts.netloc}'
+        with self._lock:
+            session = self._sessions.get((base, idempotent))
+            if session is None:
+                retry = Retry(
+                    total=self.max_retries,
+                    read=None if idempotent else 0,  # 非幂等请求读取超时时服务端可能已在处理，不再重试
+                    status=None if idempotent else 0,
+                    backoff_factor=self.backoff_factor,
+                    status_forcelist=RETRY_STATUSES,
+                    allowed_methods=None,  # 是否幂等已由调用方决定
+                    raise_on_status=False,  # 重试用尽后返回最后一次响应，由调用方处理
+                )
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=retry)
+                session = requests.Session()
+                session.mount(base, adapter)
+                self._sessions[(base, idempotent)] = session
+            return session
+
+    def _record(self, host, elapsed, failed):
+        with self._lock:
+            self._latencies.setdefault(host, deque(maxlen=LATENCY_SAMPLES)).append(elapsed)
+            counters = self._counters.setdefault(host, {'requests': 0, 'errors': 0})
+            counters['requests'] += 1
+            counters['errors'] += int(failed)
@@ -1,51 +1,318 @@
 import json
-import requests
+import threading  # 导入threading库，保证多线程访问安全
+import time  # 导入time库，用于测量调用耗时
 from openai import OpenAI  # 导入OpenAI库用于访问GPT模型
+from http_transport import HTTPTransport  # 导入共享的 HTTP 传输层
+from llm_cache import LLMCache  # 导入 LLM 响应缓存
+from openai_batch import OpenAIBatchClient  # 导入 OpenAI Batch API 客户端
 from logger import LOG  # 导入日志模块
 
+OLLAMA_OPTIONS = {"max_tokens": 4000, "temperature": 0.7}  # Ollama 的采样参数
+COLD_LOAD_SECONDS = 0.5  # load_duration 超过该值时视为模型被重新加载
+NANOSECONDS = 1e9  # Ollama 响应中的耗时单位为纳秒
+
 class LLM:
-    def __init__(self, config):
+    def __init__(self, config, transport=None, cache=None, metrics=None):
         """
         初始化 LLM 类，根据配置选择使用的模型（OpenAI 或 Ollama）。
 
         :param config: 配置对象，包含所有的模型配置参数。
+        :param transport: 可选的共享 HTTPTransport 实例，用于请求 Ollama API。
+        :param cache: 可选的 LLMCache 实例，相同的请求直接返回缓存的结果。
+        :param metrics: 可选的 LLMMetrics 实例，记录每次调用的 token 数和耗时。
         """
         self.config = config
+        self.transport = transport or HTTPTransport()
+        self.cache = cache
+        self.metrics = metrics
+        # Ollama 模型在最后一次请求后保留在内存中的时间（如 "5m" 或秒数），为空时使用 Ollama 的默认值
+        self.keep_alive = config.ollama_keep_alive
+        self._metrics = {'requests': 0, 'cold_loads': 0, 'load_s': 0.0, 'prompt_eval_count': 0,
+                         'prompt_eval_s': 0.0, 'eval_count': 0, 'eval_s': 0.0}
+        self._lock = threading.Lock()
         self.model = config.llm_model_type.lower()  # 获取模型类型并转换为小写
         if self.model == "openai":
             self.client = OpenAI()  # 创建OpenAI客户端实例
+            # 批量生成使用 Batch API，api_url 可指向本地 fake_openai_server
+            self.batch_client = OpenAIBatchClient(config.openai_api_url, transport=self.transport,
+                                                  poll_interval=config.llm_batch_poll_interval,
+                                                  timeout=config.llm_batch_timeout)
         elif self.model == "ollama":
             self.api_url = config.ollama_api_url  # 设置Ollama API的URL
         else:
             LOG.error(f"不支持的模型类型: {self.model}")
             raise ValueError(f"不支持的模型类型: {self.model}")  # 如果模型类型不支持，抛出错误
 
-    def generate_report(self, system_prompt, user_content):
+    @property
+    def model_name(self):
+        """
+        当前使用的具体模型名称，例如 gpt-4o-mini 或 llama3.1。
+        """
+        return self.config.openai_model_name if self.model == "openai" else self.config.ollama_model_name
+
+    @property
+    def sampling_params(self):
+        """
+        当前后端使用的采样参数，作为缓存键的一部分。
+        """
+        return OLLAMA_OPTIONS if self.model == "ollama" else {}
+
+    def generate_report(self, system_prompt, user_content, report_type=None):
         """
         生成报告，根据配置选择不同的模型来处理请求。
 
         :param system_prompt: 系统提示信息，包含上下文和规则。
         :param user_content: 用户提供的内容，通常是Markdown格式的文本。
+        :param report_type: 报告类型，用于按类型统计调用指标。
         :return: 生成的报告内容。
         """
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_content},
-        ]
+        messages = self._messages(system_prompt, user_content)
+        key, report = self._cached(system_prompt, user_content)
+        if report is not None:
+            return report
+
+        # 根据选择的模型调用相应的生成报告方法，后端方法将 token 数和耗时写入 usage
+        usage = {}
+        started_at = time.monotonic()
+        if self.model == "openai":
+            report = self._generate_report_openai(messages, usage)
+        elif self.model == "ollama":
+            report = self._generate_report_ollama(messages, usage)
+        else:
+            raise ValueError(f"不支持的模型类型: {self.model}")
+        self._record_call(report_type, usage, time.monotonic() - started_at)
+        if self.cache:
+            self.cache.put(key, report)
+        return report
+
+    def stream_report(self, system_prompt, user_content, report_type=None):
+        """
+        以流式方式生成报告，逐段返回模型输出的文本增量。命中缓存时一次性返回完整报告。
+
+        :param system_prompt: 系统提示信息，包含上下文和规则。
+        :param user_content: 用户提供的内容，通常是Markdown格式的文本。
+        :param report_type: 报告类型，用于按类型统计调用指标。
+        :return: 文本增量的生成器。
+        """
+        messages = self._messages(system_prompt, user_content)
+        key, report = self._cached(system_prompt, user_content)
+        if report is not None:
+            yield report
+            return
 
-        # 根据选择的模型调用相应的生成报告方法
+        usage = {}
+        started_at = time.monotonic()
         if self.model == "openai":
-            return self._generate_report_openai(messages)
+            deltas = self._stream_report_openai(messages, usage)
         elif self.model == "ollama":
-            return self._generate_report_ollama(messages)
+            deltas = self._stream_report_ollama(messages, usage)
         else:
             raise ValueError(f"不支持的模型类型: {self.model}")
+        parts = []
+        for delta in deltas:
+            if not parts:
+                usage.setdefault('ttft_s', time.monotonic() - started_at)  # 收到第一段文本的时间
+            parts.append(delta)
+            yield delta
+        self._record_call(report_type, usage, time.monotonic() - started_at)
+        if self.cache:
+            self.cache.put(key, ''.join(parts))  # 完整生成后才写入缓存
+
+    def submit_batch(self, requests):
+        """
+        提交批量生成，不等待结果：OpenAI 后端将所有未命中缓存的请求作为一个 Batch API 任务提交；
+        Ollama 没有批量接口，在本地依次生成。结果通过 collect_batch 获取。
+
+        :param requests: {custom_id: (system_prompt, user_content, report_type)} 字典。
+        :return: 可序列化为 JSON 的任务描述，守护进程重启后仍可用于 collect_batch。
+        """
+        job = {'batch_id': None, 'submitted_at': time.time(), 'reports': {}, 'pending': {}}
+        pending = {}
+        for custom_id, (system_prompt, user_content, report_type) in requests.items():
+            key, report = self._cached(system_prompt, user_content)
+            if report is not None:
+                job['reports'][custom_id] = report
+            else:
+                pending[custom_id] = (system_prompt, user_content, report_type)
+                job['pending'][custom_id] = [key, report_type]  # 结果返回后写入缓存和指标
+
+        if not pending:
+            return job
+        if self.model != "openai":
+            for custom_id, (system_prompt, user_content, report_type) in pending.items():
+                try:
+                    job['reports'][custom_id] = self.generate_report(system_prompt, user_content,
+                                                                     report_type=report_type)
+                except Exception as e:
+                    LOG.error(f"批量请求 {custom_id} 生成失败：{e}")
+            job['pending'] = {}
+            return job
+
+        LOG.info(f"使用 OpenAI {self.config.openai_model_name} 模型批量生成 {len(pending)} 个报告。")
+        job['batch_id'] = self.batch_client.submit(self.config.openai_model_name, {
+            custom_id: self._messages(system_prompt, user_content)
+            for custom_id, (system_prompt, user_content, _) in pending.items()})
+        return job
+
+    def collect_batch(self, job):
+        """
+        查询一次 submit_batch 提交的任务。
+
+        :return: 任务未完成时返回 None；完成后返回 {custom_id: 报告内容}，生成失败的请求不包含在结果中。
+        :raises RuntimeError: Batch API 任务失败、过期、被取消或超时。
+        """
+        reports = dict(job['reports'])
+        if job['batch_id'] is None:
+            return reports
+        results = self.batch_client.poll(job['batch_id'])
+        if results is None:
+            return None
+        latency = time.time() - job['submitted_at']  # 总耗时为整个批量任务的耗时
+        for custom_id, (report, usage) in results.items():
+            key, report_type = job['pending'][custom_id]
+            reports[custom_id] = report
+            if self.metrics:
+                self.metrics.record(self.model_name, report_type, usage.get('prompt_tokens', 0),
+                                    usage.get('completion_tokens', 0), latency, batch=True)
+            if self.cache:
+                self.cache.put(key, report)
+        return reports
 
-    def _generate_report_openai(self, messages):
+    def warmup(self):
+        """
+        预先加载 Ollama 模型：发送不含消息的请求，Ollama 只加载模型而不生成内容，
+        并按 keep_alive 延长模型的驻留时间。OpenAI 后端无需预热。
+        """
+        if self.model != "ollama":
+            return
+        try:
+            response = self.transport.post(self.api_url, json=self._ollama_payload([], stream=False),
+                                           timeout=(self.transport.timeout[0], self.config.llm_request_timeout))
+            response.raise_for_status()
+            load_seconds = response.json().get("load_duration", 0) / NANOSECONDS
+            LOG.info(f"Ollama {self.config.ollama_model_name} 模型已预热，加载耗时 {load_seconds:.1f} 秒。")
+        except Exception as e:
+            LOG.warning(f"Ollama 模型预热失败，将在第一次生成时加载：{e}")
+
+    def stats(self):
+        """
+        返回 Ollama 的耗时统计：请求数、冷加载次数、模型加载耗时、提示处理耗时、生成耗时和生成速度。
+        """
+        with self._lock:
+            result = dict(self._metrics)
+        for name in ('load_s', 'prompt_eval_s', 'eval_s'):
+            result[name] = round(result[name], 2)
+        result['eval_tokens_per_s'] = round(result['eval_count'] / result['eval_s'], 1) if result['eval_s'] else 0.0
+        return result
+
+    def _ollama_payload(self, messages, stream):
+        payload = {
+            "model": self.config.ollama_model_name,  # 使用配置中的Ollama模型名称
+            "messages": messages,
+            **OLLAMA_OPTIONS,
+            "stream": stream
+        }
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def _record_call(self, report_type, usage, latency_s):
+        # 将一次调用的 token 数和耗时写入 LLMMetrics
+        if self.metrics:
+            self.metrics.record(self.model_name, report_type, usage.get('prompt_tokens', 0),
+                                usage.get('completion_tokens', 0), latency_s, usage.get('ttft_s'),
+                                usage.get('generation_s'))
+
+    def _record_ollama_metrics(self, data, usage):
+        # 从 Ollama 响应（或流式响应的最后一行）中记录模型加载和生成的耗时，区分冷加载和已驻留的情况；
+        # token 数和耗时同时写入 usage，首 token 时间按模型加载和提示处理的耗时计算
+        load_seconds = data.get("load_duration", 0) / NANOSECONDS
+        usage['prompt_tokens'] = data.get("prompt_eval_count", 0)
+        usage['completion_tokens'] = data.get("eval_count", 0)
+        usage['generation_s'] = data.get("eval_duration", 0) / NANOSECONDS
+        usage.setdefault('ttft_s', load_seconds + data.get("prompt_eval_duration", 0) / NANOSECONDS)
+        with self._lock:
+            self._metrics['requests'] += 1
+            self._metrics['cold_loads'] += int(load_seconds > COLD_LOAD_SECONDS)
+            self._metrics['load_s'] += load_seconds
+            self._metrics['prompt_eval_count'] += data.get("prompt_eval_count", 0)
+            self._metrics['prompt_eval_s'] += data.get("prompt_eval_duration", 0) / NANOSECONDS
+            self._metrics['eval_count'] += data.get("eval_count", 0)
+            self._metrics['eval_s'] += data.get("eval_duration", 0) / NANOSECONDS
+        if load_seconds > COLD_LOAD_SECONDS:
+            LOG.info(f"Ollama 模型重新加载，耗时 {load_seconds:.1f} 秒。")
+
+    def _messages(self, system_prompt, user_content):
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content},
+        ]
+
+    def _cached(self, system_prompt, user_content):
+        # 返回 (缓存键, 缓存的报告)，未启用缓存或未命中时报告为 None
+        if not self.cache:
+            return None, None
+        key = LLMCache.make_key(self.model, self.model_name, system_prompt, user_content, self.sampling_params)
+        report = self.cache.get(key)
+        if report is not None:
+            LOG.info(f"命中 LLM 响应缓存，跳过 {self.model} {self.model_name} 模型调用。")
+        return key, report
+
+    def _stream_report_openai(self, messages, usage):
+        """
+        使用 OpenAI GPT 模型以流式方式生成报告，最后一个数据块包含 token 用量。
+        """
+        LOG.info(f"使用 OpenAI {self.config.openai_model_name} 模型流式生成报告。")
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.config.openai_model_name,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                if chunk.usage:
+                    usage['prompt_tokens'] = chunk.usage.prompt_tokens
+                    usage['completion_tokens'] = chunk.usage.completion_tokens
+        except Exception as e:
+            LOG.error(f"生成报告时发生错误：{e}")
+            raise
+
+    def _stream_report_ollama(self, messages, usage):
+        """
+        使用 Ollama 模型以流式方式生成报告，响应为每行一个 JSON 对象（NDJSON），最后一行的 done 为 true。
+        """
+        LOG.info(f"使用 Ollama {self.config.ollama_model_name} 模型流式生成报告。")
+        payload = self._ollama_payload(messages, stream=True)
+        try:
+            response = self.transport.post(self.api_url, json=payload, stream=True,
+                                           timeout=(self.transport.timeout[0], self.config.llm_request_timeout))
+            with response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if data.get("error"):
+                        raise ValueError(f"Ollama API 返回错误：{data['error']}")
+                    content = data.get("message", {}).get("content")
+                    if content:
+                        yield content
+                    if data.get("done"):
+                        self._record_ollama_metrics(data, usage)
+                        break
+        except Exception as e:
+            LOG.error(f"生成报告时发生错误：{e}")
+            raise
+
+    def _generate_report_openai(self, messages, usage):
         """
         使用 OpenAI GPT 模型生成报告。
 
         :param messages: 包含系统提示和用户内容的消息列表。
+        :param usage: 用于写入 token 用量的字典。
         :return: 生成的报告内容。
         """
         LOG.info(f"使用 OpenAI {self.config.openai_model_name} 模型生成报告。")
@@ -55,33 +322,35 @@ class LLM:
                 messages=messages
             )
             LOG.debug("GPT 响应: {}", response)
+            if response.usage:
+                usage['prompt_tokens'] = response.usage.prompt_tokens
+                usage['completion_tokens'] = response.usage.completion_tokens
             return response.choices[0].message.content  # 返回生成的报告内容
         except Exception as e:
             LOG.error(f"生成报告时发生错误：{e}")
             raise
 
-    def _generate_report_ollama(self, messages):
+    def _generate_report_ollama(self, messages, usage):
         """
         使用 Ollama LLaMA 模型生成报告。
 
         :param messages: 包含系统提示和用户内容的消息列表。
+        :param usage: 用于写入 token 数和耗时的字典。
         :return: 生成的报告内容。
         """
         LOG.info(f"使用 Ollama {self.config.ollama_model_name} 模型生成报告。")
         try:
-            payload = {
-                "model": self.config.ollama_model_name,  # 使用配置中的Ollama模型名称
-                "messages": messages,
-                "max_tokens": 4000,
-                "temperature": 0.7,
-                "stream": False
-            }
-
-            response = requests.post(self.api_url, json=payload)  # 发送POST请求到Ollama API
+            payload = self._ollama_payload(messages, stream=False)
+
+            # 发送POST请求到Ollama API，生成耗时较长，读取超时使用单独的配置
+            response = self.transport.post(self.api_url, json=payload,
+                                           timeout=(self.transport.timeout[0], self.config.llm_request_timeout))
+            response.raise_for_status()
             response_data = response.json()
 
             # 调试输出查看完整的响应结构
             LOG.debug("Ollama 响应: {}", response_data)
+            self._record_ollama_metrics(response_data, usage)
 
             # 直接从响应数据中获取 content
             message_content = response_data.get("message", {}).get("content", None)
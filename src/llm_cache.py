@@ -0,0 +1,150 @@
+import hashlib  # 导入hashlib库用于生成缓存键
+import json  # 导入json库用于序列化缓存键的组成部分
+import os  # 导入os模块用于文件和目录操作
+import sqlite3  # 导入sqlite3库，作为磁盘缓存
+import threading  # 导入threading库，保证多线程访问安全
+import time  # 导入time库，用于判断条目是否过期
+from collections import OrderedDict  # 导入有序字典，用于维护内存 LRU 顺序
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used);
+"""
+
+
+def _digest(text):
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, db_path=None, ttl=24 * 3600, max_memory_entries=128, max_disk_entries=5000,
+                 clock=time.time):
+        """
+        初始化 LLM 响应缓存：内存中的 LRU 作为第一层，SQLite 数据库作为第二层。
+        相同的模型、提示、内容和采样参数在有效期内直接返回之前生成的结果。
+
+        :param db_path: SQLite 数据库路径，为空时只使用内存缓存。
+        :param ttl: 条目的有效时间（秒）。
+        :param max_memory_entries: 内存中最多保留的条目数。
+        :param max_disk_entries: 数据库中最多保留的条目数，超出时淘汰最久未使用的条目。
+        :param clock: 获取当前时间戳的函数，便于测试。
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.clock = clock
+        self.memory_hits = 0  # 内存命中次数
+        self.disk_hits = 0  # 数据库命中次数
+        self.misses = 0  # 未命中次数（需要调用模型）
+        self._memory = OrderedDict()  # key -> (content, created_at)
+        self._lock = threading.Lock()
+        self._connection = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)  # 确保目录存在
+            self._connection = sqlite3.connect(db_path, check_same_thread=False)  # 所有访问都在锁内串行执行
+            self._connection.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        根据配置对象创建 LLMCache 实例。
+        """
+        return cls(config.llm_cache_path, ttl=config.llm_cache_ttl_hours * 3600,
+                   max_memory_entries=config.llm_cache_memory_entries, max_disk_entries=config.llm_cache_max_entries)
+
+    @staticmethod
+    def make_key(backend, model_name, system_prompt, user_content, params=None):
+        """
+        根据后端、模型名称、系统提示和用户内容的哈希以及采样参数生成缓存键。
+        """
+        raw = json.dumps([backend, model_name, _digest(system_prompt), _digest(user_content),
+                          sorted((params or {}).items())])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        返回未过期的缓存响应，不存在或已过期时返回 None。数据库命中的条目会放入内存缓存。
+        """
+        now = self.clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[1] < self.ttl:
+                self._memory.move_to_end(key)
+                self._touch(key, now)  # 同时更新数据库中的使用时间，保持两层的 LRU 顺序一致
+                self.memory_hits += 1
+                return entry[0]
+            self._memory.pop(key, None)
+            if self._connection:
+                row = self._connection.execute('SELECT content, created_at FROM responses WHERE key = ?',
+                                               (key,)).fetchone()
+                if row and now - row[1] < self.ttl:
+                    self._touch(key, now)
+                    self._remember(key, row[0], row[1])
+                    self.disk_hits += 1
+                    return row[0]
+                if row:
+                    with self._connection:
+                        self._connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self.misses += 1
+            return None
+
+    def put(self, key, content):
+        """
+        写入缓存响应，超出条目数上限时淘汰最久未使用的条目。
+        """
+        now = self.clock()
+        with self._lock:
+            self._remember(key, content, now)
+            if not self._connection:
+                return
+            with self._connection:
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO responses (key, content, created_at, last_used) VALUES (?, ?, ?, ?)',
+                    (key, content, now, now))
+                self._connection.execute('DELETE FROM responses WHERE created_at <= ?', (now - self.ttl,))
+                self._connection.execute(
+                    'DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used DESC '
+                    'LIMIT -1 OFFSET ?)', (self.max_disk_entries,))
+
+    def stats(self):
+        """
+        返回缓存统计信息。
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            disk_entries = 0
+            if self._connection:
+                disk_entries = self._connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._connection:
+                self._connection.close()
+                self._connection = None
+
+    def _touch(self, key, now):
+        # 更新数据库中条目的最近使用时间（调用方需持有锁）
+        if self._connection:
+            with self._connection:
+                self._connection.execute('UPDATE responses SET last_used = ? WHERE key = ?', (now, key))
+
+    def _remember(self, key, content, created_at):
+        # 放入内存缓存并淘汰最久未使用的条目（调用方需持有锁）
+        self._memory[key] = (content, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
@@ -0,0 +1,172 @@
+import queue  # 导入queue库，在线程间传递流式输出
+import threading  # 导入threading库，保证多线程访问安全
+import time  # 导入time库，用于计算排队时间和超时
+from collections import deque  # 导入双端队列，用于保存最近的排队时间样本
+from concurrent.futures import ThreadPoolExecutor, TimeoutError  # 导入线程池作为先进先出的工作队列
+from logger import LOG  # 导入日志模块
+
+DEFAULT_CONCURRENCY = {'openai': 8, 'ollama': 1}  # 各后端默认的最大并发请求数
+
+
+class LLMDispatcher:
+    def __init__(self, llm, max_concurrency=None, timeout=None):
+        """
+        在 LLM 前加一个工作队列：请求按提交顺序（先进先出）执行，同时进行中的请求数不超过后端的并发上限。
+        提供与 LLM 相同的 generate_report、stream_report、submit_batch、collect_batch 和 warmup 接口，
+        可以直接替代 LLM 传给 ReportGenerator；所有模型调用都经过队列，受并发上限和超时限制。
+
+        :param llm: LLM 实例。
+        :param max_concurrency: 最大并发请求数，可以是整数或 {后端: 并发数} 的字典，为空时使用 DEFAULT_CONCURRENCY。
+        :param timeout: 每个请求从提交到完成的超时时间（秒），为空时不限制。排队超过该时间的请求不会再发送给模型。
+        """
+        self.llm = llm
+        if isinstance(max_concurrency, dict) or max_concurrency is None:
+            max_concurrency = dict(DEFAULT_CONCURRENCY, **(max_concurrency or {})).get(llm.model, 1)
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix=f'llm-{llm.model}')
+        self._counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'timed_out': 0}
+        self._waits = deque(maxlen=1000)  # 最近请求的排队时间（秒）
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, llm, config):
+        """
+        根据配置对象创建 LLMDispatcher 实例。
+        """
+        return cls(llm, config.llm_max_concurrency, config.llm_dispatch_timeout)
+
+    @property
+    def model(self):
+        return self.llm.model
+
+    @property
+    def model_name(self):
+        return self.llm.model_name
+
+    @property
+    def cache(self):
+        return self.llm.cache
+
+    @property
+    def metrics(self):
+        return self.llm.metrics
+
+    def submit(self, system_prompt, user_content, report_type=None):
+        """
+        将生成请求加入队列，返回 Future。
+        """
+        return self._enqueue(self.llm.generate_report, system_prompt, user_content, report_type=report_type)
+
+    def generate_report(self, system_prompt, user_content, report_type=None):
+        """
+        提交请求并等待结果，超时时抛出 TimeoutError。
+        """
+        return self._wait(self.submit(system_prompt, user_content, report_type))
+
+    def stream_report(self, system_prompt, user_content, report_type=None):
+        """
+        流式生成报告：请求同样排队，输出期间一直占用一个并发名额。超时时抛出 TimeoutError，
+        调用方提前停止读取时模型输出也随之停止。
+
+        :return: 文本增量的生成器。
+        """
+        deltas = queue.Queue()
+        stopped = threading.Event()
+        done = object()
+
+        def stream():
+            for delta in self.llm.stream_report(system_prompt, user_content, report_type=report_type):
+                if stopped.is_set():
+                    break
+                deltas.put(delta)
+
+        future = self._enqueue(stream)
+        future.add_done_callback(lambda _: deltas.put(done))
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        try:
+            while True:
+                try:
+                    delta = deltas.get(timeout=max(0, deadline - time.monotonic()) if deadline else None)
+                except queue.Empty:
+                    self._timed_out(future)
+                    raise TimeoutError("LLM 流式请求超时")
+                if delta is done:
+                    future.result()  # 传递模型错误
+                    return
+                yield delta
+        finally:
+            stopped.set()
+
+    def submit_batch(self, requests):
+        """
+        在队列中提交批量生成，参数和返回值与 LLM.submit_batch 相同。
+        """
+        return self._wait(self._enqueue(self.llm.submit_batch, requests))
+
+    def collect_batch(self, job):
+        """
+        在队列中查询一次批量任务，参数和返回值与 LLM.collect_batch 相同。
+        """
+        return self._wait(self._enqueue(self.llm.collect_batch, job))
+
+    def warmup(self):
+        """
+        在队列中预热模型，预热失败或超时只记录日志。
+        """
+        try:
+            self._wait(self._enqueue(self.llm.warmup))
+        except TimeoutError:
+            LOG.warning("模型预热排队超时，将在第一次生成时加载。")
+
+    def stats(self):
+        """
+        返回队列统计：提交、完成、失败和超时的请求数，以及排队时间（秒）的平均值和最大值。
+        """
+        with self._lock:
+            result = dict(self._counters, max_concurrency=self.max_concurrency)
+            if self._waits:
+                result['avg_wait_s'] = round(sum(self._waits) / len(self._waits), 2)
+                result['max_wait_s'] = round(max(self._waits), 2)
+            return result
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    def _enqueue(self, function, *args, **kwargs):
+        # 将模型调用加入队列，返回 Future；排队超过期限的调用不会再执行
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        with self._lock:
+            self._counters['submitted'] += 1
+        return self._executor.submit(self._run, function, args, kwargs, time.monotonic(), deadline)
+
+    def _wait(self, future):
+        # 等待调用完成，超时时取消仍在排队的调用并抛出 TimeoutError
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            self._timed_out(future)
+            raise
+
+    def _timed_out(self, future):
+        future.cancel()  # 仍在排队时直接取消
+        self._count('timed_out')
+        LOG.error(f"LLM 请求在 {self.timeout} 秒内未完成。")
+
+    def _run(self, function, args, kwargs, submitted_at, deadline):
+        started_at = time.monotonic()
+        with self._lock:
+            self._waits.append(started_at - submitted_at)
+        if deadline and started_at > deadline:
+            raise TimeoutError("LLM 请求排队超时")  # 调用方已放弃等待，不再占用模型
+        try:
+            result = function(*args, **kwargs)
+        except Exception:
+            self._count('failed')
+            raise
+        self._count('completed')
+        return result
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
@@ -0,0 +1,151 @@
+import json  # 导入json库，用于读写指标文件
+import os  # 导入os模块用于文件和目录操作
+import threading  # 导入threading库，保证多线程访问安全
+import time  # 导入time库，用于记录调用时间
+from collections import deque  # 导入双端队列，用于保存滚动窗口内的调用记录
+from logger import LOG  # 导入日志模块
+
+LATENCY_BUCKETS = (1, 2, 5, 10, 30, 60, 120, 300)  # 总耗时直方图的桶上限（秒），超出最后一个桶计入 "+Inf"
+# OpenAI 模型每百万 token 的价格（美元）：(输入, 输出)。本地 Ollama 模型不计费
+PRICES = {
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4o-mini': (0.15, 0.60),
+    'gpt-3.5-turbo': (0.50, 1.50),
+}
+BATCH_DISCOUNT = 0.5  # Batch API 的价格为同步接口的一半
+
+
+def call_cost(model_name, prompt_tokens, completion_tokens, batch=False):
+    """
+    按 PRICES 计算一次调用的费用（美元），未知模型返回 0；batch 为 True 时按 Batch API 的折扣计算。
+    """
+    input_price, output_price = PRICES.get(model_name, (0.0, 0.0))
+    cost = (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LLMMetrics:
+    def __init__(self, path=None, window=500, clock=time.time):
+        """
+        记录每次 LLM 调用的 token 数、首 token 时间、总耗时和生成速度，按 "模型/报告类型" 分组保存最近的
+        window 次调用，用于统计耗时分布和费用。每次调用以 JSON 行追加到指标文件，重启后从文件恢复滚动窗口。
+
+        :param path: 指标文件路径（JSONL），为空时只在内存中统计。
+        :param window: 每个分组保留的最近调用数。
+        :param clock: 获取当前时间戳的函数，便于测试。
+        """
+        self.path = path
+        self.window = window
+        self.clock = clock
+        self._calls = {}  # "模型/报告类型" -> 最近调用记录的 deque
+        self._lock = threading.Lock()
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)  # 确保目录存在
+            self._load()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        根据配置对象创建 LLMMetrics 实例。
+        """
+        return cls(config.llm_metrics_path, config.llm_metrics_window)
+
+    def record(self, model_name, report_type, prompt_tokens, completion_tokens, latency_s, ttft_s=None,
+               generation_s=None, batch=False):
+        """
+        记录一次调用并追加到指标文件。
+
+        :param model_name: 模型名称。
+        :param report_type: 报告类型，例如 github、hacker_news_hours_topic 或 chunk_summary。
+        :param prompt_tokens: 提示的 token 数。
+        :param completion_tokens: 生成的 token 数。
+        :param latency_s: 从发出请求到生成完毕的总耗时（秒）。
+        :param ttft_s: 首 token 时间（秒），未知时为空。
+        :param generation_s: 生成阶段的耗时（秒），用于计算生成速度，为空时使用总耗时减去首 token 时间。
+        :param batch: 是否通过 Batch API 调用，总耗时为整个批量任务的耗时。
+        """
+        if generation_s is None:
+            generation_s = latency_s - (ttft_s or 0)
+        entry = {
+            'ts': round(self.clock(), 3),
+            'model': model_name,
+            'report_type': report_type or 'unknown',
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'latency_s': round(latency_s, 3),
+            'ttft_s': round(ttft_s, 3) if ttft_s is not None else None,
+            'tokens_per_s': round(completion_tokens / generation_s, 1) if generation_s > 0 else 0.0,
+            'cost_usd': round(call_cost(model_name, prompt_tokens, completion_tokens, batch), 6),
+        }
+        LOG.info(f"LLM 调用指标：{entry['model']}/{entry['report_type']} 输入 {prompt_tokens} token，"
+                 f"输出 {completion_tokens} token，首 token {entry['ttft_s']} 秒，总耗时 {entry['latency_s']} 秒，"
+                 f"{entry['tokens_per_s']} token/s")
+        with self._lock:
+            self._append(entry)
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as file:
+                    file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return entry
+
+    def stats(self):
+        """
+        返回每个 "模型/报告类型" 分组在滚动窗口内的统计：调用数、token 总数、费用、耗时的平均值和分位数、
+        平均首 token 时间、平均生成速度，以及总耗时直方图。
+        """
+        with self._lock:
+            groups = {name: list(calls) for name, calls in self._calls.items()}
+        result = {}
+        for name, calls in sorted(groups.items()):
+            latencies = [call['latency_s'] for call in calls]
+            ttfts = [call['ttft_s'] for call in calls if call['ttft_s'] is not None]
+            histogram = {f'le_{bucket}': 0 for bucket in LATENCY_BUCKETS}
+            histogram['+Inf'] = 0
+            for latency in latencies:
+                bucket = next((bucket for bucket in LATENCY_BUCKETS if latency <= bucket), None)
+                histogram[f'le_{bucket}' if bucket else '+Inf'] += 1
+            result[name] = {
+                'calls': len(calls),
+                'prompt_tokens': sum(call['prompt_tokens'] for call in calls),
+                'completion_tokens': sum(call['completion_tokens'] for call in calls),
+                'cost_usd': round(sum(call['cost_usd'] for call in calls), 6),
+                'avg_latency_s': round(sum(latencies) / len(latencies), 2),
+                'p50_latency_s': _percentile(latencies, 0.5),
+                'p95_latency_s': _percentile(latencies, 0.95),
+                'avg_ttft_s': round(sum(ttfts) / len(ttfts), 2) if ttfts else None,
+                'avg_tokens_per_s': round(sum(call['tokens_per_s'] for call in calls) / len(calls), 1),
+                'latency_histogram': histogram,
+            }
+        return result
+
+    def _append(self, entry):
+        # 加入对应分组的滚动窗口（调用方需持有锁）
+        name = f"{entry['model']}/{entry['report_type']}"
+        calls = self._calls.get(name)
+        if calls is None:
+            calls = self._calls[name] = deque(maxlen=self.window)
+        calls.append(entry)
+
+    def _load(self):
+        # 从指标文件恢复滚动窗口；文件中的记录远多于窗口时只保留窗口内的记录，避免文件无限增长
+        if not os.path.exists(self.path):
+            return
+        lines = 0
+        with open(self.path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    self._append(json.loads(line))
+                    lines += 1
+                except (ValueError, KeyError):
+                    continue  # 跳过写入中断产生的不完整行
+        kept = [entry for calls in self._calls.values() for entry in calls]
+        if lines > 2 * len(kept):
+            kept.sort(key=lambda entry: entry['ts'])
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                file.writelines(json.dumps(entry, ensure_ascii=False) + '\n' for entry in kept)
+            os.replace(temp_path, self.path)
@@ -0,0 +1,135 @@
+"""
+报告输入中近似重复条目的合并。
+
+发版频繁的仓库会产生大量几乎相同的条目（"bump version"、dependabot 升级依赖、重复的文档更新等）。
+这里为每个条目的标题计算 64 位 SimHash 指纹，指纹的汉明距离不超过阈值的条目视为近似重复，
+合并为一行并注明数量和编号。少于 MIN_TOKENS 个词的短标题特征太少，一个词不同指纹就可能很接近，
+只在规范化后完全相同时合并。查找使用分段索引：将指纹分为 threshold + 1 段，距离不超过阈值的两个指纹
+至少有一段完全相同（抽屉原理），因此只需比较共享某一段的分组。近似重复的条目会并入已有分组而不进入索引，
+不同的标题很少共享一整段，每个桶中的分组数很少，总耗时与条目数近似成线性关系。
+"""
+import hashlib  # 导入hashlib库，用于计算特征的哈希值
+import re  # 导入re库，用于解析条目和规范化标题
+
+BITS = 64
+DEFAULT_THRESHOLD = 3  # 汉明距离不超过该值的标题视为近似重复
+MIN_TOKENS = 5  # 规范化后至少有这么多个词的标题才按 SimHash 合并，更短的标题只合并完全相同的
+MAX_REFERENCES = 10  # 合并后的一行最多列出的编号数
+ITEM = re.compile(r'^(\s*[-*] )(.*?)\s+(#\d+)$')  # Markdown 条目：- 标题 #编号
+VERSION = re.compile(r'\bv?\d+(?:[.\-]\w+)*\b')  # 版本号和其他数字统一替换为同一个占位符
+WORD = re.compile(r'\w+')
+
+
+def normalize_title(title):
+    """
+    规范化标题：转为小写，版本号和数字替换为 0，只保留单词。
+    """
+    return WORD.findall(VERSION.sub('0', title.lower()))
+
+
+def _feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(title):
+    """
+    计算标题的 64 位 SimHash 指纹，特征为规范化后的单词和相邻单词对。
+    """
+    words = normalize_title(title)
+    features = words + [f'{first} {second}' for first, second in zip(words, words[1:])]
+    weights = [0] * BITS
+    for feature in features:
+        value = _feature_hash(feature)
+        for bit in range(BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(BITS) if weights[bit] > 0)
+
+
+def hamming_distance(first, second):
+    return bin(first ^ second).count('1')
+
+
+class SimHashIndex:
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        """
+        近似重复分组的分段索引。
+
+        :param threshold: 汉明距离阈值，指纹被分为 threshold + 1 段。
+        """
+        self.threshold = threshold
+        bands = threshold + 1
+        self._bands = [(BITS * index // bands, BITS * (index + 1) // bands) for index in range(bands)]
+        self._buckets = {}  # (段序号, 段的值) -> 分组编号列表
+        self.fingerprints = []  # 分组编号 -> 分组代表（第一个条目）的指纹
+
+    def add(self, fingerprint):
+        """
+        查找与 fingerprint 近似重复的分组，找到时返回距离最近的分组编号（距离相同时取较早的分组），
+        否则创建新分组并返回新编号。
+        """
+        keys = [(index, fingerprint >> start & ((1 << (end - start)) - 1))
+                for index, (start, end) in enumerate(self._bands)]
+        candidates = {group for key in keys for group in self._buckets.get(key, ())}
+        matches = [(hamming_distance(fingerprint, self.fingerprints[group]), group) for group in candidates]
+        matches = [match for match in matches if match[0] <= self.threshold]
+        if matches:
+            return min(matches)[1]
+        group = len(self.fingerprints)
+        self.fingerprints.append(fingerprint)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(group)
+        return group
+
+
+def collapse_items(items, threshold=DEFAULT_THRESHOLD):
+    """
+    将近似重复的条目分组。
+
+    :param items: [(标题, 编号), ...]。
+    :return: [(代表标题, [编号, ...]), ...]，按各分组第一个条目出现的顺序排列。
+    """
+    index = SimHashIndex(threshold)
+    groups = []
+    by_fingerprint = {}  # SimHash 分组编号 -> groups 中的位置
+    by_words = {}  # 短标题规范化后的单词 -> groups 中的位置
+    for title, reference in items:
+        words = normalize_title(title)
+        if len(words) >= MIN_TOKENS:
+            position = by_fingerprint.setdefault(index.add(simhash(title)), len(groups))
+        else:
+            position = by_words.setdefault(tuple(words), len(groups))
+        if position == len(groups):
+            groups.append((title, []))
+        groups[position][1].append(reference)
+    return groups
+
+
+def collapse_markdown(markdown_content, threshold=DEFAULT_THRESHOLD):
+    """
+    合并 Markdown 中每个小节内近似重复的条目（"- 标题 #编号" 格式），其他行保持不变。
+    合并后的条目写为 "- 代表标题 (共 N 条：#1, #2, ...)"。
+    """
+    output, section, prefixes = [], [], []
+
+    def flush():
+        # 合并当前小节收集的条目，按第一个条目的位置和缩进输出
+        for title, references in collapse_items(section, threshold):
+            if len(references) == 1:
+                output.append(f"{prefixes[0]}{title} {references[0]}")
+            else:
+                shown = ', '.join(references[:MAX_REFERENCES])
+                more = ' 等' if len(references) > MAX_REFERENCES else ''
+                output.append(f"{prefixes[0]}{title} (共 {len(references)} 条：{shown}{more})")
+        section.clear()
+        prefixes.clear()
+
+    for line in markdown_content.split('\n'):
+        match = ITEM.match(line)
+        if match:
+            prefixes.append(match.group(1))
+            section.append((match.group(2), match.group(3)))
+            continue
+        flush()
+        output.append(line)
+    flush()
+    return '\n'.join(output)
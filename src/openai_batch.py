@@ -0,0 +1,112 @@
+import json  # 导入json库，用于生成和解析 JSONL 文件
+import os  # 导入os模块，用于读取 API 密钥
+import time  # 导入time库，用于轮询批量任务状态
+from http_transport import HTTPTransport  # 导入共享的 HTTP 传输层
+from logger import LOG  # 导入日志模块
+
+CHAT_COMPLETIONS = '/v1/chat/completions'
+FINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}  # 批量任务的终止状态
+
+
+class OpenAIBatchClient:
+    def __init__(self, api_url='https://api.openai.com/v1', api_key=None, transport=None, poll_interval=30,
+                 timeout=24 * 3600):
+        """
+        OpenAI Batch API 客户端：将多个 chat completions 请求写成 JSONL 文件上传，创建批量任务，
+        轮询到任务结束后下载结果。批量任务的价格为同步接口的一半，适合不需要即时返回的定时报告。
+
+        :param api_url: API 地址，可指向本地 fake_openai_server 进行离线测试。
+        :param api_key: API 密钥，为空时读取 OPENAI_API_KEY 环境变量。
+        :param transport: 可选的共享 HTTPTransport 实例。
+        :param poll_interval: run 轮询任务状态的间隔（秒）。
+        :param timeout: 从创建任务起等待任务结束的最长时间（秒），超时后取消任务。
+        """
+        self.api_url = api_url.rstrip('/')
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY', '')
+        self.transport = transport or HTTPTransport()
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    def run(self, model_name, requests):
+        """
+        提交批量任务并阻塞等待结果，适合离线测试和命令行使用；定时任务应使用 submit 和 poll，避免阻塞调度。
+
+        :param model_name: 模型名称。
+        :param requests: {custom_id: messages} 字典。
+        :return: {custom_id: (报告内容, usage 字典)}，失败的请求不包含在结果中。
+        """
+        batch_id = self.submit(model_name, requests)
+        while True:
+            results = self.poll(batch_id)
+            if results is not None:
+                return results
+            time.sleep(self.poll_interval)
+
+    def submit(self, model_name, requests):
+        """
+        上传请求文件并创建批量任务，不等待任务完成。
+
+        :return: 批量任务 ID，用 poll 查询结果。
+        """
+        lines = [{'custom_id': custom_id, 'method': 'POST', 'url': CHAT_COMPLETIONS,
+                  'body': {'model': model_name, 'messages': messages}}
+                 for custom_id, messages in requests.items()]
+        batch = self.create(lines)
+        LOG.info(f"已提交 OpenAI 批量任务 {batch['id']}，共 {len(lines)} 个请求。")
+        return batch['id']
+
+    def poll(self, batch_id):
+        """
+        查询一次批量任务的状态。任务未结束时返回 None；创建超过 timeout 秒仍未结束时取消任务。
+
+        :return: {custom_id: (报告内容, usage 字典)}，失败的请求不包含在结果中。
+        :raises RuntimeError: 任务失败、过期、被取消或超时。
+        """
+        batch = self._request('GET', f'/batches/{batch_id}')
+        if batch['status'] not in FINAL_STATUSES:
+            if time.time() - batch.get('created_at', time.time()) <= self.timeout:
+                LOG.debug(f"OpenAI 批量任务 {batch_id} 状态：{batch['status']}，{batch.get('request_counts')}")
+                return None
+            LOG.error(f"OpenAI 批量任务 {batch_id} 在 {self.timeout} 秒内未完成，取消任务。")
+            batch = self._request('POST', f'/batches/{batch_id}/cancel')
+        if batch['status'] != 'completed':
+            raise RuntimeError(f"OpenAI 批量任务 {batch_id} 未完成，状态：{batch['status']}")
+        results = {}
+        for line in self.download(batch.get('output_file_id')):
+            response = line.get('response') or {}
+            if response.get('status_code') != 200:
+                LOG.error(f"批量请求 {line.get('custom_id')} 失败：{line.get('error') or response}")
+                continue
+            body = response['body']
+            results[line['custom_id']] = (body['choices'][0]['message']['content'], body.get('usage') or {})
+        for line in self.download(batch.get('error_file_id')):
+            LOG.error(f"批量请求 {line.get('custom_id')} 失败：{line.get('error') or line.get('response')}")
+        return results
+
+    def create(self, lines):
+        """
+        上传 JSONL 请求文件并创建批量任务，返回任务对象。
+        """
+        content = ''.join(json.dumps(line, ensure_ascii=False) + '\n' for line in lines).encode('utf-8')
+        upload = self._request('POST', '/files', data={'purpose': 'batch'},
+                               files={'file': ('batch.jsonl', content, 'application/jsonl')})
+        return self._request('POST', '/batches', json={'input_file_id': upload['id'], 'endpoint': CHAT_COMPLETIONS,
+                                                        'completion_window': '24h'})
+
+    def download(self, file_id):
+        """
+        下载结果文件，逐行返回解析后的 JSON 对象；file_id 为空时不返回任何内容。
+        """
+        if not file_id:
+            return []
+        response = self.transport.get(f'{self.api_url}/files/{file_id}/content', headers=self._headers())
+        response.raise_for_status()
+        return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+    def _request(self, method, path, **kwargs):
+        response = self.transport.request(method, f'{self.api_url}{path}', headers=self._headers(), **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def _headers(self):
+        return {'Authorization': f'Bearer {self.api_key}'}
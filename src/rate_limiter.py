@@ -0,0 +1,153 @@
+import threading  # 导入threading库，保证多线程访问安全
+import time  # 导入time库，用于计算等待时间
+from email.utils import parsedate_to_datetime  # 导入HTTP日期解析函数，用于解析 Retry-After
+from logger import LOG  # 导入日志模块
+
+SECONDARY_LIMIT_BACKOFF = 60  # 二级速率限制未给出 Retry-After 时的初始等待秒数（GitHub 建议至少 1 分钟）
+MAX_BACKOFF = 15 * 60  # 指数退避的最大等待秒数
+
+
+class TokenState:
+    __slots__ = ('token', 'remaining', 'reset_at', 'blocked_until', 'backoff')
+
+    def __init__(self, token):
+        self.token = token
+        self.remaining = None  # 剩余请求配额，None 表示尚未从响应头得知
+        self.reset_at = 0.0  # 配额重置的时间戳
+        self.blocked_until = 0.0  # 触发限流后需要等待到的时间戳
+        self.backoff = 0  # 当前二级限流退避秒数
+
+
+class RateLimitScheduler:
+    def __init__(self, tokens, reserve=10, clock=time.time, sleep=time.sleep):
+        """
+        初始化速率限制调度器，在多个令牌之间分配请求，并根据响应头跟踪每个令牌的剩余配额。
+
+        :param tokens: GitHub API 令牌列表。
+        :param reserve: 每个令牌保留的配额，剩余配额低于该值时视为已耗尽，避免并发请求越过限制。
+        :param clock: 获取当前时间戳的函数，便于测试。
+        :param sleep: 等待函数，便于测试。
+        """
+        tokens = [token for token in tokens if token] or [None]  # 未配置令牌时以匿名方式请求
+        self.states = [TokenState(token) for token in tokens]
+        self.reserve_quota = reserve
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        选择一个可用令牌并预扣一次配额，不会阻塞。
+
+        :return: (token, wait_seconds)，wait_seconds 大于 0 时表示需要等待该秒数后才能使用该令牌。
+        """
+        with self._lock:
+            now = self.clock()
+            for state in self.states:
+                if state.remaining is not None and now >= state.reset_at:
+                    state.remaining = None  # 配额已重置
+            available = [state for state in self.states if self._wait_seconds(state, now) <= 0]
+            if available:
+                # 优先使用剩余配额最多的令牌，未知配额的令牌视为满额
+                state = max(available, key=lambda s: float('inf') if s.remaining is None else s.remaining)
+                if state.remaining is not None:
+                    state.remaining -= 1
+                return state.token, 0.0
+            state = min(self.states, key=lambda s: self._wait_seconds(s, now))
+            return state.token, self._wait_seconds(state, now)
+
+    def acquire(self):
+        """
+        获取一个可用令牌，所有令牌都耗尽时等待到最早可用的时间。
+        """
+        while True:
+            token, wait = self.reserve()
+            if wait <= 0:
+                return token
+            LOG.warning(f"GitHub API 配额已耗尽，等待 {wait:.0f} 秒后继续请求。")
+            self.sleep(wait)
+
+    def update(self, token, response, rate_limited=False):
+        """
+        根据响应头更新令牌配额，并判断请求是否因速率限制而失败。
+
+        :param token: 发送请求时使用的令牌。
+        :param response: requests 响应对象。
+        :param rate_limited: 调用方已从响应正文判断出请求被限流，例如 GraphQL 在 200 响应中返回 RATE_LIMITED 错误。
+        :return: 若请求被限流（需要重试）返回 True，否则返回 False。
+        """
+        headers = response.headers
+        remaining = _header_number(headers, 'X-RateLimit-Remaining')
+        reset_at = _header_number(headers, 'X-RateLimit-Reset')
+        retry_after = _retry_after(headers, self.clock())
+        limited = rate_limited or (response.status_code in (403, 429) and
+                                   (remaining == 0 or retry_after is not None or _is_secondary_limit(response)))
+        with self._lock:
+            state = next(s for s in self.states if s.token == token)
+            now = self.clock()
+            if remaining is not None:
+                state.remaining = int(remaining)
+            if reset_at is not None:
+                state.reset_at = reset_at
+            if not limited:
+                state.backoff = 0
+                return False
+
+            if retry_after is not None:
+                state.blocked_until = now + retry_after
+            elif remaining == 0 and reset_at is not None:
+                state.blocked_until = reset_at
+            else:
+                # 二级速率限制且未给出等待时间，按指数退避
+                state.backoff = min(MAX_BACKOFF, state.backoff * 2 or SECONDARY_LIMIT_BACKOFF)
+                state.blocked_until = now + state.backoff
+            LOG.warning(f"GitHub API 触发速率限制（HTTP {response.status_code}），"
+                        f"令牌暂停 {state.blocked_until - now:.0f} 秒。")
+            return True
+
+    def stats(self):
+        """
+        返回每个令牌的配额状态，令牌仅显示末尾 4 位。
+        """
+        with self._lock:
+            return [{'token': f"...{state.token[-4:]}" if state.token else None,
+                     'remaining': state.remaining, 'reset_at': state.reset_at}
+                    for state in self.states]
+
+    def _wait_seconds(self, state, now):
+        # 计算令牌需要等待多少秒才能使用
+        wait = state.blocked_until - now
+        if state.remaining is not None and state.remaining <= self.reserve_quota:
+            wait = max(wait, state.reset_at - now)
+        return max(wait, 0.0)
+
+
+def _header_number(headers, name):
+    # 读取数字类型的响应头，不存在或格式不正确时返回 None
+    value = headers.get(name)
+    if isinstance(value, str) and value.strip().isdigit():
+        return float(value)
+    return None
+
+
+def _retry_after(headers, now):
+    # 读取 Retry-After 响应头并换算为等待秒数，支持秒数和 HTTP 日期两种格式，不存在或格式不正确时返回 None
+    seconds = _header_number(headers, 'Retry-After')
+    if seconds is not None:
+        return seconds
+    value = headers.get('Retry-After')
+    if not isinstance(value, str):
+        return None
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at - now, 0.0)
+
+
+def _is_secondary_limit(response):
+    # 二级速率限制的 403 响应正文中包含 "secondary rate limit"
+    try:
+        return 'secondary rate limit' in response.text.lower()
+    except Exception:
+        return False
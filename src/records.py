@@ -0,0 +1,167 @@
+import sys  # 导入sys库，用于字符串驻留
+
+
+class _Record:
+    """
+    精简记录的基类：使用 __slots__ 只保存导出和报告需要的字段，
+    同时支持 record['title'] / record.get('title') 形式的访问，与 API 返回的字典用法兼容。
+    """
+    __slots__ = ()
+    _fields = ()  # 包括父类在内的所有字段名，子类的 __slots__ 只包含新增的字段
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = []
+        for klass in reversed(cls.__mro__):
+            fields.extend(name for name in klass.__dict__.get('__slots__', ()) if name not in fields)
+        cls._fields = tuple(fields)
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._fields)
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)
+        return f'{type(self).__name__}({fields})'
+
+
+class CommitRecord(_Record):
+    __slots__ = ('sha', 'message', 'author', 'date')
+
+    def __init__(self, sha, message, author, date):
+        self.sha = sha
+        self.message = message
+        self.author = _intern(author)
+        self.date = date
+
+    def __getitem__(self, key):
+        if key == 'commit':
+            # 按需构造与 API 相同的嵌套结构
+            return {'message': self.message, 'author': {'name': self.author, 'date': self.date},
+                    'committer': {'date': self.date}}
+        return super().__getitem__(key)
+
+    def to_dict(self):
+        return {'sha': self.sha, 'commit': self['commit']}
+
+
+class IssueRecord(_Record):
+    __slots__ = ('number', 'title', 'state', 'author', 'closed_at', 'updated_at')
+
+    def __init__(self, number, title, state, author, closed_at, updated_at):
+        self.number = number
+        self.title = title
+        self.state = _intern(state)
+        self.author = _intern(author)
+        self.closed_at = closed_at
+        self.updated_at = updated_at
+
+    def __getitem__(self, key):
+        if key == 'user':
+            return {'login': self.author} if self.author else None
+        return super().__getitem__(key)
+
+    def to_dict(self):
+        return {'number': self.number, 'title': self.title, 'state': self.state, 'user': self['user'],
+                'closed_at': self.closed_at, 'updated_at': self.updated_at}
+
+
+class PullRequestRecord(IssueRecord):
+    __slots__ = ()
+
+
+def project(resource, item):
+    """
+    将 API 返回的完整数据投影为精简记录，丢弃嵌套的用户对象、URL、标签和表情统计等字段。
+
+    :param resource: 数据类型，'commits'、'issues' 或 'pull_requests'。
+    :param item: API 返回的单条数据（字典）。
+    :return: 对应的精简记录。
+    """
+    if isinstance(item, _Record):
+        return item
+    if resource == 'commits':
+        commit = item.get('commit') or {}
+        author = commit.get('author') or {}
+        committer = commit.get('committer') or {}
+        return CommitRecord(item['sha'], commit.get('message'), author.get('name'),
+                            committer.get('date') or author.get('date'))
+    user = item.get('user') or {}
+    record_class = PullRequestRecord if resource == 'pull_requests' else IssueRecord
+    return record_class(item['number'], item.get('title'), item.get('state'), user.get('login'),
+                        item.get('closed_at'), item.get('updated_at'))
+
+
+def to_dict(item):
+    # 将精简记录转换为字典（用于 JSON 序列化），普通字典原样返回
+    return item.to_dict() if isinstance(item, _Record) else item
+
+
+def _intern(value):
+    # 驻留重复出现的短字符串（状态、作者），多条记录共享同一个字符串对象
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+if __name__ == '__main__':
+    # 基准测试：比较完整 JSON 数据与精简记录的每条内存占用
+    import json
+    import tracemalloc
+
+    def sample_issue(number):
+        # 构造与 GitHub Issues API 返回结构一致的数据
+        base = f'https://api.github.com/repos/vllm-project/vllm/issues/{number}'
+        user = {'login': f'user{number % 50}', 'id': 1000 + number % 50, 'node_id': 'MDQ6VXNlcjEyMzQ1Ng==',
+                'avatar_url': 'https://avatars.githubusercontent.com/u/123456?v=4', 'gravatar_id': '',
+                'url': 'https://api.github.com/users/octocat', 'html_url': 'https://github.com/octocat',
+                'followers_url': 'https://api.github.com/users/octocat/followers',
+                'following_url': 'https://api.github.com/users/octocat/following{/other_user}',
+                'gists_url': 'https://api.github.com/users/octocat/gists{/gist_id}',
+                'starred_url': 'https://api.github.com/users/octocat/starred{/owner}{/repo}',
+                'subscriptions_url': 'https://api.github.com/users/octocat/subscriptions',
+                'organizations_url': 'https://api.github.com/users/octocat/orgs',
+                'repos_url': 'https://api.github.com/users/octocat/repos',
+                'events_url': 'https://api.github.com/users/octocat/events{/privacy}',
+                'received_events_url': 'https://api.github.com/users/octocat/received_events',
+                'type': 'User', 'site_admin': False}
+        label = {'id': 208045946, 'node_id': 'MDU6TGFiZWwyMDgwNDU5NDY=', 'name': 'bug', 'color': 'f29513',
+                 'url': 'https://api.github.com/repos/vllm-project/vllm/labels/bug', 'default': True,
+                 'description': "Something isn't working"}
+        return {'url': base, 'repository_url': 'https://api.github.com/repos/vllm-project/vllm',
+                'labels_url': base + '/labels{/name}', 'comments_url': base + '/comments',
+                'events_url': base + '/events', 'html_url': f'https://github.com/vllm-project/vllm/issues/{number}',
+                'id': 2000000 + number, 'node_id': 'I_kwDOJDgX6M6S4Wb5', 'number': number,
+                'title': f'[Bug]: CUDA out of memory when serving with tensor parallel #{number}',
+                'user': user, 'labels': [label, dict(label, name='stale')], 'state': 'closed', 'locked': False,
+                'assignee': None, 'assignees': [], 'milestone': None, 'comments': 3,
+                'created_at': '2024-08-19T08:00:00Z', 'updated_at': '2024-08-21T08:00:00Z',
+                'closed_at': '2024-08-21T08:00:00Z', 'author_association': 'CONTRIBUTOR',
+                'active_lock_reason': None, 'body': 'Steps to reproduce the issue...\n' * 20,
+                'reactions': {'url': base + '/reactions', 'total_count': 2, '+1': 2, '-1': 0, 'laugh': 0,
+                              'hooray': 0, 'confused': 0, 'heart': 0, 'rocket': 0, 'eyes': 0},
+                'timeline_url': base + '/timeline', 'performed_via_github_app': None, 'state_reason': 'completed'}
+
+    count = 5000
+    payload = json.dumps([sample_issue(number) for number in range(count)])
+
+    tracemalloc.start()
+    items = json.loads(payload)
+    full_bytes = tracemalloc.get_traced_memory()[0]
+    records = [project('issues', item) for item in items]
+    del items
+    compact_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"完整 JSON 数据：{full_bytes / count:.0f} 字节/条")
+    print(f"精简记录：{compact_bytes / count:.0f} 字节/条（约为原来的 {compact_bytes / full_bytes:.1%}）")
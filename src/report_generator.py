@@ -1,12 +1,81 @@
+import hashlib
+import json
 import os
+import re
+import threading
 from logger import LOG  # 导入日志模块
+from near_duplicates import collapse_markdown  # 导入近似重复条目的合并
+from summarizer import MapReduceSummarizer  # 导入超出上下文时的 map-reduce 摘要
+
+TITLE_DATE = re.compile(r'\d{4}-\d{2}-\d{2}(?: \d{2}:\d{2})?')  # 标题行中的日期和时间
+
+
+def normalize_content(markdown_content):
+    """
+    规范化报告输入：统一换行符、去掉行尾空白和多余的空行，并忽略首行标题中的日期，
+    使没有新动态的项目在不同日期导出的文件得到相同的结果。
+    """
+    lines = [line.rstrip() for line in markdown_content.replace('\r\n', '\n').strip().split('\n')]
+    if lines and lines[0].startswith('#'):
+        lines[0] = TITLE_DATE.sub('', lines[0])
+    return '\n'.join(line for index, line in enumerate(lines) if line or (index and lines[index - 1]))
+
+
+def retarget_dates(report, old_title, new_title):
+    """
+    将复用的报告中来自旧输入标题的日期（如时间周期）替换为新输入标题中对应位置的日期。
+    两个标题的日期个数不同，或报告中有不属于旧标题的日期时返回 None，由调用方重新生成报告。
+    """
+    old_dates, new_dates = TITLE_DATE.findall(old_title), TITLE_DATE.findall(new_title)
+    if len(old_dates) != len(new_dates):
+        return None
+    mapping = dict(zip(old_dates, new_dates))
+    for old, new in zip(old_dates, new_dates):
+        mapping.setdefault(old[:10], new[:10])  # 报告中可能只写日期，不写时间
+    unknown = [date for date in TITLE_DATE.findall(report) if date not in mapping]
+    if unknown:
+        return None
+    return TITLE_DATE.sub(lambda match: mapping[match.group(0)], report)
+
+
+def _title(markdown_content):
+    # 输入的标题行（第一个非空行），其中包含报告的日期或时间周期
+    return markdown_content.strip().split('\n', 1)[0].strip()
+
 
 class ReportGenerator:
-    def __init__(self, llm, report_types):
+    def __init__(self, llm, report_types, cache_path=None, max_cache_entries=1000, map_workers=4,
+                 context_tokens=None, dedup_threshold=None):
+        """
+        :param cache_path: 报告内容哈希索引文件路径。输入、提示和模型的哈希与之前生成的报告相同时，
+                           直接复用该报告而不调用 LLM；为空时不启用。
+        :param max_cache_entries: 索引最多保留的条目数，超出时淘汰最早的条目。
+        :param map_workers: 输入超出模型上下文时，map 阶段并发提取要点的最大请求数。
+        :param context_tokens: 模型上下文长度（token），为空时按模型名称查表。
+        :param dedup_threshold: GitHub 报告输入中近似重复条目的 SimHash 汉明距离阈值，为空时不合并。
+        """
         self.llm = llm  # 初始化时接受一个LLM实例，用于后续生成报告
         self.report_types = report_types
         self.prompts = {}  # 存储所有预加载的提示信息
+        self.cache_path = cache_path
+        self.max_cache_entries = max_cache_entries
+        self.map_workers = map_workers
+        self.context_tokens = context_tokens
+        self.dedup_threshold = dedup_threshold
+        self.generated = 0  # 调用 LLM 生成的报告数
+        self.skipped = 0  # 内容未变化而复用已有报告的次数
+        self._index = {}  # 内容哈希 -> [报告文件路径, 输入标题]
+        self._lock = threading.Lock()
         self._preload_prompts()
+        self._load_index()
+
+    @classmethod
+    def from_config(cls, llm, config):
+        """
+        根据配置对象创建 ReportGenerator 实例。
+        """
+        return cls(llm, config.report_types, config.report_cache_path, map_workers=config.llm_map_concurrency,
+                   context_tokens=config.llm_context_tokens, dedup_threshold=config.report_dedup_threshold)
 
     def _preload_prompts(self):
         """
@@ -19,6 +88,11 @@ class ReportGenerator:
                 raise FileNotFoundError(f"提示文件未找到: {prompt_file}")
             with open(prompt_file, "r", encoding='utf-8') as file:
                 self.prompts[report_type] = file.read()
+        # 分块提取要点的提示是可选的，缺少时超出上下文的输入直接发送给模型
+        chunk_prompt_file = f"prompts/chunk_summary_{self.llm.model}_prompt.txt"
+        if os.path.exists(chunk_prompt_file):
+            with open(chunk_prompt_file, "r", encoding='utf-8') as file:
+                self.prompts["chunk_summary"] = file.read()
 
     def generate_github_report(self, markdown_file_path):
         """
@@ -27,16 +101,78 @@ class ReportGenerator:
         with open(markdown_file_path, 'r') as file:
             markdown_content = file.read()
 
-        system_prompt = self.prompts.get("github")
-        report = self.llm.generate_report(system_prompt, markdown_content)
-        
         report_file_path = os.path.splitext(markdown_file_path)[0] + "_report.md"
-        with open(report_file_path, 'w+') as report_file:
-            report_file.write(report)
+        report = self._generate("github", markdown_content, report_file_path)
 
         LOG.info(f"GitHub 项目报告已保存到 {report_file_path}")
         return report, report_file_path
 
+    def stream_github_report(self, markdown_file_path):
+        """
+        以流式方式生成 GitHub 项目的报告，每收到一段模型输出就写入报告文件。
+
+        :return: 生成器，依次返回 (当前已生成的报告内容, 报告文件路径)。
+        """
+        with open(markdown_file_path, 'r') as file:
+            markdown_content = file.read()
+
+        report_file_path = os.path.splitext(markdown_file_path)[0] + "_report.md"
+        for report in self._stream("github", markdown_content, report_file_path):
+            yield report, report_file_path
+        LOG.info(f"GitHub 项目报告已保存到 {report_file_path}")
+
+    def submit_github_reports_batch(self, markdown_file_paths):
+        """
+        提交多个 GitHub 项目的批量生成，不等待结果：内容未变化的项目直接复用已有报告，其余项目通过 LLM 的
+        submit_batch 一次提交（OpenAI 后端使用 Batch API）。
+
+        :return: 可序列化为 JSON 的任务描述，用 collect_github_reports_batch 获取结果。
+        """
+        system_prompt = self.prompts.get("github")
+        job = {'reused': {}, 'files': {}}  # files: custom_id -> [输入文件, 报告文件, 内容哈希, 输入标题]
+        requests = {}
+        for markdown_file_path in markdown_file_paths:
+            with open(markdown_file_path, 'r') as file:
+                markdown_content = file.read()
+            report_file_path = os.path.splitext(markdown_file_path)[0] + "_report.md"
+            key, report = self._reusable_report(system_prompt, markdown_content)
+            if report is not None:
+                with open(report_file_path, 'w+') as report_file:
+                    report_file.write(report)
+                job['reused'][markdown_file_path] = [report, report_file_path]
+                continue
+            # custom_id 使用序号，避免文件路径中的字符不符合接口要求
+            custom_id = str(len(job['files']))
+            job['files'][custom_id] = [markdown_file_path, report_file_path, key, _title(markdown_content)]
+            requests[custom_id] = (system_prompt, self._prepare("github", system_prompt, markdown_content), "github")
+        job['llm'] = self.llm.submit_batch(requests)
+        return job
+
+    def collect_github_reports_batch(self, job):
+        """
+        查询一次 submit_github_reports_batch 提交的任务，完成后将结果分别保存为 {original_filename}_report.md。
+
+        :return: 任务未完成时返回 None；完成后返回 {markdown_file_path: (report, report_file_path)}，
+                 生成失败的项目不包含在结果中。
+        """
+        reports = self.llm.collect_batch(job['llm'])
+        if reports is None:
+            return None
+        results = {path: tuple(reused) for path, reused in job['reused'].items()}
+        for custom_id, (markdown_file_path, report_file_path, key, title) in job['files'].items():
+            report = reports.get(custom_id)
+            if report is None:
+                LOG.error(f"批量生成 {markdown_file_path} 的报告失败。")
+                continue
+            with open(report_file_path, 'w+') as report_file:
+                report_file.write(report)
+            self._remember(key, report_file_path, title)  # 标题行即为 _title 的结果
+            results[markdown_file_path] = (report, report_file_path)
+            with self._lock:
+                self.generated += 1
+        LOG.info(f"批量生成 GitHub 项目报告完成：{len(results)}/{len(job['reused']) + len(job['files'])} 个成功。")
+        return results
+
     def generate_hn_topic_report(self, markdown_file_path):
         """
         生成 Hacker News 小时主题的报告，并保存为 {original_filename}_topic.md。
@@ -44,23 +180,32 @@ class ReportGenerator:
         with open(markdown_file_path, 'r') as file:
             markdown_content = file.read()
 
-        system_prompt = self.prompts.get("hacker_news_hours_topic")
-        report = self.llm.generate_report(system_prompt, markdown_content)
-        
         report_file_path = os.path.splitext(markdown_file_path)[0] + "_topic.md"
-        with open(report_file_path, 'w+') as report_file:
-            report_file.write(report)
+        report = self._generate("hacker_news_hours_topic", markdown_content, report_file_path)
 
         LOG.info(f"Hacker News 热点主题报告已保存到 {report_file_path}")
         return report, report_file_path
 
-    def generate_hn_daily_report(self, directory_path):
+    def stream_hn_topic_report(self, markdown_file_path):
+        """
+        以流式方式生成 Hacker News 小时主题的报告，返回值同 stream_github_report。
+        """
+        with open(markdown_file_path, 'r') as file:
+            markdown_content = file.read()
+
+        report_file_path = os.path.splitext(markdown_file_path)[0] + "_topic.md"
+        for report in self._stream("hacker_news_hours_topic", markdown_content, report_file_path):
+            yield report, report_file_path
+        LOG.info(f"Hacker News 热点主题报告已保存到 {report_file_path}")
+
+    def generate_hn_daily_report(self, directory_path, markdown_content=None):
         """
         生成 Hacker News 每日汇总的报告，并保存到 hacker_news/tech_trends/ 目录下。
         这里的输入是一个目录路径，其中包含所有由 generate_hn_topic_report 生成的 *_topic.md 文件。
+        若提供 markdown_content（例如 HNSnapshotStore 生成的快照统计），则直接使用，不再读取话题报告。
         """
-        markdown_content = self._aggregate_topic_reports(directory_path)
-        system_prompt = self.prompts.get("hacker_news_daily_report")
+        if markdown_content is None:
+            markdown_content = self._aggregate_topic_reports(directory_path)
 
         base_name = os.path.basename(directory_path.rstrip('/'))
         report_file_path = os.path.join("hacker_news/tech_trends/", f"{base_name}_trends.md")
@@ -68,14 +213,127 @@ class ReportGenerator:
         # 确保 tech_trends 目录存在
         os.makedirs(os.path.dirname(report_file_path), exist_ok=True)
         
-        report = self.llm.generate_report(system_prompt, markdown_content)
-        
-        with open(report_file_path, 'w+') as report_file:
-            report_file.write(report)
+        report = self._generate("hacker_news_daily_report", markdown_content, report_file_path)
         
         LOG.info(f"Hacker News 每日汇总报告已保存到 {report_file_path}")
         return report, report_file_path
 
+    def stats(self):
+        """
+        返回报告生成统计：调用 LLM 生成的次数和因内容未变化而跳过的次数。
+        """
+        with self._lock:
+            return {'generated': self.generated, 'skipped': self.skipped}
+
+    def _generate(self, report_type, markdown_content, report_file_path):
+        # 内容哈希命中且之前的报告文件仍然存在时直接复用，否则调用 LLM 生成并记录哈希
+        system_prompt = self.prompts.get(report_type)
+        key, report = self._reusable_report(system_prompt, markdown_content)
+        if report is None:
+            user_content = self._prepare(report_type, system_prompt, markdown_content)
+            report = self.llm.generate_report(system_prompt, user_content, report_type=report_type)
+            with self._lock:
+                self.generated += 1
+
+        with open(report_file_path, 'w+') as report_file:
+            report_file.write(report)
+        self._remember(key, report_file_path, markdown_content)
+        return report
+
+    def _stream(self, report_type, markdown_content, report_file_path):
+        # 与 _generate 相同，但逐段写入报告文件并返回当前已生成的内容；生成中断时不记录哈希
+        system_prompt = self.prompts.get(report_type)
+        key, report = self._reusable_report(system_prompt, markdown_content)
+        with open(report_file_path, 'w+') as report_file:
+            if report is not None:
+                report_file.write(report)
+                yield report
+            else:
+                report = ''
+                user_content = self._prepare(report_type, system_prompt, markdown_content)
+                deltas = self.llm.stream_report(system_prompt, user_content, report_type=report_type)
+                for delta in deltas:
+                    report += delta
+                    report_file.write(delta)
+                    report_file.flush()
+                    yield report
+                with self._lock:
+                    self.generated += 1
+        self._remember(key, report_file_path, markdown_content)
+
+    def _prepare(self, report_type, system_prompt, markdown_content):
+        # GitHub 报告先合并近似重复的条目，再按模型上下文处理超长输入
+        if report_type == "github" and self.dedup_threshold:
+            collapsed = collapse_markdown(markdown_content, self.dedup_threshold)
+            if len(collapsed) < len(markdown_content):
+                LOG.info(f"合并近似重复条目后输入从 {len(markdown_content)} 字符缩减到 {len(collapsed)} 字符。")
+            markdown_content = collapsed
+        return self._fit(system_prompt, markdown_content)
+
+    def _fit(self, system_prompt, markdown_content):
+        # 输入超出模型上下文时先分块提取要点，最终报告基于合并后的要点生成
+        map_prompt = self.prompts.get("chunk_summary")
+        if not map_prompt:
+            return markdown_content
+        summarizer = MapReduceSummarizer(self.llm, map_prompt, self.map_workers, self.context_tokens)
+        return summarizer.fit(system_prompt, markdown_content)
+
+    def _reusable_report(self, system_prompt, markdown_content):
+        # 返回 (内容哈希, 可复用的报告)，没有可复用的报告时为 None
+        key = self._content_hash(system_prompt, markdown_content)
+        report = self._cached_report(key, markdown_content)
+        if report is not None:
+            with self._lock:
+                self.skipped += 1
+            LOG.info(f"报告输入未变化，跳过 LLM 生成（累计跳过 {self.skipped} 次）。")
+        return key, report
+
+    def _content_hash(self, system_prompt, markdown_content):
+        digest = hashlib.sha256()
+        for part in (self.llm.model, getattr(self.llm, 'model_name', ''), system_prompt or '',
+                     normalize_content(markdown_content)):
+            digest.update(str(part).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _cached_report(self, key, markdown_content):
+        # 读取之前的报告，并把其中来自旧输入标题的日期替换为本次输入标题中的日期；无法安全替换时返回 None
+        if not self.cache_path:
+            return None
+        with self._lock:
+            entry = self._index.get(key)
+        if not isinstance(entry, list) or not os.path.exists(entry[0]):
+            return None  # 旧格式的索引条目没有记录标题，无法更新日期
+        report_file_path, title = entry
+        with open(report_file_path, 'r') as report_file:
+            report = report_file.read()
+        report = retarget_dates(report, title, _title(markdown_content))
+        if report is None:
+            LOG.info("之前的报告中包含无法对应到本次时间周期的日期，重新生成报告。")
+        return report
+
+    def _remember(self, key, report_file_path, markdown_content):
+        # 记录哈希对应的报告文件和输入标题，淘汰超出上限的最早条目后写入索引；先写临时文件再替换，避免索引损坏
+        if not self.cache_path:
+            return
+        with self._lock:
+            self._index.pop(key, None)
+            self._index[key] = [report_file_path, _title(markdown_content)]
+            while len(self._index) > self.max_cache_entries:
+                self._index.pop(next(iter(self._index)))
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            with open(self.cache_path + '.tmp', 'w', encoding='utf-8') as file:
+                json.dump(self._index, file)
+            os.replace(self.cache_path + '.tmp', self.cache_path)
+
+    def _load_index(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as file:
+                self._index = json.load(file)
+        except (OSError, ValueError) as e:
+            LOG.warning(f"报告哈希索引损坏，将重新建立：{str(e)}")
 
     def _aggregate_topic_reports(self, directory_path):
         """
@@ -95,7 +353,7 @@ if __name__ == '__main__':
 
     config = Config()
     llm = LLM(config)
-    report_generator = ReportGenerator(llm, config.report_types)
+    report_generator = ReportGenerator.from_config(llm, config)
 
     # hn_hours_file = "./hacker_news/2024-09-01/14.md"
     hn_daily_dir = "./hacker_news/2024-09-01/"
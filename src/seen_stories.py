@@ -0,0 +1,100 @@
+import json  # 导入json库用于读写索引文件
+import os  # 导入os模块用于文件和目录操作
+import threading  # 导入threading库，保证多线程访问安全
+import time  # 导入time库，用于记录出现时间
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit  # 导入URL解析函数，用于规范化链接
+from logger import LOG  # 导入日志模块
+
+TRACKING_PARAMS = ('utm_', 'ref', 'fbclid', 'gclid')  # 规范化链接时去掉的跟踪参数（前缀）
+
+
+def normalize_url(url):
+    """
+    规范化链接，使同一篇文章的不同写法得到相同的结果：
+    协议和主机名小写，去掉 www. 前缀、片段、跟踪参数和末尾的斜杠。
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not name.lower().startswith(TRACKING_PARAMS)]
+    return urlunsplit((parts.scheme.lower(), host, parts.path.rstrip('/'), urlencode(sorted(query)), ''))
+
+
+def story_key(story):
+    # 优先使用 HN 条目 id，没有 id 时（如只解析到标题和链接）使用规范化的链接
+    if story.get('id'):
+        return f"id:{story['id']}"
+    return f"url:{normalize_url(story.get('link') or '')}"
+
+
+class SeenStoryIndex:
+    def __init__(self, path=None, window_hours=24, clock=time.time):
+        """
+        初始化已出现新闻的索引，用于在多次快照之间识别新出现的新闻。
+        超过时间窗口未再出现的新闻会被淘汰，之后再次出现时重新视为新新闻。
+
+        :param path: 索引文件路径，为空时只在内存中保存。
+        :param window_hours: 滚动时间窗口（小时）。
+        :param clock: 获取当前时间戳的函数，便于测试。
+        """
+        self.path = path
+        self.window = window_hours * 3600
+        self.clock = clock
+        self._entries = {}  # key -> {'first_seen': 首次出现时间, 'last_seen': 最近出现时间}
+        self._lock = threading.Lock()
+        self._load()
+
+    def partition(self, stories):
+        """
+        将新闻分为时间窗口内首次出现的新新闻和之前已出现过的持续热门新闻，两者均保持原有顺序。
+
+        :return: (new_stories, trending_stories)
+        """
+        now = self.clock()
+        with self._lock:
+            self._evict(now)
+            seen = set(self._entries)
+        new_stories, trending_stories = [], []
+        for story in stories:
+            (trending_stories if story_key(story) in seen else new_stories).append(story)
+        return new_stories, trending_stories
+
+    def mark(self, stories):
+        """
+        记录本次快照中出现的新闻，并写入索引文件。
+        """
+        now = self.clock()
+        with self._lock:
+            for story in stories:
+                entry = self._entries.setdefault(story_key(story), {'first_seen': now})
+                entry['last_seen'] = now
+            self._evict(now)
+            self._save()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _evict(self, now):
+        # 淘汰超过时间窗口未再出现的新闻（调用方需持有锁）
+        self._entries = {key: entry for key, entry in self._entries.items() if now - entry['last_seen'] < self.window}
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                self._entries = json.load(file)
+        except (OSError, ValueError) as e:
+            LOG.warning(f"已出现新闻索引损坏，将重新建立：{str(e)}")
+
+    def _save(self):
+        # 先写临时文件再替换，避免进程中断导致索引损坏（调用方需持有锁）
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump(self._entries, file)
+        os.replace(self.path + '.tmp', self.path)
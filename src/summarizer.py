@@ -0,0 +1,138 @@
+"""
+超出模型上下文的输入的 map-reduce 摘要。
+
+输入在上下文预算内时原样返回；超出时按行切分为多个块（每块保留文档标题和所在小节的标题），
+map 阶段以有限并发分别提取各块要点，合并后的要点仍然超出预算时继续分组合并，
+最后由调用方使用原始提示对合并结果生成报告（reduce 阶段）。
+"""
+import re  # 导入re库，用于识别中日韩字符
+from concurrent.futures import ThreadPoolExecutor  # 导入线程池用于并发执行 map 阶段
+from logger import LOG  # 导入日志模块
+
+try:
+    import tiktoken  # 可选依赖：安装后精确统计 token 数
+except ImportError:
+    tiktoken = None
+
+# 各模型的上下文长度（token）。Ollama 模型按常用的上下文设置保守取值
+MODEL_CONTEXT = {
+    'gpt-4o': 128000,
+    'gpt-4o-mini': 128000,
+    'gpt-3.5-turbo': 16385,
+    'llama3': 8192,
+    'llama3.1': 8192,
+    'gemma2:2b': 8192,
+    'qwen2:7b': 32768,
+}
+DEFAULT_CONTEXT = 8192
+OUTPUT_RESERVE = 2048  # 为模型输出预留的 token 数
+MIN_CHUNK_TOKENS = 512
+MAX_REDUCE_ROUNDS = 3  # 合并要点的最大轮数，保证总耗时有上限
+CJK = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]')  # 假名、中日韩统一表意文字和谚文
+
+_encoding = None
+
+
+def estimate_tokens(text):
+    """
+    估算文本的 token 数：安装了 tiktoken 时使用 cl100k_base 编码精确统计，
+    否则按中日韩字符每字 1 个 token、其他字符每 4 个 1 个 token 估算。
+    """
+    global _encoding
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding('cl100k_base')
+        return len(_encoding.encode(text, disallowed_special=()))
+    cjk = len(CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def context_tokens(model_name):
+    # 按模型名称查找上下文长度，忽略 Ollama 的 :latest 等标签
+    if model_name in MODEL_CONTEXT:
+        return MODEL_CONTEXT[model_name]
+    return MODEL_CONTEXT.get(str(model_name).split(':')[0], DEFAULT_CONTEXT)
+
+
+def split_chunks(content, budget):
+    """
+    将 Markdown 按行切分为不超过 budget 个 token 的块。每块以文档标题和当前小节标题开头，
+    使模型在只看到部分内容时仍能知道所属项目和类别；超长的单行按字符切分为多段。
+    """
+    lines = content.split('\n')
+    title = lines[0] if lines and lines[0].startswith('# ') else ''
+    chunks, section = [], ''
+    current = [title] if title else []
+    header_size = len(current)  # 块开头的标题行数，只有标题的块不输出
+    size = sum(estimate_tokens(line) + 1 for line in current)
+    for line in lines[1:] if title else lines:
+        if line.startswith('## '):
+            section = line
+        for piece in _split_line(line, budget // 2):
+            piece_size = estimate_tokens(piece) + 1
+            if len(current) > header_size and size + piece_size > budget:
+                chunks.append('\n'.join(current))
+                current = [header for header in (title, section) if header and header != piece]
+                header_size = len(current)
+                size = sum(estimate_tokens(header) + 1 for header in current)
+            current.append(piece)
+            size += piece_size
+    if len(current) > header_size:
+        chunks.append('\n'.join(current))
+    return chunks
+
+
+def _split_line(line, budget):
+    # 将超出预算的单行按估算的字符数切分
+    tokens = estimate_tokens(line)
+    if tokens <= budget:
+        return [line]
+    size = max(1, len(line) * budget // tokens)
+    return [line[start:start + size] for start in range(0, len(line), size)]
+
+
+class MapReduceSummarizer:
+    def __init__(self, llm, map_prompt, max_workers=4, context=None):
+        """
+        :param llm: LLM 实例，map 阶段调用其 generate_report 方法。
+        :param map_prompt: map 阶段提取要点使用的系统提示。
+        :param max_workers: map 阶段的最大并发请求数。
+        :param context: 模型上下文长度（token），为空时按模型名称从 MODEL_CONTEXT 中查找。
+        """
+        self.llm = llm
+        self.map_prompt = map_prompt
+        self.max_workers = max(1, max_workers)
+        self.context = context
+
+    def budget(self, system_prompt):
+        """
+        计算一次请求中用户内容可使用的 token 数：上下文长度减去系统提示和输出预留。
+        """
+        context = self.context or context_tokens(getattr(self.llm, 'model_name', None))
+        return max(MIN_CHUNK_TOKENS, context - estimate_tokens(system_prompt or '') - OUTPUT_RESERVE)
+
+    def fit(self, system_prompt, content):
+        """
+        返回可以与 system_prompt 一起发送给模型的内容：未超出预算时原样返回，
+        否则返回 map 阶段提取的要点（必要时多轮合并）。
+        """
+        budget = self.budget(system_prompt)
+        if estimate_tokens(content) <= budget:
+            return content
+        title = content.split('\n', 1)[0] if content.startswith('# ') else ''
+        map_budget = self.budget(self.map_prompt)
+        for round_number in range(1, MAX_REDUCE_ROUNDS + 1):
+            chunks = split_chunks(content, map_budget)
+            LOG.info(f"输入超出模型上下文（预算 {budget} token），第 {round_number} 轮分为 {len(chunks)} 块提取要点。")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                summaries = list(executor.map(self._summarize_chunk, chunks))
+            content = '\n\n'.join([title] + summaries if title else summaries)
+            if estimate_tokens(content) <= budget or len(chunks) == 1:
+                break
+        if estimate_tokens(content) > budget:
+            LOG.warning(f"合并 {MAX_REDUCE_ROUNDS} 轮后仍超出预算，截断后生成报告。")
+            content = _split_line(content, budget)[0]
+        return content
+
+    def _summarize_chunk(self, chunk):
+        return self.llm.generate_report(self.map_prompt, chunk, report_type='chunk_summary')
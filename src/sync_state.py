@@ -0,0 +1,116 @@
+import json  # 导入json库用于读写同步状态文件
+import os  # 导入os模块用于文件和目录操作
+import threading  # 导入threading库，保证多线程访问安全
+from datetime import datetime, timedelta, timezone  # 导入日期处理模块
+from records import to_dict  # 导入精简记录的序列化函数
+from time_utils import parse_time  # 导入时间解析函数
+
+
+def item_key(resource, item):
+    # 返回数据条目的唯一标识：Commit 使用 SHA，Issue 和 Pull Request 使用编号
+    return item['sha'] if resource == 'commits' else str(item['number'])
+
+
+def item_time(resource, item):
+    # 返回数据条目用于增量同步的时间：Commit 使用提交时间，Issue 和 Pull Request 使用更新时间
+    if resource == 'commits':
+        commit = item.get('commit', {})
+        person = commit.get('committer') or commit.get('author') or {}
+        return person.get('date')
+    return item.get('updated_at')
+
+
+class SyncStateStore:
+    def __init__(self, state_dir, retention_days=30):
+        """
+        初始化增量同步状态存储，按仓库和数据类型记录已获取数据的高水位（最新时间），
+        并在本地保留最近一段时间的数据，用于与增量数据合并成完整的时间窗口。
+
+        每个仓库保存为一个 JSON 文件，结构为：
+        {resource: {'mark': 最新时间, 'covered_since': 数据完整覆盖的起始时间, 'items': {key: item}}}
+
+        :param state_dir: 状态文件目录。
+        :param retention_days: 本地保留数据的天数，应不小于报告使用的最大时间窗口。
+        """
+        self.state_dir = state_dir
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        os.makedirs(state_dir, exist_ok=True)  # 确保目录存在
+
+    def fetch_since(self, repo, resource, since):
+        """
+        计算本次需要从 API 获取数据的起始时间。
+
+        :param since: 报告时间窗口的起始时间。
+        :return: 若本地数据已覆盖 since 之后的时间段，返回高水位（只需获取增量）；否则返回 since。
+        """
+        with self._lock:
+            state = self._load(repo).get(resource)
+        if state and state['mark'] and state['covered_since'] and parse_time(state['covered_since']) <= parse_time(since):
+            return max(state['mark'], since, key=parse_time)
+        return since
+
+    def merge(self, repo, resource, items, fetched_since):
+        """
+        将从 API 获取的数据合并到本地，按唯一标识去重（保留最新版本），并推进高水位。
+        只有在获取成功完成后才应调用，以免跳过未获取到的数据。
+
+        :param items: 从 fetched_since 开始获取到的全部数据。
+        :param fetched_since: 本次获取的起始时间。
+        """
+        with self._lock:
+            data = self._load(repo)
+            state = data.setdefault(resource, {'mark': None, 'covered_since': None, 'items': {}})
+            for item in items:
+                state['items'][item_key(resource, item)] = to_dict(item)
+                timestamp = item_time(resource, item)
+                if timestamp and (not state['mark'] or parse_time(timestamp) > parse_time(state['mark'])):
+                    state['mark'] = timestamp
+            if not state['covered_since'] or parse_time(fetched_since) < parse_time(state['covered_since']):
+                state['covered_since'] = fetched_since
+            self._prune(resource, state)
+            self._save(repo, data)
+
+    def items_since(self, repo, resource, since, until=None):
+        """
+        返回本地保存的、时间在 [since, until] 范围内的数据，按时间倒序排列。
+        """
+        since_time = parse_time(since)
+        until_time = parse_time(until) if until else None
+        with self._lock:
+            state = self._load(repo).get(resource) or {'items': {}}
+        selected = []
+        for item in state['items'].values():
+            timestamp = item_time(resource, item)
+            if not timestamp:
+                continue
+            timestamp = parse_time(timestamp)
+            if timestamp >= since_time and (until_time is None or timestamp <= until_time):
+                selected.append((timestamp, item))
+        selected.sort(key=lambda pair: pair[0], reverse=True)
+        return [item for _, item in selected]
+
+    def _prune(self, resource, state):
+        # 删除超过保留期限的数据，并相应推后完整覆盖的起始时间
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        state['items'] = {key: item for key, item in state['items'].items()
+                          if not item_time(resource, item) or parse_time(item_time(resource, item)) >= cutoff}
+        if state['covered_since'] and parse_time(state['covered_since']) < cutoff:
+            state['covered_since'] = cutoff.isoformat()
+
+    def _path(self, repo):
+        return os.path.join(self.state_dir, f"{repo.replace('/', '_')}.json")
+
+    def _load(self, repo):
+        path = self._path(repo)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def _save(self, repo, data):
+        # 先写临时文件再替换，避免进程中断导致状态文件损坏
+        path = self._path(repo)
+        with open(path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False)
+        os.replace(path + '.tmp', path)
@@ -0,0 +1,15 @@
+from datetime import date, datetime, timedelta, timezone  # 导入日期处理模块
+
+
+def parse_time(value):
+    # 将 ISO 格式的日期或时间字符串解析为带时区的 datetime，未带时区的按 UTC 处理
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def date_range(days):
+    # 返回最近 days 天的 (开始日期, 结束日期)，结束日期为今天
+    today = date.today()
+    return today - timedelta(days=days), today
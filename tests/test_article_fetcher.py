@@ -0,0 +1,118 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from article_fetcher import ArticleFetcher, extract_text  # 导入要测试的文章获取器
+from http_cache import HTTPCache
+from http_transport import HTTPTransport
+
+ARTICLE = '''<html><head><title>Small strings</title><script>var tracking = 1;</script></head>
+<body><nav><a href="/">Home</a></nav>
+<article><h1>Small strings in Rust</h1><p>Strings  are
+everywhere.</p><p>Inline storage avoids &amp; heap allocations.</p></article>
+<footer>Copyright</footer></body></html>'''
+
+
+class ArticleHandler(BaseHTTPRequestHandler):
+    # 本地替身站点：/article 返回正文，/large 返回超大页面，/slow 延迟返回，/image 返回二进制内容
+    requests_seen = []
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with ArticleHandler.lock:
+            ArticleHandler.requests_seen.append(self.path)
+            ArticleHandler.active += 1
+            ArticleHandler.max_active = max(ArticleHandler.max_active, ArticleHandler.active)
+        try:
+            if self.path.startswith('/slow'):
+                time.sleep(0.2)
+            if self.path.startswith('/large'):
+                body, content_type = b'<p>' + b'x' * 100000 + b'</p>', 'text/html'
+            elif self.path.startswith('/image'):
+                body, content_type = b'\x89PNG', 'image/png'
+            else:
+                body, content_type = ARTICLE.encode('utf-8'), 'text/html; charset=utf-8'
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 客户端超时或达到字节上限后提前断开
+        finally:
+            with ArticleHandler.lock:
+                ArticleHandler.active -= 1
+
+    def log_message(self, format, *args):
+        pass  # 测试时不输出访问日志
+
+
+class TestArticleFetcher(unittest.TestCase):
+    def setUp(self):
+        ArticleHandler.requests_seen = []
+        ArticleHandler.max_active = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), ArticleHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.cache_dir = tempfile.mkdtemp()
+        self.transport = HTTPTransport(max_retries=0)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.transport.close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def make_fetcher(self, **kwargs):
+        return ArticleFetcher(self.transport, HTTPCache(self.cache_dir), **kwargs)
+
+    def test_extract_text(self):
+        self.assertEqual(extract_text(ARTICLE),
+                         'Small strings in Rust Strings are everywhere. Inline storage avoids & heap allocations.')
+        self.assertEqual(extract_text('<div>No <b>paragraphs</b></div>'), 'No paragraphs')
+        self.assertEqual(extract_text(ARTICLE, max_chars=13), 'Small strings')
+
+    def test_enrich_uses_disk_cache(self):
+        """
+        测试同一链接在多次快照中只获取一次，重新创建实例后仍然使用磁盘缓存。
+        """
+        stories = [{'title': 'Rust', 'link': f'{self.base_url}/article'},
+                   {'title': 'Ask HN', 'link': 'https://news.ycombinator.com/item?id=1'},
+                   {'title': 'Image', 'link': f'{self.base_url}/image'}]
+        self.make_fetcher().enrich(stories)
+        self.assertTrue(stories[0]['excerpt'].startswith('Small strings in Rust'))
+        self.assertEqual(stories[1]['excerpt'], '')
+        self.assertEqual(stories[2]['excerpt'], '')
+
+        fetcher = self.make_fetcher()
+        again = fetcher.enrich([{'title': 'Rust', 'link': f'{self.base_url}/article'},
+                                {'title': 'Image', 'link': f'{self.base_url}/image'}])
+        self.assertEqual(again[0]['excerpt'], stories[0]['excerpt'])
+        self.assertEqual(sorted(ArticleHandler.requests_seen), ['/article', '/image'])
+        self.assertEqual(fetcher.cache.stats()['hits'], 2)
+
+    def test_byte_cap_and_per_host_limit(self):
+        fetcher = self.make_fetcher(max_workers=8, per_host_limit=2, max_bytes=1000)
+        texts = fetcher.fetch_many([f'{self.base_url}/slow?{index}' for index in range(6)] +
+                                   [f'{self.base_url}/large'])
+        self.assertEqual(len(texts), 7)
+        self.assertLessEqual(len(texts[f'{self.base_url}/large']), 1000)
+        self.assertLessEqual(ArticleHandler.max_active, 2)
+
+    def test_timeout_returns_empty_text(self):
+        fetcher = ArticleFetcher(self.transport, timeout=0.05)
+        self.assertEqual(fetcher.fetch(f'{self.base_url}/slow'), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import asyncio
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch, AsyncMock
+
+import httpx
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from async_github_client import AsyncGitHubClient  # 导入要测试的 AsyncGitHubClient 类
+from github_client import GitHubClient
+from http_cache import HTTPCache
+from rate_limiter import RateLimitScheduler
+from sync_state import SyncStateStore
+
+
+def make_response(status_code=200, json=None, headers=None, url='https://api.github.com/repos/owner/repo/issues'):
+    # 构造 httpx 响应对象，raise_for_status 需要关联请求
+    return httpx.Response(status_code, json=json, headers=headers, request=httpx.Request('GET', url))
+
+
+class TestAsyncGitHubClient(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，初始化测试环境。
+        """
+        self.token = "fake_token"  # 使用一个虚拟的 GitHub API 令牌
+        self.client = AsyncGitHubClient(GitHubClient(self.token))
+        self.repo = "DjangoPeng/openai-quickstart"  # 要测试的仓库名称
+
+    async def asyncSetUp(self):
+        await self.enterAsyncContext(self.client)  # 每个测试在自己的事件循环中打开并关闭连接
+
+    @patch('httpx.AsyncClient.get', new_callable=AsyncMock)
+    async def test_fetch_issues_follows_pagination(self, mock_get):
+        """
+        测试 fetch_issues 是否跟随 Link: rel="next" 获取所有分页，且不发送值为 None 的参数。
+        """
+        next_url = 'https://api.github.com/repositories/1/issues?page=2'
+        mock_get.side_effect = [
+            make_response(json=[{"number": 1, "title": "Fix bug"}], headers={'Link': f'<{next_url}>; rel="next"'}),
+            make_response(json=[{"number": 2, "title": "Fix docs"}], url=next_url),
+        ]
+
+        issues = await self.client.fetch_issues(self.repo)
+        self.assertEqual([issue['number'] for issue in issues], [1, 2])
+        self.assertNotIn('since', mock_get.call_args_list[0].kwargs['params'])
+        self.assertEqual(mock_get.call_args_list[1].args[0], next_url)
+
+    @patch('httpx.AsyncClient.get', new_callable=AsyncMock)
+    async def test_iter_pull_requests_stops_before_since(self, mock_get):
+        """
+        测试 iter_pull_requests 在遇到早于 since 的数据时提前停止，不再请求下一页。
+        """
+        mock_get.return_value = make_response(json=[
+            {"number": 3, "title": "New feature", "updated_at": "2024-08-21T08:00:00Z"},
+            {"number": 2, "title": "Old feature", "updated_at": "2024-08-19T08:00:00Z"},
+        ], headers={'Link': '<https://api.github.com/repositories/1/pulls?page=2>; rel="next"'})
+
+        pull_requests = [pr async for pr in self.client.iter_pull_requests(self.repo, since="2024-08-20")]
+        self.assertEqual([pr['number'] for pr in pull_requests], [3])
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('httpx.AsyncClient.get', new_callable=AsyncMock)
+    async def test_fetch_issues_uses_etag_cache(self, mock_get):
+        """
+        测试启用缓存后发送条件请求，并在 304 响应时返回缓存内容。
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        self.client.client.cache = HTTPCache(cache_dir)
+        mock_get.side_effect = [
+            make_response(json=[{"number": 1, "title": "Fix bug"}], headers={'ETag': '"v1"'}),
+            make_response(status_code=304),
+        ]
+
+        first = await self.client.fetch_issues(self.repo)
+        second = await self.client.fetch_issues(self.repo)
+        self.assertEqual(first, second)
+        self.assertEqual(mock_get.call_args_list[1].kwargs['headers']['If-None-Match'], '"v1"')
+        self.assertEqual(self.client.cache.stats()['hits'], 1)
+
+    @patch('async_github_client.asyncio.sleep', new_callable=AsyncMock)
+    @patch('httpx.AsyncClient.get', new_callable=AsyncMock)
+    async def test_fetch_issues_retries_after_rate_limit(self, mock_get, mock_sleep):
+        """
+        测试触发速率限制时异步等待并重试，而不是返回空列表。
+        """
+        clock = [1000.0]
+        mock_sleep.side_effect = lambda seconds: clock.__setitem__(0, clock[0] + seconds)
+        self.client.client.rate_limiter = RateLimitScheduler([self.token], clock=lambda: clock[0])
+        mock_get.side_effect = [
+            make_response(status_code=403, headers={'Retry-After': '1'}),
+            make_response(json=[{"number": 1, "title": "Fix bug"}], headers={'X-RateLimit-Remaining': '4999'}),
+        ]
+
+        issues = await self.client.fetch_issues(self.repo)
+        self.assertEqual(len(issues), 1)
+        self.assertEqual(mock_get.call_count, 2)
+        mock_sleep.assert_awaited_once_with(1.0)  # 重试前等待了 Retry-After 指定的时间
+
+    @patch('httpx.AsyncClient.get', new_callable=AsyncMock)
+    async def test_fetch_updates_batch(self, mock_get):
+        """
+        测试 fetch_updates_batch 在一个事件循环中并发获取多个仓库，并为每个仓库产出三类数据。
+        """
+        mock_get.side_effect = lambda url, **kwargs: make_response(json=[], url=url)
+        repos = [f"owner/repo{i}" for i in range(20)]
+
+        results = {repo: updates async for repo, updates in self.client.fetch_updates_batch(repos)}
+        self.assertEqual(set(results), set(repos))
+        self.assertEqual(set(results[repos[0]]), {'commits', 'issues', 'pull_requests'})
+        self.assertEqual(mock_get.call_count, 60)  # 每个仓库三类数据各请求一次
+
+    @patch('httpx.AsyncClient.get', new_callable=AsyncMock)
+    async def test_sync_merges_with_local_state(self, mock_get):
+        """
+        测试 sync 与 GitHubClient.sync 共用增量同步逻辑：第二次只从高水位开始获取，并与本地数据合并；获取失败时返回本地数据。
+        """
+        state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, state_dir, ignore_errors=True)
+        self.client.client.sync_state = SyncStateStore(state_dir)
+        since = (date.today() - timedelta(days=1)).isoformat()
+        updated_at = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        mock_get.side_effect = [
+            make_response(json=[{"number": 1, "title": "Fix bug", "updated_at": updated_at}]),
+            make_response(status_code=500),
+        ]
+
+        first = await self.client.sync(self.repo, 'issues', since)
+        second = await self.client.sync(self.repo, 'issues', since)
+        self.assertEqual([issue['number'] for issue in first], [1])
+        self.assertEqual(second, first)
+        self.assertEqual(mock_get.call_args_list[1].kwargs['params']['since'], updated_at)
+
+    @patch('httpx.AsyncClient.get', new_callable=AsyncMock)
+    async def test_export_progress_by_date_range(self, mock_get):
+        """
+        测试 export_progress_by_date_range 是否正确导出指定日期范围内的进度报告。
+        """
+        mock_get.return_value = make_response(json=[{"number": 1, "title": "Fix bug"}])
+
+        file_path = await self.client.export_progress_by_date_range(self.repo, days=7)
+        self.assertTrue(file_path.endswith('.md'))
+        with open(file_path) as file:
+            self.assertIn("- Fix bug #1", file.read())
+
+
+class TestAsyncGitHubClientSession(unittest.TestCase):
+    @patch('httpx.AsyncClient.get', new_callable=AsyncMock)
+    def test_each_run_closes_its_connections(self, mock_get):
+        """
+        测试每次 asyncio.run 退出 async with 时关闭该事件循环上的 httpx 客户端，而不是在下一次运行时留下未关闭的连接。
+        """
+        mock_get.return_value = make_response(json=[])
+        client = AsyncGitHubClient(GitHubClient("fake_token"))
+        sessions = []
+
+        async def run():
+            async with client:
+                sessions.append(client._session()[0])
+                await client.fetch_issues("owner/repo")
+
+        asyncio.run(run())
+        asyncio.run(run())
+        self.assertIsNot(sessions[0], sessions[1])
+        self.assertTrue(all(session.is_closed for session in sessions))
+
+        async def outside():
+            return client._session()
+
+        with self.assertRaises(RuntimeError):  # 未进入 async with 时不会隐式创建连接
+            asyncio.run(outside())
+
+if __name__ == '__main__':
+    unittest.main()
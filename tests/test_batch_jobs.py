@@ -0,0 +1,42 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from batch_jobs import BatchJobStore  # 导入要测试的 BatchJobStore 类
+
+class TestBatchJobStore(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，创建临时目录。
+        """
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'batch_jobs.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_jobs_survive_restart(self):
+        """
+        测试任务写入文件，重新打开后仍可收取；收取后删除的任务不再保留。
+        """
+        store = BatchJobStore(self.path)
+        first = store.add({'llm': {'batch_id': 'batch-1'}, 'repos': {'a.md': 'owner/a'}})
+        store.add({'llm': {'batch_id': 'batch-2'}, 'repos': {}})
+
+        reopened = BatchJobStore(self.path)
+        self.assertEqual([job['llm']['batch_id'] for _, job in reopened.items()], ['batch-1', 'batch-2'])
+        reopened.remove(first)
+        self.assertEqual(len(BatchJobStore(self.path)), 1)
+
+    def test_corrupted_file(self):
+        with open(self.path, 'w') as file:
+            file.write('{')
+        self.assertEqual(len(BatchJobStore(self.path)), 0)
+
+if __name__ == '__main__':
+    unittest.main()
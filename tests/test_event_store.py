@@ -0,0 +1,135 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from event_store import EventStore  # 导入要测试的 EventStore 类
+from sync_state import SyncStateStore  # 导入基于 JSON 文件的同步状态存储，用于对比查询结果
+
+def days_ago(days, hour=0):
+    # 返回若干天前的 ISO 时间字符串（GitHub 格式）
+    moment = datetime.now(timezone.utc).replace(hour=hour, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def make_issue(number, title, closed_days_ago, updated_days_ago=None):
+    return {'number': number, 'title': title, 'state': 'closed', 'user': {'login': 'octocat'},
+            'closed_at': days_ago(closed_days_ago), 'updated_at': days_ago(updated_days_ago or closed_days_ago)}
+
+class TestEventStore(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，创建临时数据库。
+        """
+        self.db_dir = tempfile.mkdtemp()
+        self.store = EventStore(os.path.join(self.db_dir, 'events.db'))
+        self.repo = "DjangoPeng/openai-quickstart"
+
+    def tearDown(self):
+        """
+        在每个测试方法之后运行，关闭连接并删除临时数据库。
+        """
+        self.store.close()
+        shutil.rmtree(self.db_dir, ignore_errors=True)
+
+    def test_uses_wal_mode(self):
+        """
+        测试数据库使用 WAL 日志模式。
+        """
+        mode = self.store._connection().execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_upsert_and_query_by_updated_at(self):
+        """
+        测试批量写入后按更新时间查询，重复写入时更新已有记录。
+        """
+        self.store.merge(self.repo, 'issues', [make_issue(1, 'Fix bug', 1), make_issue(2, 'Old issue', 40)],
+                         days_ago(90))
+        self.store.merge(self.repo, 'issues', [make_issue(1, 'Fix bug (renamed)', 1)], days_ago(1))
+
+        issues = self.store.items_since(self.repo, 'issues', days_ago(7))
+        self.assertEqual(len(issues), 1)  # 更新时间早于窗口的 issue 不会返回
+        self.assertEqual(issues[0]['title'], 'Fix bug (renamed)')
+        self.assertEqual(issues[0]['user'], {'login': 'octocat'})
+        self.assertEqual(len(self.store.items_since(self.repo, 'issues', days_ago(60))), 2)
+
+    def test_time_window_matches_sync_state_store(self):
+        """
+        测试 EventStore 与 SyncStateStore 按同一时间列过滤：早已关闭但最近更新的 issue 和未关闭的 issue 都按更新时间返回。
+        """
+        state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, state_dir, ignore_errors=True)
+        sync_state = SyncStateStore(state_dir, retention_days=90)
+        reopened = dict(make_issue(3, 'Open issue', 0, 3), state='open', closed_at=None)
+        issues = [make_issue(1, 'Fix bug', 1), make_issue(2, 'Closed long ago', 40, 2), reopened,
+                  make_issue(4, 'Old issue', 40)]
+        for store in (self.store, sync_state):
+            store.merge(self.repo, 'issues', issues, days_ago(60))
+
+        numbers = [[issue['number'] for issue in store.items_since(self.repo, 'issues', days_ago(7))]
+                   for store in (self.store, sync_state)]
+        self.assertEqual(numbers[0], [1, 2, 3])
+        self.assertEqual(numbers[0], numbers[1])
+
+    def test_retention_removes_unclosed_items(self):
+        """
+        测试超过保留期限的数据按更新时间删除，closed_at 为空的数据也会被删除。
+        """
+        store = EventStore(os.path.join(self.db_dir, 'retention.db'), retention_days=30)
+        self.addCleanup(store.close)
+        stale = dict(make_issue(1, 'Stale open issue', 0, 60), state='open', closed_at=None)
+        fresh = dict(make_issue(2, 'Fresh open issue', 0, 1), state='open', closed_at=None)
+        store.merge(self.repo, 'issues', [stale, fresh], days_ago(90))
+
+        count = store._connection().execute('SELECT COUNT(*) FROM issues').fetchone()[0]
+        self.assertEqual(count, 1)
+        self.assertEqual([issue['number'] for issue in store.items_since(self.repo, 'issues', days_ago(90))], [2])
+
+    def test_commits_round_trip(self):
+        """
+        测试 Commits 写入后以 REST 接口的结构返回。
+        """
+        commit = {'sha': 'abc123', 'commit': {'message': 'Initial commit',
+                                              'author': {'name': 'Octo Cat', 'date': days_ago(1)},
+                                              'committer': {'date': days_ago(1)}}}
+        self.store.merge(self.repo, 'commits', [commit], days_ago(7))
+
+        commits = self.store.items_since(self.repo, 'commits', days_ago(7))
+        self.assertEqual(commits[0]['sha'], 'abc123')
+        self.assertEqual(commits[0]['commit']['message'], 'Initial commit')
+
+    def test_fetch_since_tracks_high_water_mark(self):
+        """
+        测试高水位与完整覆盖起始时间的计算与 SyncStateStore 一致。
+        """
+        self.assertEqual(self.store.fetch_since(self.repo, 'issues', days_ago(7)), days_ago(7))
+        self.store.merge(self.repo, 'issues', [make_issue(1, 'Fix bug', 2, 1)], days_ago(7))
+        self.assertEqual(self.store.fetch_since(self.repo, 'issues', days_ago(7)), days_ago(1))
+        self.assertEqual(self.store.fetch_since(self.repo, 'issues', days_ago(30)), days_ago(30))
+        # 没有新数据时高水位保持不变
+        self.store.merge(self.repo, 'issues', [], days_ago(1))
+        self.assertEqual(self.store.fetch_since(self.repo, 'issues', days_ago(7)), days_ago(1))
+
+    def test_concurrent_merges(self):
+        """
+        测试多个线程同时写入不同仓库的数据。
+        """
+        def worker(index):
+            self.store.merge(f'owner/repo-{index}', 'issues', [make_issue(n, f'Issue {n}', 1) for n in range(50)],
+                             days_ago(7))
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for index in range(4):
+            self.assertEqual(len(self.store.items_since(f'owner/repo-{index}', 'issues', days_ago(7))), 50)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+import requests
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from fake_github_server import FakeGitHubServer, load_fixtures, synthetic_fixtures  # 导入要测试的替身服务器
+from github_client import GitHubClient
+from github_graphql_client import GitHubGraphQLClient
+from http_cache import HTTPCache
+from http_transport import HTTPTransport
+from sync_state import SyncStateStore
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'github')
+REPO = 'octocat/hello-world'
+
+
+class TestFakeGitHubServer(unittest.TestCase):
+    def start_server(self, **kwargs):
+        server = FakeGitHubServer(**kwargs).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def make_client(self, server, client_class=GitHubClient, **kwargs):
+        transport = HTTPTransport(max_retries=0)
+        self.addCleanup(transport.close)
+        return client_class("fake_token", transport=transport, api_url=server.url, **kwargs)
+
+    def test_replay_fixtures(self):
+        """
+        测试回放 fixtures：Issues 只返回已关闭且在 since 之后更新的数据（与 GitHub 一样包含 Pull Requests），
+        Pulls 按更新时间倒序返回。
+        """
+        server = self.start_server(fixtures_dir=FIXTURES_DIR)
+        client = self.make_client(server)
+
+        issues = client.fetch_issues(REPO, since='2024-08-18')
+        self.assertEqual([issue['number'] for issue in issues], [3, 4])
+        self.assertEqual([pr['number'] for pr in client.fetch_pull_requests(REPO)], [4])
+        commits = client.fetch_commits(REPO, since='2024-08-10T00:00:00Z')
+        self.assertEqual([commit['commit']['message'] for commit in commits],
+                         ['Merge pull request #4 from hubot/pagination'])
+
+    def test_pagination_and_etag(self):
+        """
+        测试超过一页的数据通过 Link 头分页返回，第二次请求时命中 ETag 返回 304 且不消耗配额。
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        server = self.start_server(fixtures=synthetic_fixtures(['bench/repo'], 250))
+        client = self.make_client(server, cache=HTTPCache(cache_dir))
+
+        first = client.fetch_issues('bench/repo')
+        second = client.fetch_issues('bench/repo')
+        self.assertEqual(len(first), 250)
+        self.assertEqual(first, second)
+        self.assertEqual(server.stats()['requests'], 6)  # 每次 3 页
+        self.assertEqual(server.stats()['not_modified'], 3)
+        self.assertEqual(client.rate_limiter.stats()[0]['remaining'], 4997)  # 304 不计入配额
+
+    def test_consecutive_syncs_hit_etag(self):
+        """
+        测试连续两次增量同步：第二次的 since 推进到高水位，但缓存键不包含 since，数据未变化时服务端返回 304。
+        """
+        cache_dir = tempfile.mkdtemp()
+        state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, state_dir, ignore_errors=True)
+        server = self.start_server(fixtures=synthetic_fixtures(['bench/repo'], 60))
+        client = self.make_client(server, cache=HTTPCache(cache_dir), sync_state=SyncStateStore(state_dir))
+        since = (date.today() - timedelta(days=7)).isoformat()
+
+        first = client.sync('bench/repo', 'issues', since)
+        self.assertEqual(client.sync_state.fetch_since('bench/repo', 'issues', since), first[0]['updated_at'])
+        second = client.sync('bench/repo', 'issues', since)
+        self.assertEqual(second, first)
+        self.assertEqual(server.stats()['requests'], 2)
+        self.assertEqual(server.stats()['not_modified'], 1)
+        self.assertEqual(client.cache.stats()['hits'], 1)
+
+    def test_rate_limit_headers(self):
+        """
+        测试配额耗尽后返回 403 和 X-RateLimit-Remaining: 0。
+        """
+        server = self.start_server(fixtures_dir=FIXTURES_DIR, rate_limit=1)
+        url = f'{server.url}/repos/{REPO}/issues'
+        headers = {'Authorization': 'token fake_token'}
+
+        ok = requests.get(url, headers=headers)
+        limited = requests.get(url, headers=headers)
+        self.assertEqual(ok.headers['X-RateLimit-Remaining'], '0')
+        self.assertEqual(limited.status_code, 403)
+        self.assertEqual(server.stats()['rate_limited'], 1)
+
+    def test_error_injection(self):
+        """
+        测试注入 502 错误时客户端记录失败并返回空列表。
+        """
+        server = self.start_server(fixtures_dir=FIXTURES_DIR, error_rate=1.0)
+        client = self.make_client(server)
+
+        self.assertEqual(client.fetch_issues(REPO), [])
+        self.assertEqual(server.stats()['errors'], 1)
+
+    def test_graphql_backend(self):
+        """
+        测试 GraphQL 客户端通过替身服务器批量获取多个仓库，未知仓库返回空数据；Issues 与 REST 后端一致。
+        """
+        server = self.start_server(fixtures_dir=FIXTURES_DIR)
+        client = self.make_client(server, GitHubGraphQLClient)
+
+        updates = dict(client.fetch_updates_batch([REPO, 'octocat/missing'], since='2024-08-18T00:00:00Z'))
+        self.assertEqual([issue['number'] for issue in updates[REPO]['issues']], [3, 4])
+        rest_issues = self.make_client(server).fetch_issues(REPO, since='2024-08-18T00:00:00Z')
+        self.assertEqual([issue['number'] for issue in rest_issues],
+                         [issue['number'] for issue in updates[REPO]['issues']])
+        self.assertEqual([pr['number'] for pr in updates[REPO]['pull_requests']], [4])
+        self.assertEqual(len(updates[REPO]['commits']), 1)
+        self.assertEqual(updates['octocat/missing']['issues'], [])
+
+    def test_record_then_replay(self):
+        """
+        测试录制模式转发请求并写入 fixtures，之后可以离线回放相同的数据。
+        """
+        record_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, record_dir, ignore_errors=True)
+        upstream = self.start_server(fixtures=synthetic_fixtures(['bench/repo'], 150))
+        recorder = self.start_server(fixtures_dir=record_dir, upstream=upstream.url)
+
+        recorded = self.make_client(recorder).fetch_issues('bench/repo')
+        self.assertEqual(len(recorded), 150)  # 分页链接被改写到录制服务器
+        self.assertEqual(len(load_fixtures(record_dir)['bench/repo']['issues']), 150)
+
+        replay = self.start_server(fixtures_dir=record_dir)
+        self.assertEqual(self.make_client(replay).fetch_issues('bench/repo'), recorded)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import sys
+import os
+import unittest
+from types import SimpleNamespace
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from async_github_client import AsyncGitHubClient  # 导入异步GitHub客户端
+from github_backends import create_github_client  # 导入要测试的工厂函数
+from github_client import GitHubClient  # 导入REST客户端
+from github_graphql_client import GitHubGraphQLClient  # 导入GraphQL客户端
+
+def make_config(backend):
+    # 构造不启用缓存和增量同步的最小配置
+    return SimpleNamespace(github_backend=backend, github_tokens=['fake_token'], github_max_concurrent_requests=4,
+                           github_cache_dir=None, github_cache_max_mb=200, github_event_store_path=None,
+                           github_sync_state_dir=None, github_sync_retention_days=90, github_compact_records=True,
+                           github_api_url='https://api.github.com', github_graphql_batch_size=5)
+
+class TestGitHubBackends(unittest.TestCase):
+    def test_create_github_client(self):
+        """
+        测试按配置中的后端创建对应的客户端，未知的后端使用 REST 客户端。
+        """
+        self.assertIs(type(create_github_client(make_config('rest'))), GitHubClient)
+        self.assertIs(type(create_github_client(make_config('unknown'))), GitHubClient)
+        client = create_github_client(make_config('async'))
+        self.assertIsInstance(client, AsyncGitHubClient)
+        self.assertIs(type(client.client), GitHubClient)  # 异步客户端包装 REST 客户端，而不是继承它
+        client = create_github_client(make_config('graphql'))
+        self.assertIsInstance(client, GitHubGraphQLClient)
+        self.assertEqual(client.batch_size, 5)
+
+if __name__ == '__main__':
+    unittest.main()
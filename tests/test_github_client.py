@@ -1,12 +1,19 @@
 import sys
 import os
+import shutil
+import tempfile
 import unittest
+from datetime import datetime, timedelta, timezone
 from unittest.mock import patch, MagicMock
 
 # 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
 from github_client import GitHubClient  # 导入要测试的 GitHubClient 类
+from http_cache import HTTPCache
+from rate_limiter import RateLimitScheduler
+from sync_state import SyncStateStore
+from records import IssueRecord
 
 class TestGitHubClient(unittest.TestCase):
     def setUp(self):
@@ -17,7 +24,7 @@ class TestGitHubClient(unittest.TestCase):
         self.client = GitHubClient(self.token)  # 使用该令牌初始化 GitHubClient 实例
         self.repo = "DjangoPeng/openai-quickstart"  # 要测试的仓库名称
 
-    @patch('github_client.requests.get')
+    @patch('http_transport.HTTPTransport.get')
     def test_fetch_commits(self, mock_get):
         """
         测试 fetch_commits 方法是否正确获取提交记录。
@@ -26,6 +33,7 @@ class TestGitHubClient(unittest.TestCase):
         mock_response = MagicMock()
         mock_response.json.return_value = [{"sha": "abc123", "commit": {"message": "Initial commit"}}]
         mock_response.status_code = 200
+        mock_response.links = {}  # 没有下一页
         mock_get.return_value = mock_response  # 将模拟的响应赋值给 mock_get
 
         # 调用 fetch_commits 方法并进行断言检查
@@ -34,7 +42,7 @@ class TestGitHubClient(unittest.TestCase):
         self.assertEqual(commits[0]['sha'], "abc123")  # 检查返回的提交记录 SHA 值
         self.assertEqual(commits[0]['commit']['message'], "Initial commit")  # 检查提交记录中的消息
 
-    @patch('github_client.requests.get')
+    @patch('http_transport.HTTPTransport.get')
     def test_fetch_issues(self, mock_get):
         """
         测试 fetch_issues 方法是否正确获取关闭的问题。
@@ -43,6 +51,7 @@ class TestGitHubClient(unittest.TestCase):
         mock_response = MagicMock()
         mock_response.json.return_value = [{"number": 1, "title": "Fix bug"}]
         mock_response.status_code = 200
+        mock_response.links = {}  # 没有下一页
         mock_get.return_value = mock_response  # 将模拟的响应赋值给 mock_get
 
         # 调用 fetch_issues 方法并进行断言检查
@@ -51,7 +60,7 @@ class TestGitHubClient(unittest.TestCase):
         self.assertEqual(issues[0]['number'], 1)  # 检查问题编号是否正确
         self.assertEqual(issues[0]['title'], "Fix bug")  # 检查问题标题是否正确
 
-    @patch('github_client.requests.get')
+    @patch('http_transport.HTTPTransport.get')
     def test_fetch_pull_requests(self, mock_get):
         """
         测试 fetch_pull_requests 方法是否正确获取拉取请求。
@@ -60,6 +69,7 @@ class TestGitHubClient(unittest.TestCase):
         mock_response = MagicMock()
         mock_response.json.return_value = [{"number": 42, "title": "Add new feature"}]
         mock_response.status_code = 200
+        mock_response.links = {}  # 没有下一页
         mock_get.return_value = mock_response  # 将模拟的响应赋值给 mock_get
 
         # 调用 fetch_pull_requests 方法并进行断言检查
@@ -68,7 +78,197 @@ class TestGitHubClient(unittest.TestCase):
         self.assertEqual(pull_requests[0]['number'], 42)  # 检查拉取请求的编号是否正确
         self.assertEqual(pull_requests[0]['title'], "Add new feature")  # 检查拉取请求的标题是否正确
 
-    @patch('github_client.requests.get')
+    @patch('http_transport.HTTPTransport.get')
+    def test_fetch_issues_follows_pagination(self, mock_get):
+        """
+        测试 fetch_issues 方法是否跟随 Link: rel="next" 获取所有分页。
+        """
+        first_page = MagicMock()
+        first_page.json.return_value = [{"number": 1, "title": "Fix bug"}]
+        first_page.links = {'next': {'url': 'https://api.github.com/repositories/1/issues?page=2'}}
+        second_page = MagicMock()
+        second_page.json.return_value = [{"number": 2, "title": "Fix docs"}]
+        second_page.links = {}
+        mock_get.side_effect = [first_page, second_page]
+
+        issues = self.client.fetch_issues(self.repo)
+        self.assertEqual([issue['number'] for issue in issues], [1, 2])
+        self.assertEqual(mock_get.call_args_list[0].kwargs['params']['per_page'], 100)  # 第一页使用最大分页大小
+        self.assertEqual(mock_get.call_args_list[1].args[0], 'https://api.github.com/repositories/1/issues?page=2')
+        self.assertIsNone(mock_get.call_args_list[1].kwargs['params'])  # 后续页的参数已包含在 next 链接中
+
+    @patch('http_transport.HTTPTransport.get')
+    def test_iter_pull_requests_stops_before_since(self, mock_get):
+        """
+        测试 iter_pull_requests 在遇到早于 since 的数据时提前停止，不再请求下一页。
+        """
+        mock_response = MagicMock()
+        mock_response.json.return_value = [
+            {"number": 3, "title": "New feature", "updated_at": "2024-08-21T08:00:00Z"},
+            {"number": 2, "title": "Old feature", "updated_at": "2024-08-19T08:00:00Z"},
+        ]
+        mock_response.links = {'next': {'url': 'https://api.github.com/repositories/1/pulls?page=2'}}
+        mock_get.return_value = mock_response
+
+        pull_requests = list(self.client.iter_pull_requests(self.repo, since="2024-08-20"))
+        self.assertEqual([pr['number'] for pr in pull_requests], [3])  # 只保留 since 之后更新的数据
+        self.assertEqual(mock_get.call_count, 1)  # 提前停止，不再请求第二页
+
+    @patch('http_transport.HTTPTransport.get')
+    def test_fetch_issues_uses_etag_cache(self, mock_get):
+        """
+        测试启用缓存后发送条件请求，并在 304 响应时返回缓存内容。
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        client = GitHubClient(self.token, cache=HTTPCache(cache_dir))
+
+        fresh_response = MagicMock()
+        fresh_response.status_code = 200
+        fresh_response.json.return_value = [{"number": 1, "title": "Fix bug"}]
+        fresh_response.headers = {'ETag': '"v1"'}
+        fresh_response.links = {}
+        not_modified_response = MagicMock()
+        not_modified_response.status_code = 304
+        mock_get.side_effect = [fresh_response, not_modified_response]
+
+        first = client.fetch_issues(self.repo)
+        second = client.fetch_issues(self.repo)
+
+        self.assertEqual(first, second)  # 304 时返回缓存的数据
+        self.assertEqual(mock_get.call_args_list[1].kwargs['headers']['If-None-Match'], '"v1"')
+        self.assertEqual(client.cache.stats()['hits'], 1)
+        self.assertEqual(client.cache.stats()['misses'], 1)
+
+    @patch('http_transport.HTTPTransport.get')
+    def test_fetch_issues_retries_after_rate_limit(self, mock_get):
+        """
+        测试触发速率限制时等待并重试，而不是返回空列表。
+        """
+        clock = [1000.0]
+        sleeps = []
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            clock[0] += seconds
+
+        self.client.rate_limiter = RateLimitScheduler([self.token], clock=lambda: clock[0], sleep=fake_sleep)
+
+        limited_response = MagicMock()
+        limited_response.status_code = 403
+        limited_response.headers = {'Retry-After': '1'}
+        ok_response = MagicMock()
+        ok_response.status_code = 200
+        ok_response.headers = {'X-RateLimit-Remaining': '4999'}
+        ok_response.json.return_value = [{"number": 1, "title": "Fix bug"}]
+        ok_response.links = {}
+        mock_get.side_effect = [limited_response, ok_response]
+
+        issues = self.client.fetch_issues(self.repo)
+        self.assertEqual(len(issues), 1)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(sleeps, [1.0])  # 重试前等待了 Retry-After 指定的时间
+
+    @patch('http_transport.HTTPTransport.get')
+    def test_sync_fetches_only_delta(self, mock_get):
+        """
+        测试增量同步时第二次只从高水位开始获取，并与本地数据合并。
+        """
+        state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, state_dir, ignore_errors=True)
+        client = GitHubClient(self.token, sync_state=SyncStateStore(state_dir))
+        now = datetime.now(timezone.utc)
+        since = (now - timedelta(days=7)).date().isoformat()
+        old_update = (now - timedelta(days=2)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        new_update = (now - timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        first_page = MagicMock()
+        first_page.json.return_value = [{"number": 1, "title": "Fix bug", "updated_at": old_update}]
+        first_page.links = {}
+        delta_page = MagicMock()
+        delta_page.json.return_value = [{"number": 2, "title": "Fix docs", "updated_at": new_update}]
+        delta_page.links = {}
+        mock_get.side_effect = [first_page, delta_page]
+
+        client.sync(self.repo, 'issues', since)
+        issues = client.sync(self.repo, 'issues', since)
+
+        self.assertEqual([issue['number'] for issue in issues], [2, 1])  # 增量数据与本地数据合并
+        self.assertEqual(mock_get.call_args_list[0].kwargs['params']['since'], since)
+        self.assertEqual(mock_get.call_args_list[1].kwargs['params']['since'], old_update)  # 第二次从高水位开始
+
+    @patch('http_transport.HTTPTransport.get')
+    def test_sync_failure_keeps_high_water_mark(self, mock_get):
+        """
+        测试增量同步失败时不推进高水位，避免跳过未获取的数据。
+        """
+        state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, state_dir, ignore_errors=True)
+        client = GitHubClient(self.token, sync_state=SyncStateStore(state_dir))
+        since = (datetime.now(timezone.utc) - timedelta(days=7)).date().isoformat()
+        mock_get.side_effect = Exception("Connection error")
+
+        self.assertEqual(client.sync(self.repo, 'issues', since), [])
+        self.assertEqual(client.sync_state.fetch_since(self.repo, 'issues', since), since)
+
+    @patch('http_transport.HTTPTransport.get')
+    def test_fetch_issues_compact_records(self, mock_get):
+        """
+        测试启用精简记录后返回 IssueRecord，且导出所需字段可按字典形式访问。
+        """
+        mock_response = MagicMock()
+        mock_response.json.return_value = [{"number": 1, "title": "Fix bug", "user": {"login": "octocat"},
+                                            "labels": [{"name": "bug"}]}]
+        mock_response.links = {}
+        mock_get.return_value = mock_response
+
+        client = GitHubClient(self.token, compact_records=True)
+        issues = client.fetch_issues(self.repo)
+        self.assertIsInstance(issues[0], IssueRecord)
+        self.assertEqual(f"- {issues[0]['title']} #{issues[0]['number']}", "- Fix bug #1")
+
+    @patch('http_transport.HTTPTransport.get')
+    def test_fetch_updates(self, mock_get):
+        """
+        测试 fetch_updates 方法是否并发获取三类数据并按类型汇总。
+        """
+        # 根据请求的 URL 返回不同的模拟响应
+        def fake_get(url, **kwargs):
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.links = {}  # 没有下一页
+            mock_response.json.return_value = [{"url": url}]
+            return mock_response
+        mock_get.side_effect = fake_get
+
+        updates = self.client.fetch_updates(self.repo)
+        self.assertEqual(set(updates), {'commits', 'issues', 'pull_requests'})  # 检查三类数据是否齐全
+        self.assertTrue(updates['commits'][0]['url'].endswith('/commits'))
+        self.assertTrue(updates['issues'][0]['url'].endswith('/issues'))
+        self.assertTrue(updates['pull_requests'][0]['url'].endswith('/pulls'))
+        self.assertEqual(mock_get.call_count, 3)  # 每类数据只请求一次
+
+    @patch('http_transport.HTTPTransport.get')
+    def test_fetch_updates_batch(self, mock_get):
+        """
+        测试 fetch_updates_batch 方法是否为每个仓库产出完整的更新数据。
+        """
+        mock_response = MagicMock()
+        mock_response.json.return_value = [{"number": 1, "title": "Fix bug"}]
+        mock_response.status_code = 200
+        mock_response.links = {}  # 没有下一页
+        mock_get.return_value = mock_response
+
+        repos = ["owner/repo-a", "owner/repo-b", "owner/repo-c"]
+        client = GitHubClient(self.token, max_workers=2)  # 限制并发数，确保有界线程池也能完成全部任务
+        results = dict(client.fetch_updates_batch(repos, since="2024-08-20"))
+
+        self.assertEqual(set(results), set(repos))  # 每个仓库都应产出结果
+        for updates in results.values():
+            self.assertEqual(set(updates), {'commits', 'issues', 'pull_requests'})
+        self.assertEqual(mock_get.call_count, 9)  # 3 个仓库 × 3 类数据
+
+    @patch('http_transport.HTTPTransport.get')
     def test_export_daily_progress(self, mock_get):
         """
         测试 export_daily_progress 方法是否正确导出每日进度报告。
@@ -77,13 +277,14 @@ class TestGitHubClient(unittest.TestCase):
         mock_response = MagicMock()
         mock_response.json.return_value = []
         mock_response.status_code = 200
+        mock_response.links = {}  # 没有下一页
         mock_get.return_value = mock_response  # 将模拟的响应赋值给 mock_get
 
         # 调用 export_daily_progress 方法并进行断言检查
         file_path = self.client.export_daily_progress(self.repo)
         self.assertTrue(file_path.endswith('.md'))  # 检查生成的文件路径是否以 .md 结尾
 
-    @patch('github_client.requests.get')
+    @patch('http_transport.HTTPTransport.get')
     def test_export_progress_by_date_range(self, mock_get):
         """
         测试 export_progress_by_date_range 方法是否正确导出指定日期范围内的进度报告。
@@ -92,6 +293,7 @@ class TestGitHubClient(unittest.TestCase):
         mock_response = MagicMock()
         mock_response.json.return_value = []
         mock_response.status_code = 200
+        mock_response.links = {}  # 没有下一页
         mock_get.return_value = mock_response  # 将模拟的响应赋值给 mock_get
 
         # 调用 export_progress_by_date_range 方法并进行断言检查
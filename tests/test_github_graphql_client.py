@@ -0,0 +1,149 @@
+import sys
+import os
+import unittest
+from unittest.mock import patch, MagicMock
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from github_graphql_client import GitHubGraphQLClient  # 导入要测试的 GitHubGraphQLClient 类
+
+def make_response(data):
+    # 构造 GraphQL 模拟响应
+    response = MagicMock()
+    response.status_code = 200
+    response.headers = {}
+    response.json.return_value = {'data': data}
+    return response
+
+def make_repository(commits=(), issues=(), pulls=(), issues_next=None):
+    # 构造单个仓库的 GraphQL 数据
+    def connection(nodes, cursor=None):
+        return {'pageInfo': {'hasNextPage': cursor is not None, 'endCursor': cursor}, 'nodes': list(nodes)}
+    return {
+        'defaultBranchRef': {'target': {'history': connection(commits)}},
+        'issues': connection(issues, issues_next),
+        'pullRequests': connection(pulls),
+    }
+
+def make_issue(number, title, updated_at='2024-08-21T08:00:00Z', state='CLOSED'):
+    return {'number': number, 'title': title, 'state': state, 'closedAt': updated_at,
+            'updatedAt': updated_at, 'author': {'login': 'octocat'}}
+
+class TestGitHubGraphQLClient(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，初始化测试环境。
+        """
+        self.client = GitHubGraphQLClient("fake_token", batch_size=2)
+
+    def test_build_query_uses_aliases(self):
+        """
+        测试生成的查询为每个仓库使用别名，并正确转义仓库名称。
+        """
+        query = self.client._build_query(['owner/repo-a', 'owner/repo"b'], ['issues { totalCount }'])
+        self.assertIn('r0: repository(owner: "owner", name: "repo-a")', query)
+        self.assertIn('r1: repository(owner: "owner", name: "repo\\"b")', query)
+
+    @patch('http_transport.HTTPTransport.post')
+    def test_fetch_updates_batch_returns_rest_structure(self, mock_post):
+        """
+        测试批量获取的数据结构与 REST 接口返回的结构一致，并按 batch_size 分组请求。
+        """
+        commit = {'oid': 'abc123', 'message': 'Initial commit', 'committedDate': '2024-08-21T08:00:00Z',
+                  'author': {'name': 'Octo Cat'}}
+        def fake_post(url, json=None, **kwargs):
+            repo_count = json['query'].count('repository(')
+            return make_response({f'r{i}': make_repository([commit], [make_issue(1, 'Fix bug')],
+                                                           [make_issue(2, 'Add feature', state='MERGED')])
+                                  for i in range(repo_count)})
+        mock_post.side_effect = fake_post
+
+        repos = ['owner/repo-a', 'owner/repo-b', 'owner/repo-c']
+        results = dict(self.client.fetch_updates_batch(repos, since='2024-08-20'))
+
+        self.assertEqual(set(results), set(repos))
+        self.assertEqual(mock_post.call_count, 2)  # 3 个仓库按每批 2 个分为 2 次请求
+        updates = results['owner/repo-a']
+        self.assertEqual(updates['commits'][0]['sha'], 'abc123')
+        self.assertEqual(updates['commits'][0]['commit']['message'], 'Initial commit')
+        self.assertEqual(updates['issues'][0]['title'], 'Fix bug')
+        self.assertEqual(updates['issues'][0]['number'], 1)
+        self.assertEqual(updates['pull_requests'][0]['state'], 'closed')
+
+    @patch('http_transport.HTTPTransport.post')
+    def test_fetch_issues_follows_cursor(self, mock_post):
+        """
+        测试超过一页的连接会使用 endCursor 继续获取下一页。
+        """
+        mock_post.side_effect = [
+            make_response({'r0': make_repository(issues=[make_issue(1, 'Fix bug')], issues_next='cursor-1')}),
+            make_response({'r0': make_repository(issues=[make_issue(2, 'Fix docs')])}),
+        ]
+
+        issues = self.client.fetch_issues('owner/repo')
+        self.assertEqual([issue['number'] for issue in issues], [1, 2])
+        self.assertIn('after: "cursor-1"', mock_post.call_args_list[1].kwargs['json']['query'])
+
+    @patch('http_transport.HTTPTransport.post')
+    def test_issues_include_pull_requests_like_rest(self, mock_post):
+        """
+        测试 Issues 与 REST 的 /issues 接口一样包含已关闭和已合并的 Pull Requests，并按更新时间倒序排列，
+        同一次请求同时查询 issues 和 pullRequests 两个连接。
+        """
+        mock_post.return_value = make_response({'r0': make_repository(
+            issues=[make_issue(1, 'Fix bug', updated_at='2024-08-22T08:00:00Z'),
+                    make_issue(3, 'Fix docs', updated_at='2024-08-20T08:00:00Z')],
+            pulls=[make_issue(2, 'Add feature', updated_at='2024-08-21T08:00:00Z', state='MERGED'),
+                   make_issue(4, 'Old change', updated_at='2024-08-10T08:00:00Z')])})
+
+        issues = self.client.fetch_issues('owner/repo', since='2024-08-15')
+        self.assertEqual([issue['number'] for issue in issues], [1, 2, 3])  # 早于 since 的 PR 不包含在内
+        self.assertEqual(mock_post.call_count, 1)
+        query = mock_post.call_args.kwargs['json']['query']
+        self.assertIn('issues(', query)
+        self.assertIn('pullRequests(', query)
+
+    @patch('http_transport.HTTPTransport.post')
+    def test_rate_limited_error_backs_off_and_retries(self, mock_post):
+        """
+        测试 200 响应中的 RATE_LIMITED 错误按速率限制处理：暂停令牌、等待后重试，而不是返回空数据。
+        """
+        now = [1000.0]
+        self.client.rate_limiter.clock = lambda: now[0]
+        self.client.rate_limiter.sleep = lambda seconds: now.__setitem__(0, now[0] + seconds)
+        limited = make_response(None)
+        limited.json.return_value = {'data': None, 'errors': [{'type': 'RATE_LIMITED', 'message': 'API rate limit exceeded'}]}
+        mock_post.side_effect = [limited, make_response({'r0': make_repository(issues=[make_issue(1, 'Fix bug')])})]
+
+        issues = self.client.fetch_issues('owner/repo')
+        self.assertEqual([issue['number'] for issue in issues], [1])
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertGreaterEqual(now[0], 1060.0)  # 按二级速率限制的初始退避时间等待
+
+    @patch('http_transport.HTTPTransport.post')
+    def test_errors_raise_in_strict_mode(self, mock_post):
+        """
+        测试响应包含其他错误时，strict 模式抛出异常（增量同步不推进高水位），非 strict 模式返回部分数据。
+        """
+        response = make_response({'r0': make_repository(issues=[make_issue(1, 'Fix bug')])})
+        response.json.return_value['errors'] = [{'type': 'FORBIDDEN', 'message': 'Resource not accessible'}]
+        mock_post.return_value = response
+
+        with self.assertRaises(RuntimeError):
+            list(self.client.iter_issues('owner/repo', strict=True))
+        self.assertEqual([issue['number'] for issue in self.client.fetch_issues('owner/repo')], [1])
+
+    @patch('http_transport.HTTPTransport.post')
+    def test_missing_repository_returns_empty_lists(self, mock_post):
+        """
+        测试仓库不存在时返回空列表，不影响同一批次的其他仓库。
+        """
+        mock_post.return_value = make_response({'r0': None, 'r1': make_repository(issues=[make_issue(1, 'Fix bug')])})
+
+        results = dict(self.client.fetch_updates_batch(['owner/missing', 'owner/repo']))
+        self.assertEqual(results['owner/missing'], {'commits': [], 'issues': [], 'pull_requests': []})
+        self.assertEqual(len(results['owner/repo']['issues']), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,8 @@ from io import StringIO
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
 from hacker_news_client import HackerNewsClient
+from hn_item_cache import HNItemCache
+from seen_stories import SeenStoryIndex
 from logger import LOG  # 导入日志记录器
 
 
@@ -15,7 +17,7 @@ class TestHackerNewsClient(unittest.TestCase):
     def setUp(self):
         self.client = HackerNewsClient()
 
-    @patch('hacker_news_client.requests.get')
+    @patch('http_transport.HTTPTransport.get')
     def test_fetch_top_stories_success(self, mock_get):
         # 模拟HTTP响应
         mock_response = MagicMock()
@@ -37,7 +39,7 @@ class TestHackerNewsClient(unittest.TestCase):
         self.assertEqual(top_stories[0]['title'], 'Story 1')
         self.assertEqual(top_stories[0]['link'], 'https://news.ycombinator.com/')
     
-    @patch('hacker_news_client.requests.get')
+    @patch('http_transport.HTTPTransport.get')
     def test_fetch_top_stories_failure(self, mock_get):
         # 模拟HTTP请求失败
         mock_get.side_effect = Exception("Connection error")
@@ -47,7 +49,7 @@ class TestHackerNewsClient(unittest.TestCase):
         self.assertEqual(top_stories, [])
 
     
-    @patch('hacker_news_client.requests.get')
+    @patch('http_transport.HTTPTransport.get')
     @patch('hacker_news_client.os.makedirs')
     @patch('hacker_news_client.open', new_callable=unittest.mock.mock_open)
     def test_export_top_stories(self, mock_open, mock_makedirs, mock_get):
@@ -76,7 +78,48 @@ class TestHackerNewsClient(unittest.TestCase):
         mock_open().write.assert_any_call("# Hacker News Top Stories (2024-09-01 14:00)\n\n")
         mock_open().write.assert_any_call("1. [Story 1](https://news.ycombinator.com/)\n")
 
-    @patch('hacker_news_client.requests.get')
+    @patch('http_transport.HTTPTransport.get')
+    @patch('hacker_news_client.os.makedirs')
+    @patch('hacker_news_client.open', new_callable=unittest.mock.mock_open)
+    def test_export_top_stories_delta(self, mock_open, mock_makedirs, mock_get):
+        # 第一次快照只有 Story 1，第二次快照新增 Story 2
+        client = HackerNewsClient(seen_index=SeenStoryIndex())
+        client.fetch_top_stories = MagicMock(side_effect=[
+            [{'id': 1, 'title': 'Story 1', 'link': 'https://example.com/1'}],
+            [{'id': 2, 'title': 'Story 2', 'link': 'https://example.com/2'},
+             {'id': 1, 'title': 'Story 1', 'link': 'https://example.com/1'}],
+            [{'id': 1, 'title': 'Story 1', 'link': 'https://example.com/1'}],
+        ])
+        client.export_top_stories(date="2024-09-01", hour="10")
+        client.mark_exported()
+        mock_open.reset_mock()
+
+        file_path = client.export_top_stories(date="2024-09-01", hour="14")
+        self.assertEqual(file_path, 'hacker_news/2024-09-01/14.md')
+        written = ''.join(call.args[0] for call in mock_open().write.call_args_list)
+        self.assertIn("## New Stories\n\n1. [Story 2](https://example.com/2)\n", written)
+        self.assertIn("## Still Trending\n\n- Story 1\n", written)
+        self.assertNotIn("https://example.com/1", written)  # 持续热门的新闻只保留标题
+
+        client.mark_exported()
+
+        # 没有新出现的新闻时不生成文件
+        self.assertIsNone(client.export_top_stories(date="2024-09-01", hour="18"))
+
+    @patch('http_transport.HTTPTransport.get')
+    @patch('hacker_news_client.os.makedirs')
+    @patch('hacker_news_client.open', new_callable=unittest.mock.mock_open)
+    def test_export_top_stories_delta_without_mark(self, mock_open, mock_makedirs, mock_get):
+        # 报告生成失败时不调用 mark_exported，导出的新闻在下一次仍视为新新闻
+        client = HackerNewsClient(seen_index=SeenStoryIndex())
+        client.fetch_top_stories = MagicMock(return_value=[{'id': 1, 'title': 'Story 1', 'link': 'https://example.com/1'}])
+        self.assertEqual(client.export_top_stories(date="2024-09-01", hour="10"), 'hacker_news/2024-09-01/10.md')
+        self.assertEqual(len(client.seen_index), 0)
+        self.assertEqual(client.export_top_stories(date="2024-09-01", hour="14"), 'hacker_news/2024-09-01/14.md')
+        client.mark_exported()
+        self.assertIsNone(client.export_top_stories(date="2024-09-01", hour="18"))
+
+    @patch('http_transport.HTTPTransport.get')
     @patch('hacker_news_client.os.makedirs')
     @patch('hacker_news_client.open', new_callable=unittest.mock.mock_open)
     def test_export_top_stories_no_stories(self, mock_open, mock_makedirs, mock_get):
@@ -94,5 +137,70 @@ class TestHackerNewsClient(unittest.TestCase):
         mock_open.assert_not_called()
         self.assertIsNone(file_path)
 
+
+class TestHackerNewsClientAPI(unittest.TestCase):
+    def setUp(self):
+        self.clock = [1000.0]
+        self.cache = HNItemCache(ttl=600, clock=lambda: self.clock[0])
+        self.client = HackerNewsClient(source='api', story_limit=3, item_cache=self.cache)
+        self.items = {
+            1: {'id': 1, 'type': 'story', 'title': 'Story 1', 'url': 'https://example.com/1', 'score': 100,
+                'by': 'alice', 'descendants': 10, 'time': 1724148000},
+            2: {'id': 2, 'type': 'story', 'title': 'Ask HN: Story 2', 'score': 50, 'by': 'bob', 'descendants': 3,
+                'time': 1724148000},
+            3: {'id': 3, 'deleted': True},
+        }
+        self.updates = []
+
+    def fake_get(self, url, **kwargs):
+        # 按 URL 返回 topstories、updates 和 item 接口的数据
+        response = MagicMock()
+        path = url.rsplit('/v0/', 1)[1]
+        if path == 'topstories.json':
+            response.json.return_value = [1, 2, 3, 4]
+        elif path == 'updates.json':
+            response.json.return_value = {'items': self.updates, 'profiles': []}
+        else:
+            response.json.return_value = self.items[int(path[len('item/'):-len('.json')])]
+        return response
+
+    @patch('http_transport.HTTPTransport.get')
+    def test_fetch_top_stories_from_api(self, mock_get):
+        mock_get.side_effect = self.fake_get
+
+        stories = self.client.fetch_top_stories()
+        self.assertEqual([story['rank'] for story in stories], [1, 2])  # 只取前 story_limit 条，跳过已删除条目
+        self.assertEqual(stories[0]['title'], 'Story 1')
+        self.assertEqual((stories[0]['score'], stories[0]['comments'], stories[0]['author']), (100, 10, 'alice'))
+        self.assertEqual(stories[0]['posted_at'], '2024-08-20T10:00:00')
+        self.assertEqual(stories[1]['link'], 'https://news.ycombinator.com/item?id=2')  # 没有外部链接时使用讨论页
+
+    @patch('http_transport.HTTPTransport.get')
+    def test_cached_items_are_not_refetched(self, mock_get):
+        mock_get.side_effect = self.fake_get
+        self.client.fetch_top_stories()
+        fetched_urls = lambda: [call.args[0] for call in mock_get.call_args_list if '/item/' in call.args[0]]
+        self.assertEqual(len(fetched_urls()), 3)
+
+        # 第二次快照：只重新获取 updates 中报告发生变化的条目
+        mock_get.reset_mock()
+        self.updates = [2]
+        self.items[2] = dict(self.items[2], score=80)
+        stories = self.client.fetch_top_stories()
+        self.assertEqual(fetched_urls(), ['https://hacker-news.firebaseio.com/v0/item/2.json'])
+        self.assertEqual(stories[1]['score'], 80)
+
+        # 缓存过期后全部重新获取
+        mock_get.reset_mock()
+        self.updates = []
+        self.clock[0] += 601
+        self.client.fetch_top_stories()
+        self.assertEqual(len(fetched_urls()), 3)
+
+    @patch('http_transport.HTTPTransport.get')
+    def test_fetch_top_stories_from_api_failure(self, mock_get):
+        mock_get.side_effect = Exception("Connection error")
+        self.assertEqual(self.client.fetch_top_stories(), [])
+
 if __name__ == '__main__':
     unittest.main()
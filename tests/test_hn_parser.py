@@ -0,0 +1,68 @@
+import sys
+import os
+import unittest
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import hn_parser  # 导入要测试的解析器模块
+from hn_parser import get_parser, parse_stdlib
+
+FRONT_PAGE = os.path.join(os.path.dirname(__file__), 'fixtures', 'hacker_news', 'front_page.html')
+
+
+class TestHNParser(unittest.TestCase):
+    def setUp(self):
+        with open(FRONT_PAGE, 'r', encoding='utf-8') as file:
+            self.html = file.read()
+
+    def test_parse_front_page(self):
+        """
+        测试流式解析器提取标题、链接以及 subtext 行中的分数、作者、评论数和发布时间。
+        """
+        stories = parse_stdlib(self.html)
+        self.assertEqual(len(stories), 30)
+        self.assertEqual([story['rank'] for story in stories], list(range(1, 31)))
+        first = stories[0]
+        self.assertEqual(first['id'], 41280037)
+        self.assertEqual(first['title'], 'Show HN: A tiny SQLite-backed job queue')
+        self.assertEqual(first['link'], 'https://github.com/posts/41280037')  # 不会误取来源站点链接
+        self.assertEqual((first['score'], first['author'], first['comments']), (336, 'user405', 154))
+        self.assertEqual((first['age'], first['posted_at']), ('1 hours ago', '2024-08-20T22:07:00'))
+
+    def test_parse_special_rows(self):
+        """
+        测试没有评论（discuss）的新闻评论数为 0，招聘类条目没有分数和作者。
+        """
+        stories = {story['rank']: story for story in parse_stdlib(self.html)}
+        self.assertEqual(stories[7]['comments'], 0)
+        self.assertEqual(stories[4]['link'], 'item?id=41280148')  # Ask HN 为站内链接
+        self.assertIsNone(stories[10]['score'])
+        self.assertIsNone(stories[10]['author'])
+        self.assertEqual(stories[10]['age'], '4 hours ago')
+
+    def test_parse_fragment(self):
+        """
+        测试只包含 tr.athing 片段、没有 subtext 行的 HTML。
+        """
+        stories = parse_stdlib('<tr class="athing"><td class="title"><span class="titleline">'
+                               '<a href="https://example.com/?a=1&amp;b=2">A &amp; B</a></span></td></tr>')
+        self.assertEqual(len(stories), 1)
+        self.assertEqual(stories[0]['title'], 'A & B')
+        self.assertEqual(stories[0]['link'], 'https://example.com/?a=1&b=2')
+        self.assertIsNone(stories[0]['id'])
+
+    @unittest.skipIf(hn_parser.BeautifulSoup is None, "未安装 beautifulsoup4")
+    def test_bs4_matches_stdlib(self):
+        self.assertEqual(get_parser('bs4')(self.html), parse_stdlib(self.html))
+
+    @unittest.skipIf(hn_parser.lxml is None, "未安装 lxml")
+    def test_lxml_matches_stdlib(self):
+        self.assertEqual(get_parser('lxml')(self.html), parse_stdlib(self.html))
+
+    def test_unknown_parser(self):
+        with self.assertRaises(ValueError):
+            get_parser('regex')
+
+if __name__ == '__main__':
+    unittest.main()
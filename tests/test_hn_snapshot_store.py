@@ -0,0 +1,98 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import hn_snapshot_store  # 导入模块以便切换 numpy 实现
+from hn_snapshot_store import HNSnapshotStore  # 导入要测试的快照存储
+
+
+def make_story(story_id, rank, score, comments):
+    return {'id': story_id, 'rank': rank, 'title': f'Story {story_id}',
+            'link': f'https://example.com/{story_id}', 'score': score, 'comments': comments}
+
+
+class TestHNSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.clock = [100000.0]
+        self.data_dir = tempfile.mkdtemp()
+        self.store = self.create_store()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def create_store(self, **kwargs):
+        return HNSnapshotStore(self.data_dir, clock=lambda: self.clock[0], **kwargs)
+
+    def record_snapshots(self, store):
+        # 三次快照：条目 1 一直在首页，条目 2 分数上升最快，条目 3 只出现一次
+        store.append([make_story(1, 1, 100, 10), make_story(2, 2, 20, 1)], timestamp=self.clock[0] - 7200)
+        store.append([make_story(1, 1, 110, 12), make_story(2, 3, 90, 8), make_story(3, 2, 50, 4)],
+                     timestamp=self.clock[0] - 3600)
+        store.append([make_story(2, 1, 200, 30), make_story(1, 2, 120, 15), {'title': 'Job', 'link': 'x'}],
+                     timestamp=self.clock[0])
+
+    def assert_statistics(self, store):
+        movers = store.top_movers(hours=24, limit=2)
+        self.assertEqual([group['id'] for group in movers], [2, 1])
+        self.assertEqual(movers[0]['score_delta'], 180)
+        self.assertEqual(movers[0]['comments_delta'], 29)
+        self.assertEqual(movers[0]['best_rank'], 1)
+        self.assertEqual(movers[0]['title'], 'Story 2')
+
+        longest = store.longest_on_front_page(hours=24)
+        self.assertEqual([(group['id'], group['snapshots']) for group in longest], [(1, 3), (2, 3), (3, 1)])
+        self.assertEqual(longest[0]['score'], 120)
+
+        # 时间窗口外的观测不参与统计
+        recent = store.top_movers(hours=1.5)
+        self.assertEqual({group['id']: group['snapshots'] for group in recent}, {1: 2, 2: 2, 3: 1})
+
+    def test_statistics_without_numpy(self):
+        with patch.object(hn_snapshot_store, 'np', None):
+            store = self.create_store()
+            self.record_snapshots(store)
+            self.assert_statistics(store)
+
+    @unittest.skipIf(hn_snapshot_store.np is None, "未安装 numpy")
+    def test_statistics_with_numpy(self):
+        self.record_snapshots(self.store)
+        self.assert_statistics(self.store)
+
+    @unittest.skipIf(hn_snapshot_store.np is None, "未安装 numpy")
+    def test_compaction_preserves_observations(self):
+        """
+        测试观测数达到阈值后自动压缩为列式文件，压缩前后以及重新打开后的统计结果一致。
+        """
+        store = self.create_store(compact_threshold=5)
+        self.record_snapshots(store)
+        self.assertTrue(os.path.exists(store.columns_file))  # 前两次快照共 5 条观测，已压缩
+        self.assert_statistics(store)
+
+        store.compact()
+        self.assertEqual(os.path.getsize(store.observations_file), 0)
+        self.assert_statistics(store)
+
+        self.assert_statistics(self.create_store(compact_threshold=5))
+
+    def test_summary_markdown(self):
+        self.record_snapshots(self.store)
+        summary = self.create_store().summary_markdown(hours=24, limit=2)  # 重新打开后读取已保存的元数据
+        self.assertIn('## Longest on Front Page', summary)
+        self.assertIn('1. [Story 1](https://example.com/1) - 3 snapshots, best rank 1', summary)
+        self.assertIn('## Top Movers', summary)
+        self.assertIn('1. [Story 2](https://example.com/2) - +180 points, +29 comments', summary)
+
+    def test_empty_store(self):
+        self.assertEqual(self.store.top_movers(), [])
+        self.assertEqual(self.store.longest_on_front_page(), [])
+        self.assertIsNone(self.store.summary_markdown())  # 没有观测时不生成只有标题的统计
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from http_cache import HTTPCache  # 导入要测试的 HTTPCache 类
+
+class TestHTTPCache(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，创建临时缓存目录。
+        """
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        在每个测试方法之后运行，删除临时缓存目录。
+        """
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_make_key_ignores_none_params(self):
+        """
+        测试值为 None 的参数不影响缓存键，且参数顺序无关。
+        """
+        url = 'https://api.github.com/repos/owner/repo/issues'
+        key1 = HTTPCache.make_key(url, {'state': 'closed', 'since': None, 'per_page': 100})
+        key2 = HTTPCache.make_key(url, {'per_page': 100, 'state': 'closed'})
+        self.assertEqual(key1, key2)
+        self.assertNotEqual(key1, HTTPCache.make_key(url, {'state': 'open'}))
+
+    def test_put_and_get_persist_across_instances(self):
+        """
+        测试写入的条目在重新创建缓存实例后仍可读取。
+        """
+        cache = HTTPCache(self.cache_dir)
+        cache.put('key', {'etag': '"abc"', 'body': [{'number': 1}]})
+
+        reloaded = HTTPCache(self.cache_dir)
+        self.assertEqual(reloaded.get('key'), {'etag': '"abc"', 'body': [{'number': 1}]})
+        self.assertIsNone(reloaded.get('missing'))
+
+    def test_lru_eviction_by_entries(self):
+        """
+        测试超过条目数上限时淘汰最久未使用的条目。
+        """
+        cache = HTTPCache(self.cache_dir, max_entries=2)
+        cache.put('a', {'body': 1})
+        cache.put('b', {'body': 2})
+        cache.get('a')  # 访问 a，使 b 成为最久未使用的条目
+        cache.put('c', {'body': 3})
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, 'b.json')))  # 被淘汰的文件已删除
+
+    def test_lru_eviction_by_bytes(self):
+        """
+        测试超过总大小上限时淘汰条目。
+        """
+        cache = HTTPCache(self.cache_dir, max_bytes=100)
+        cache.put('a', {'body': 'x' * 60})
+        cache.put('b', {'body': 'y' * 60})
+
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('b'))
+        self.assertLessEqual(cache.stats()['bytes'], 100)
+
+    def test_stats(self):
+        """
+        测试命中和未命中计数。
+        """
+        cache = HTTPCache(self.cache_dir)
+        cache.record_hit()
+        cache.record_hit()
+        cache.record_miss()
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+        self.assertAlmostEqual(stats['hit_rate'], 2 / 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import sys
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from http_transport import HTTPTransport  # 导入要测试的 HTTPTransport 类
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    # 前 N 次请求返回 503，之后返回 200
+    failures_left = 0
+    requests_seen = 0
+
+    def do_GET(self):
+        FlakyHandler.requests_seen += 1
+        if FlakyHandler.failures_left > 0:
+            FlakyHandler.failures_left -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self.do_GET()
+
+    def log_message(self, format, *args):
+        pass  # 测试时不输出访问日志
+
+class TestHTTPTransport(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，启动本地 HTTP 服务。
+        """
+        FlakyHandler.failures_left = 0
+        FlakyHandler.requests_seen = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/'
+        self.transport = HTTPTransport(max_retries=3, backoff_factor=0)
+
+    def tearDown(self):
+        """
+        在每个测试方法之后运行，关闭本地 HTTP 服务和会话。
+        """
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_retries_server_errors(self):
+        """
+        测试 5xx 响应会自动重试。
+        """
+        FlakyHandler.failures_left = 2
+        response = self.transport.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(FlakyHandler.requests_seen, 3)
+
+    def test_does_not_retry_non_idempotent_post(self):
+        """
+        测试 POST 请求默认不因 5xx 响应重试，避免重复执行耗时的 LLM 生成；显式声明幂等时才重试。
+        """
+        FlakyHandler.failures_left = 2
+        response = self.transport.post(self.url, json={'prompt': 'hi'})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(FlakyHandler.requests_seen, 1)
+
+        response = self.transport.post(self.url, json={'query': '{ viewer { login } }'}, idempotent=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(FlakyHandler.requests_seen, 3)
+
+    def test_returns_last_response_when_retries_exhausted(self):
+        """
+        测试重试用尽后返回最后一次响应，并计入失败统计。
+        """
+        FlakyHandler.failures_left = 10
+        response = self.transport.get(self.url)
+        self.assertEqual(response.status_code, 503)
+        host = self.url.split('/')[2]
+        self.assertEqual(self.transport.stats()[host]['errors'], 1)
+
+    def test_reuses_session_per_host_and_records_latency(self):
+        """
+        测试同一主机复用同一个 Session，并记录请求耗时。
+        """
+        self.transport.get(self.url)
+        self.transport.get(self.url + 'again')
+        self.assertEqual(len(self.transport._sessions), 1)
+        stats = self.transport.stats()[self.url.split('/')[2]]
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['errors'], 0)
+        self.assertIn('p95_ms', stats)
+
+if __name__ == '__main__':
+    unittest.main()
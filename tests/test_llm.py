@@ -8,6 +8,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../s
 
 from config import Config  # 导入配置类
 from llm import LLM  # 导入要测试的 LLM 类
+from llm_cache import LLMCache  # 导入 LLM 响应缓存
+from llm_metrics import LLMMetrics  # 导入 LLM 调用指标
 
 class TestLLM(unittest.TestCase):
     def setUp(self):
@@ -40,7 +42,7 @@ class TestLLM(unittest.TestCase):
             llm = LLM(self.config)
         mock_log_error.assert_called_with("不支持的模型类型: invalid_model")
 
-    @patch('llm.requests.post')
+    @patch('http_transport.HTTPTransport.post')
     @patch('llm.LOG.error')
     def test_ollama_invalid_response_structure(self, mock_log_error, mock_post):
         """
@@ -75,6 +77,147 @@ class TestLLM(unittest.TestCase):
         # 检查是否记录了预期的错误日志
         mock_log_error.assert_called_with("生成报告时发生错误：OpenAI API error")
 
+    @patch('http_transport.HTTPTransport.post')
+    def test_repeated_request_uses_cache(self, mock_post):
+        """
+        测试相同的请求第二次直接返回缓存的结果，内容变化后重新调用模型。
+        """
+        self.config.llm_model_type = "ollama"
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"message": {"content": "Generated report"}}
+        mock_post.return_value = mock_response
+        llm = LLM(self.config, cache=LLMCache())
+
+        self.assertEqual(llm.generate_report(self.system_prompt, self.github_content), "Generated report")
+        self.assertEqual(llm.generate_report(self.system_prompt, self.github_content), "Generated report")
+        self.assertEqual(mock_post.call_count, 1)
+
+        llm.generate_report(self.system_prompt, self.github_content + "- new issue #1")
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(llm.cache.stats()['memory_hits'], 1)
+
+    @patch('http_transport.HTTPTransport.post')
+    def test_ollama_stream_report(self, mock_post):
+        """
+        测试解析 Ollama 的 NDJSON 流式响应，逐段返回文本，完整结果写入缓存。
+        """
+        self.config.llm_model_type = "ollama"
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.iter_lines.return_value = [
+            b'{"message": {"role": "assistant", "content": "# Report"}, "done": false}',
+            b'',
+            b'{"message": {"role": "assistant", "content": "\\n- item"}, "done": false}',
+            b'{"message": {"role": "assistant", "content": ""}, "done": true}',
+        ]
+        mock_post.return_value = mock_response
+        llm = LLM(self.config, cache=LLMCache())
+
+        self.assertEqual(list(llm.stream_report(self.system_prompt, self.github_content)), ["# Report", "\n- item"])
+        self.assertTrue(mock_post.call_args.kwargs['stream'])
+        self.assertTrue(mock_post.call_args.kwargs['json']['stream'])
+        # 再次请求时一次性返回缓存的完整报告
+        self.assertEqual(list(llm.stream_report(self.system_prompt, self.github_content)), ["# Report\n- item"])
+        self.assertEqual(mock_post.call_count, 1)
+
+    @patch('llm.OpenAI')
+    def test_openai_stream_report(self, mock_openai):
+        self.config.llm_model_type = "openai"
+        chunks = []
+        for content in ("Hello", None, " world"):
+            chunk = MagicMock()
+            chunk.choices[0].delta.content = content
+            chunks.append(chunk)
+        mock_openai().chat.completions.create.return_value = iter(chunks)
+        llm = LLM(self.config)
+
+        self.assertEqual(list(llm.stream_report(self.system_prompt, self.github_content)), ["Hello", " world"])
+        self.assertTrue(mock_openai().chat.completions.create.call_args.kwargs['stream'])
+
+    @patch('http_transport.HTTPTransport.post')
+    def test_ollama_warmup_and_metrics(self, mock_post):
+        """
+        测试预热请求不含消息并携带 keep_alive，生成请求的耗时字段计入统计，只有第一次计为冷加载。
+        """
+        self.config.llm_model_type = "ollama"
+        self.config.ollama_keep_alive = "4h"
+        warm_response = MagicMock()
+        warm_response.json.return_value = {"load_duration": 3_000_000_000, "done": True}
+        mock_post.return_value = warm_response
+        llm = LLM(self.config)
+        llm.warmup()
+        payload = mock_post.call_args.kwargs['json']
+        self.assertEqual(payload['messages'], [])
+        self.assertEqual(payload['keep_alive'], "4h")
+
+        responses = []
+        for load_duration in (2_000_000_000, 10_000_000):
+            response = MagicMock()
+            response.json.return_value = {"message": {"content": "Report"}, "load_duration": load_duration,
+                                          "prompt_eval_count": 100, "prompt_eval_duration": 500_000_000,
+                                          "eval_count": 50, "eval_duration": 1_000_000_000}
+            responses.append(response)
+        mock_post.side_effect = responses
+        llm.generate_report(self.system_prompt, self.github_content)
+        llm.generate_report(self.system_prompt, self.github_content + "- new issue #1")
+        self.assertEqual(mock_post.call_args.kwargs['json']['keep_alive'], "4h")
+
+        stats = llm.stats()
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['cold_loads'], 1)
+        self.assertEqual(stats['load_s'], 2.01)
+        self.assertEqual(stats['eval_count'], 100)
+        self.assertEqual(stats['eval_tokens_per_s'], 50.0)
+
+    @patch('http_transport.HTTPTransport.post')
+    def test_ollama_call_metrics(self, mock_post):
+        """
+        测试 Ollama 响应中的 token 数和耗时按报告类型写入 LLMMetrics。
+        """
+        self.config.llm_model_type = "ollama"
+        self.config.ollama_model_name = "llama3.1"
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"message": {"content": "Report"}, "load_duration": 100_000_000,
+                                           "prompt_eval_count": 300, "prompt_eval_duration": 400_000_000,
+                                           "eval_count": 80, "eval_duration": 2_000_000_000}
+        mock_post.return_value = mock_response
+        llm = LLM(self.config, metrics=LLMMetrics())
+        llm.generate_report(self.system_prompt, self.github_content, report_type="github")
+
+        stats = llm.metrics.stats()['llama3.1/github']
+        self.assertEqual((stats['prompt_tokens'], stats['completion_tokens']), (300, 80))
+        self.assertEqual(stats['avg_ttft_s'], 0.5)
+        self.assertEqual(stats['avg_tokens_per_s'], 40.0)
+        self.assertEqual(stats['cost_usd'], 0.0)
+
+    @patch('llm.OpenAI')
+    def test_openai_stream_usage_metrics(self, mock_openai):
+        self.config.llm_model_type = "openai"
+        self.config.openai_model_name = "gpt-4o-mini"
+        content_chunk = MagicMock(usage=None)
+        content_chunk.choices[0].delta.content = "Hello"
+        usage_chunk = MagicMock(choices=[])
+        usage_chunk.usage.prompt_tokens = 1200
+        usage_chunk.usage.completion_tokens = 300
+        mock_openai().chat.completions.create.return_value = iter([content_chunk, usage_chunk])
+        llm = LLM(self.config, metrics=LLMMetrics())
+
+        self.assertEqual(list(llm.stream_report(self.system_prompt, self.github_content, report_type="github")),
+                         ["Hello"])
+        self.assertEqual(mock_openai().chat.completions.create.call_args.kwargs['stream_options'],
+                         {"include_usage": True})
+        stats = llm.metrics.stats()['gpt-4o-mini/github']
+        self.assertEqual((stats['prompt_tokens'], stats['completion_tokens']), (1200, 300))
+        self.assertIsNotNone(stats['avg_ttft_s'])
+        self.assertGreater(stats['cost_usd'], 0)
+
+    @patch('http_transport.HTTPTransport.post')
+    def test_openai_warmup_is_noop(self, mock_post):
+        self.config.llm_model_type = "openai"
+        with patch('llm.OpenAI'):
+            LLM(self.config).warmup()
+        mock_post.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
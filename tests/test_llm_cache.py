@@ -0,0 +1,71 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from llm_cache import LLMCache  # 导入要测试的 LLM 响应缓存
+
+
+class TestLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = [1000.0]
+        self.cache_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.cache_dir, 'responses.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def create_cache(self, **kwargs):
+        cache = LLMCache(self.db_path, clock=lambda: self.clock[0], **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_make_key(self):
+        key = LLMCache.make_key('ollama', 'llama3.1', 'prompt', 'content', {'temperature': 0.7})
+        self.assertEqual(key, LLMCache.make_key('ollama', 'llama3.1', 'prompt', 'content', {'temperature': 0.7}))
+        self.assertNotEqual(key, LLMCache.make_key('ollama', 'llama3.1', 'prompt', 'content', {'temperature': 0.2}))
+        self.assertNotEqual(key, LLMCache.make_key('openai', 'gpt-4o-mini', 'prompt', 'content'))
+        self.assertNotEqual(key, LLMCache.make_key('ollama', 'llama3.1', 'other prompt', 'content', {'temperature': 0.7}))
+
+    def test_memory_and_disk_tiers(self):
+        """
+        测试内存命中、重新打开后的数据库命中以及过期条目的淘汰。
+        """
+        cache = self.create_cache(ttl=3600)
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', 'report a')
+        self.assertEqual(cache.get('a'), 'report a')
+
+        reopened = self.create_cache(ttl=3600)
+        self.assertEqual(reopened.get('a'), 'report a')
+        self.assertEqual(reopened.get('a'), 'report a')
+        stats = reopened.stats()
+        self.assertEqual((stats['disk_hits'], stats['memory_hits'], stats['disk_entries']), (1, 1, 1))
+
+        self.clock[0] += 3600
+        self.assertIsNone(reopened.get('a'))
+        self.assertEqual(reopened.stats()['disk_entries'], 0)
+
+    def test_lru_eviction(self):
+        cache = self.create_cache(max_memory_entries=2, max_disk_entries=2)
+        for key in ('a', 'b'):
+            cache.put(key, key)
+            self.clock[0] += 1
+        cache.get('a')  # a 成为最近使用的条目
+        self.clock[0] += 1
+        cache.put('c', 'c')
+
+        stats = cache.stats()
+        self.assertEqual((stats['memory_entries'], stats['disk_entries']), (2, 2))
+        reopened = self.create_cache()
+        self.assertIsNone(reopened.get('b'))
+        self.assertEqual(reopened.get('a'), 'a')
+        self.assertEqual(reopened.get('c'), 'c')
+
+
+if __name__ == '__main__':
+    unittest.main()
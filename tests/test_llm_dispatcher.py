@@ -0,0 +1,140 @@
+import sys
+import os
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from unittest.mock import MagicMock
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from llm_dispatcher import LLMDispatcher  # 导入要测试的 LLM 请求队列
+
+
+class SlowLLM:
+    # 模拟耗时的模型调用，记录同时进行的请求数和开始顺序
+    model = 'ollama'
+    model_name = 'llama3.1'
+    cache = None
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.started = []
+        self.lock = threading.Lock()
+
+    def generate_report(self, system_prompt, user_content, report_type=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.started.append(user_content)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if user_content == 'bad':
+            raise ValueError("model error")
+        return f"report for {user_content}"
+
+    def stream_report(self, system_prompt, user_content, report_type=None):
+        yield from self.generate_report(system_prompt, user_content, report_type).split(' ')
+
+    def submit_batch(self, requests):
+        return {'reports': {custom_id: self.generate_report(*request) for custom_id, request in requests.items()}}
+
+
+class TestLLMDispatcher(unittest.TestCase):
+    def test_per_backend_limit_and_fifo_order(self):
+        """
+        测试同时进行的请求数不超过后端上限，请求按提交顺序开始。
+        """
+        llm = SlowLLM()
+        dispatcher = LLMDispatcher(llm, {'ollama': 2})
+        self.addCleanup(dispatcher.shutdown)
+        futures = [dispatcher.submit('prompt', f'repo-{index}') for index in range(6)]
+
+        self.assertEqual([future.result() for future in futures], [f'report for repo-{index}' for index in range(6)])
+        self.assertEqual(dispatcher.max_concurrency, 2)
+        self.assertEqual(llm.max_active, 2)
+        self.assertEqual(llm.started[:2], ['repo-0', 'repo-1'])
+        self.assertEqual(llm.started[2:], [f'repo-{index}' for index in range(2, 6)])
+        self.assertEqual(dispatcher.stats()['completed'], 6)
+
+    def test_concurrent_callers_finish_in_parallel(self):
+        llm = SlowLLM(delay=0.1)
+        dispatcher = LLMDispatcher(llm, 4)
+        self.addCleanup(dispatcher.shutdown)
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            reports = list(executor.map(lambda index: dispatcher.generate_report('prompt', f'repo-{index}'), range(8)))
+        self.assertEqual(len(reports), 8)
+        self.assertLess(time.monotonic() - start, 0.6)  # 串行需要 0.8 秒，4 个并发约 0.2 秒
+        self.assertEqual(llm.max_active, 4)
+
+    def test_timeout_and_failure(self):
+        """
+        测试排队超时的请求不会再发送给模型，模型错误会传递给调用方并计入统计。
+        """
+        llm = SlowLLM(delay=0.2)
+        dispatcher = LLMDispatcher(llm, 1, timeout=0.1)
+        self.addCleanup(dispatcher.shutdown)
+        first = dispatcher.submit('prompt', 'repo-0')
+        with self.assertRaises(TimeoutError):
+            dispatcher.generate_report('prompt', 'repo-1')
+        first.result()
+        time.sleep(0.05)
+        self.assertEqual(llm.started, ['repo-0'])
+
+        dispatcher.timeout = None
+        with self.assertRaises(ValueError):
+            dispatcher.generate_report('prompt', 'bad')
+        stats = dispatcher.stats()
+        self.assertEqual((stats['timed_out'], stats['failed'], stats['completed']), (1, 1, 1))
+
+    def test_stream_and_batch_go_through_queue(self):
+        """
+        测试流式生成和批量提交同样排队执行，受并发上限限制。
+        """
+        llm = SlowLLM()
+        dispatcher = LLMDispatcher(llm, 1)
+        self.addCleanup(dispatcher.shutdown)
+        first = dispatcher.submit('prompt', 'repo-0')
+
+        self.assertEqual(list(dispatcher.stream_report('prompt', 'repo-1')), ['report', 'for', 'repo-1'])
+        job = dispatcher.submit_batch({'a': ('prompt', 'repo-2', None)})
+        self.assertEqual(job, {'reports': {'a': 'report for repo-2'}})
+        first.result()
+        self.assertEqual(llm.started, ['repo-0', 'repo-1', 'repo-2'])
+        self.assertEqual(llm.max_active, 1)
+        self.assertEqual(dispatcher.stats()['completed'], 3)
+
+    def test_stream_timeout(self):
+        """
+        测试排队超时的流式请求抛出 TimeoutError，且不会再发送给模型。
+        """
+        llm = SlowLLM(delay=0.2)
+        dispatcher = LLMDispatcher(llm, 1, timeout=0.1)
+        self.addCleanup(dispatcher.shutdown)
+        first = dispatcher.submit('prompt', 'repo-0')
+        with self.assertRaises(TimeoutError):
+            list(dispatcher.stream_report('prompt', 'repo-1'))
+        first.result()
+        time.sleep(0.05)
+        self.assertEqual(llm.started, ['repo-0'])
+        self.assertEqual(dispatcher.stats()['timed_out'], 1)
+
+    def test_exposes_llm_attributes(self):
+        llm = MagicMock()
+        llm.model = 'openai'
+        llm.model_name = 'gpt-4o-mini'
+        dispatcher = LLMDispatcher(llm)
+        self.addCleanup(dispatcher.shutdown)
+        self.assertEqual(dispatcher.max_concurrency, 8)
+        self.assertEqual(dispatcher.model_name, 'gpt-4o-mini')
+        self.assertIs(dispatcher.cache, llm.cache)
+        self.assertFalse(hasattr(dispatcher, 'sampling_params'))  # 不再把未定义的属性转发给 LLM
+
+
+if __name__ == '__main__':
+    unittest.main()
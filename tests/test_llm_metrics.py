@@ -0,0 +1,61 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from llm_metrics import LLMMetrics, call_cost  # 导入要测试的 LLM 调用指标
+
+
+class TestLLMMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.metrics_dir, 'metrics.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.metrics_dir, ignore_errors=True)
+
+    def test_call_cost(self):
+        self.assertAlmostEqual(call_cost('gpt-4o-mini', 1_000_000, 1_000_000), 0.75)
+        self.assertEqual(call_cost('llama3.1', 1_000_000, 1_000_000), 0.0)
+
+    def test_stats_grouped_by_model_and_report_type(self):
+        metrics = LLMMetrics(self.path)
+        for latency in (1.5, 3.0, 400.0):
+            metrics.record('gpt-4o-mini', 'github', 1000, 200, latency, ttft_s=0.5)
+        metrics.record('gpt-4o-mini', 'chunk_summary', 500, 100, 2.0)
+
+        stats = metrics.stats()
+        self.assertEqual(sorted(stats), ['gpt-4o-mini/chunk_summary', 'gpt-4o-mini/github'])
+        github = stats['gpt-4o-mini/github']
+        self.assertEqual(github['calls'], 3)
+        self.assertEqual(github['completion_tokens'], 600)
+        self.assertAlmostEqual(github['cost_usd'], 3 * call_cost('gpt-4o-mini', 1000, 200))
+        self.assertEqual(github['p50_latency_s'], 3.0)
+        self.assertEqual(github['avg_ttft_s'], 0.5)
+        self.assertEqual(github['latency_histogram']['le_2'], 1)
+        self.assertEqual(github['latency_histogram']['le_5'], 1)
+        self.assertEqual(github['latency_histogram']['+Inf'], 1)
+        self.assertEqual(stats['gpt-4o-mini/chunk_summary']['avg_tokens_per_s'], 50.0)
+
+    def test_window_restored_and_file_compacted(self):
+        """
+        测试重启后从指标文件恢复滚动窗口，文件中超出窗口的旧记录在加载时被清理。
+        """
+        metrics = LLMMetrics(self.path, window=2)
+        for index in range(6):
+            metrics.record('llama3.1', 'github', 100, 10 + index, 1.0)
+
+        restored = LLMMetrics(self.path, window=2)
+        self.assertEqual(restored.stats()['llama3.1/github']['completion_tokens'], 14 + 15)
+        with open(self.path, encoding='utf-8') as file:
+            entries = [json.loads(line) for line in file]
+        self.assertEqual([entry['completion_tokens'] for entry in entries], [14, 15])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import hashlib
+import sys
+import os
+import unittest
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from near_duplicates import SimHashIndex, collapse_items, collapse_markdown, hamming_distance, simhash  # 导入要测试的模块
+
+PROGRESS = """# Progress for langchain-ai/langchain (2024-08-20 to 2024-08-21)
+
+
+## Issues Closed in the Last 1 Days
+- Bump lodash from 4.17.20 to 4.17.21 #10
+- docs: update examples in api ref #11
+- core: add streaming support to runnables #12
+- Bump lodash from 4.17.21 to 4.17.22 #13
+- docs: update examples in api ref #14
+- Release v0.2.1 #15
+- Release v0.2.2 #16
+"""
+
+
+class TestNearDuplicates(unittest.TestCase):
+    def test_simhash_ignores_versions(self):
+        self.assertEqual(simhash('Release v0.2.1'), simhash('Release 0.3.0'))
+        self.assertEqual(simhash('Bump lodash from 4.17.20 to 4.17.21'), simhash('bump lodash from 4.17.21 to 4.17.22'))
+        self.assertGreater(hamming_distance(simhash('fix typo in README'), simhash('add streaming support')), 6)
+
+    def test_collapse_items_keeps_first_occurrence_order(self):
+        groups = collapse_items([('Release v1', '#1'), ('fix crash', '#2'), ('Release v2', '#3')])
+        self.assertEqual(groups, [('Release v1', ['#1', '#3']), ('fix crash', ['#2'])])
+
+    def test_collapse_markdown(self):
+        collapsed = collapse_markdown(PROGRESS)
+        self.assertEqual(collapsed.split('\n')[:4], PROGRESS.split('\n')[:4])
+        self.assertIn('- Bump lodash from 4.17.20 to 4.17.21 (共 2 条：#10, #13)', collapsed)
+        self.assertIn('- docs: update examples in api ref (共 2 条：#11, #14)', collapsed)
+        self.assertIn('- core: add streaming support to runnables #12', collapsed)
+        self.assertIn('- Release v0.2.1 (共 2 条：#15, #16)', collapsed)
+        self.assertEqual(collapse_markdown(collapsed), collapsed)
+
+    def test_near_miss_titles_do_not_collapse(self):
+        """
+        测试只差一个关键词的标题不会被合并：短标题只合并规范化后完全相同的，长标题使用较严格的默认阈值。
+        """
+        items = [('Fix typo in README', '#1'), ('Fix typo in docs', '#2'),
+                 ('Fix crash on Windows', '#3'), ('Fix crash on macOS', '#4'),
+                 ('Update dependency requests to 2.32.0', '#5'), ('Update dependency urllib3 to 2.2.1', '#6'),
+                 ('build(deps): bump requests from 2.31.0 to 2.32.0 in /docs', '#7'),
+                 ('build(deps): bump requests from 2.31.0 to 2.32.3 in /libs', '#8'),
+                 ('Fix typo in README', '#9')]
+        groups = collapse_items(items)
+        self.assertEqual([references for _, references in groups],
+                         [['#1', '#9'], ['#2'], ['#3'], ['#4'], ['#5'], ['#6'], ['#7'], ['#8']])
+
+    def test_index_checks_every_group_in_bucket(self):
+        """
+        测试同一个桶中有很多分组时仍能找到最早的近似重复分组，结果不取决于之后加入了多少其他分组。
+        """
+        index = SimHashIndex(threshold=3)
+        self.assertEqual(index.add(0), 0)
+        # 第一段都为 0，高 48 位随机，彼此之间的距离都大于 3
+        fingerprints = [int.from_bytes(hashlib.sha256(str(number).encode()).digest()[:6], 'big') << 16
+                        for number in range(20)]
+        for group, fingerprint in enumerate(fingerprints, 1):
+            self.assertEqual(index.add(fingerprint), group)
+        self.assertEqual(index.add(0b1), 0)
+        self.assertEqual(index.add(fingerprints[2] | 0b11), 3)  # 取距离最近的分组
+
+    def test_many_items_collapse(self):
+        """
+        测试大量近似重复条目合并为一组，不同的条目各自成组。
+        """
+        items = [(f'chore(release): publish v1.{index}.0', f'#{index}') for index in range(2000)]
+        items += [(f'feature number {word}', f'#{2000 + index}') for index, word in enumerate(['alpha', 'beta'])]
+        groups = collapse_items(items)
+        self.assertEqual(len(groups), 3)
+        self.assertEqual(len(groups[0][1]), 2000)
+
+        index = SimHashIndex(threshold=3)
+        self.assertEqual(len(index._bands), 4)
+        self.assertEqual(index.add(0), 0)
+        self.assertEqual(index.add(0b111), 0)  # 汉明距离 3
+        self.assertEqual(index.add(0b1111), 1)  # 汉明距离 4
+
+
+if __name__ == '__main__':
+    unittest.main()
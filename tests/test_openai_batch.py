@@ -0,0 +1,103 @@
+import sys
+import os
+import json
+import time
+import unittest
+from unittest.mock import patch
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from config import Config
+from fake_openai_server import FakeOpenAIServer  # 导入本地 Batch API 替身服务器
+from http_transport import HTTPTransport
+from llm import LLM
+from llm_cache import LLMCache
+from llm_metrics import LLMMetrics
+from openai_batch import OpenAIBatchClient  # 导入要测试的 Batch API 客户端
+
+
+def messages(content):
+    return [{'role': 'system', 'content': 'prompt'}, {'role': 'user', 'content': content}]
+
+
+class TestOpenAIBatch(unittest.TestCase):
+    def start_server(self, **kwargs):
+        server = FakeOpenAIServer(**kwargs).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def make_client(self, server, **kwargs):
+        transport = HTTPTransport(max_retries=0)
+        self.addCleanup(transport.close)
+        return OpenAIBatchClient(server.url, api_key='test-key', transport=transport, poll_interval=0.05, **kwargs)
+
+    def test_run_batch(self):
+        """
+        测试上传请求文件、轮询到任务完成后按 custom_id 返回结果，失败的请求不包含在结果中。
+        """
+        server = self.start_server(processing_time=0.2, fail_ids={'broken'})
+        client = self.make_client(server)
+
+        results = client.run('gpt-4o-mini', {'a': messages('# Progress for a/a'), 'b': messages('# Progress for b/b'),
+                                             'broken': messages('# Progress for c/c')})
+        self.assertEqual(sorted(results), ['a', 'b'])
+        self.assertEqual(results['a'][0], '# 批量报告\n\n# Progress for a/a')
+        self.assertGreater(results['a'][1]['prompt_tokens'], 0)
+        stats = server.stats()
+        self.assertEqual((stats['uploads'], stats['batches']), (1, 1))
+        self.assertGreater(stats['polls'], 1)
+
+    def test_poll_does_not_block(self):
+        """
+        测试 submit 提交后立即返回，poll 在任务完成前返回 None，完成后返回结果。
+        """
+        server = self.start_server(processing_time=0.2)
+        client = self.make_client(server)
+        batch_id = client.submit('gpt-4o-mini', {'a': messages('# Progress for a/a')})
+        self.assertIsNone(client.poll(batch_id))
+        time.sleep(0.3)
+        self.assertEqual(client.poll(batch_id)['a'][0], '# 批量报告\n\n# Progress for a/a')
+
+    def test_timeout_cancels_batch(self):
+        server = self.start_server(processing_time=60)
+        client = self.make_client(server, timeout=0.2)
+        with self.assertRaises(RuntimeError):
+            client.run('gpt-4o-mini', {'a': messages('# Progress for a/a')})
+        self.assertEqual(next(iter(server.batches.values()))['status'], 'cancelled')
+
+    @patch('llm.OpenAI')
+    def test_llm_submit_and_collect_batch(self, mock_openai):
+        """
+        测试 LLM 批量生成：已缓存的请求不再提交，结果写入缓存并按 Batch API 折扣记录费用。
+        """
+        server = self.start_server(processing_time=0.1)
+        config = Config()
+        config.llm_model_type = 'openai'
+        config.openai_model_name = 'gpt-4o-mini'
+        config.openai_api_url = server.url
+        config.llm_batch_poll_interval = 0.05
+        llm = LLM(config, HTTPTransport(max_retries=0), LLMCache(), LLMMetrics())
+        self.addCleanup(llm.transport.close)
+        llm.batch_client.api_key = 'test-key'
+
+        requests = {'0': ('prompt', '# Progress for a/a', 'github'), '1': ('prompt', '# Progress for b/b', 'github')}
+        job = json.loads(json.dumps(llm.submit_batch(requests)))  # 任务描述可以保存到文件，重启后继续收取
+        self.assertIsNotNone(job['batch_id'])
+        self.assertIsNone(llm.collect_batch(job))  # 提交后立即返回，任务尚未完成
+        reports = None
+        while reports is None:
+            time.sleep(0.05)
+            reports = llm.collect_batch(job)
+        self.assertEqual(reports['1'], '# 批量报告\n\n# Progress for b/b')
+        self.assertEqual(llm.metrics.stats()['gpt-4o-mini/github']['calls'], 2)
+
+        again = llm.submit_batch(requests)
+        self.assertIsNone(again['batch_id'])  # 全部命中缓存，不再提交
+        self.assertEqual(llm.collect_batch(again), reports)
+        self.assertEqual(server.stats()['batches'], 1)
+        mock_openai().chat.completions.create.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
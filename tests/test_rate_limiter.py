@@ -0,0 +1,91 @@
+import sys
+import os
+import unittest
+from unittest.mock import MagicMock
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rate_limiter import RateLimitScheduler  # 导入要测试的 RateLimitScheduler 类
+
+def make_response(status_code=200, headers=None, text=''):
+    # 构造带有指定状态码和响应头的模拟响应
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.text = text
+    return response
+
+class TestRateLimitScheduler(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，使用可控的时钟和等待函数初始化调度器。
+        """
+        self.now = 1000.0
+        self.sleeps = []
+
+        def fake_sleep(seconds):
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+        self.scheduler = RateLimitScheduler(['token-a', 'token-b'], reserve=0,
+                                            clock=lambda: self.now, sleep=fake_sleep)
+
+    def test_prefers_token_with_most_remaining(self):
+        """
+        测试优先选择剩余配额最多的令牌。
+        """
+        self.scheduler.update('token-a', make_response(headers={'X-RateLimit-Remaining': '10', 'X-RateLimit-Reset': '5000'}))
+        self.scheduler.update('token-b', make_response(headers={'X-RateLimit-Remaining': '500', 'X-RateLimit-Reset': '5000'}))
+        self.assertEqual(self.scheduler.acquire(), 'token-b')
+
+    def test_waits_until_reset_when_all_tokens_exhausted(self):
+        """
+        测试所有令牌配额耗尽时等待到最早的重置时间。
+        """
+        self.scheduler.update('token-a', make_response(headers={'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '1300'}))
+        self.scheduler.update('token-b', make_response(headers={'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '1100'}))
+
+        token = self.scheduler.acquire()
+        self.assertEqual(token, 'token-b')  # token-b 先重置
+        self.assertEqual(self.sleeps, [100.0])
+
+    def test_retry_after_blocks_token(self):
+        """
+        测试 Retry-After 响应头会暂停对应令牌，并返回需要重试。
+        """
+        limited = self.scheduler.update('token-a', make_response(429, headers={'Retry-After': '30'}))
+        self.assertTrue(limited)
+        self.assertEqual(self.scheduler.reserve(), ('token-b', 0.0))  # 被暂停的令牌不会被选择
+
+    def test_retry_after_http_date(self):
+        """
+        测试 HTTP 日期格式的 Retry-After 按当前时间换算为等待秒数，无法解析的值被忽略。
+        """
+        self.now = 784111717.0  # Sun, 06 Nov 1994 08:48:37 GMT
+        limited = self.scheduler.update('token-a', make_response(429, headers={'Retry-After': 'Sun, 06 Nov 1994 08:49:37 GMT'}))
+        self.assertTrue(limited)
+        self.assertFalse(self.scheduler.update('token-b', make_response(429, headers={'Retry-After': 'soon'})))
+        self.scheduler.update('token-b', make_response(429, headers={'Retry-After': '120'}))
+        self.assertEqual(self.scheduler.reserve(), ('token-a', 60.0))  # 按 Retry-After 日期等待 60 秒
+
+    def test_secondary_limit_exponential_backoff(self):
+        """
+        测试未给出等待时间的二级速率限制按指数退避。
+        """
+        response = make_response(403, text='You have exceeded a secondary rate limit.')
+        scheduler = RateLimitScheduler(['token-a'], clock=lambda: self.now, sleep=lambda s: None)
+        self.assertTrue(scheduler.update('token-a', response))
+        self.assertEqual(scheduler.reserve(), ('token-a', 60.0))
+        self.assertTrue(scheduler.update('token-a', response))
+        self.assertEqual(scheduler.reserve(), ('token-a', 120.0))
+
+    def test_forbidden_without_limit_is_not_retried(self):
+        """
+        测试普通的 403（如权限不足）不会被视为速率限制。
+        """
+        response = make_response(403, headers={'X-RateLimit-Remaining': '4000'}, text='Resource not accessible')
+        self.assertFalse(self.scheduler.update('token-a', response))
+
+if __name__ == '__main__':
+    unittest.main()
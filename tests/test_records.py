@@ -0,0 +1,75 @@
+import sys
+import os
+import unittest
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from records import CommitRecord, IssueRecord, PullRequestRecord, project, to_dict  # 导入要测试的精简记录
+
+class TestRecords(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，准备 API 返回的完整数据。
+        """
+        self.issue = {
+            'url': 'https://api.github.com/repos/owner/repo/issues/1', 'number': 1, 'title': 'Fix bug',
+            'state': 'closed', 'user': {'login': 'octocat', 'id': 1, 'avatar_url': 'https://avatars.example/1'},
+            'labels': [{'name': 'bug'}], 'reactions': {'total_count': 0},
+            'closed_at': '2024-08-21T08:00:00Z', 'updated_at': '2024-08-21T09:00:00Z',
+        }
+        self.commit = {
+            'sha': 'abc123', 'url': 'https://api.github.com/repos/owner/repo/commits/abc123',
+            'commit': {'message': 'Initial commit', 'author': {'name': 'Octo Cat', 'date': '2024-08-20T08:00:00Z'},
+                       'committer': {'name': 'GitHub', 'date': '2024-08-20T09:00:00Z'}},
+        }
+
+    def test_project_issue(self):
+        """
+        测试 Issue 投影后只保留需要的字段，并支持字典形式的访问。
+        """
+        record = project('issues', self.issue)
+        self.assertIsInstance(record, IssueRecord)
+        self.assertEqual(record['title'], 'Fix bug')
+        self.assertEqual(record['number'], 1)
+        self.assertEqual(record.get('updated_at'), '2024-08-21T09:00:00Z')
+        self.assertEqual(record['user'], {'login': 'octocat'})
+        self.assertIsNone(record.get('labels'))  # 丢弃的字段不可访问
+        self.assertFalse(hasattr(record, '__dict__'))  # 使用 __slots__，没有实例字典
+
+    def test_project_pull_request(self):
+        """
+        测试 Pull Request 投影为 PullRequestRecord，并可访问继承自 IssueRecord 的字段。
+        """
+        record = project('pull_requests', self.issue)
+        self.assertIsInstance(record, PullRequestRecord)
+        self.assertEqual(record['title'], 'Fix bug')
+        self.assertEqual(record['number'], 1)
+        self.assertEqual(record.get('state'), 'closed')
+        self.assertEqual(record, project('pull_requests', self.issue))
+        self.assertNotEqual(record, project('pull_requests', dict(self.issue, number=2, title='Other')))
+        self.assertEqual(repr(record), "PullRequestRecord(number=1, title='Fix bug', state='closed', "
+                                       "author='octocat', closed_at='2024-08-21T08:00:00Z', "
+                                       "updated_at='2024-08-21T09:00:00Z')")
+
+    def test_project_commit(self):
+        """
+        测试 Commit 投影后仍可按 API 的嵌套结构访问提交信息。
+        """
+        record = project('commits', self.commit)
+        self.assertIsInstance(record, CommitRecord)
+        self.assertEqual(record['sha'], 'abc123')
+        self.assertEqual(record['commit']['message'], 'Initial commit')
+        self.assertEqual(record['commit']['committer']['date'], '2024-08-20T09:00:00Z')
+
+    def test_to_dict_round_trip(self):
+        """
+        测试精简记录转换为字典后再次投影得到相同的记录。
+        """
+        for resource, item in (('issues', self.issue), ('commits', self.commit)):
+            record = project(resource, item)
+            self.assertEqual(project(resource, to_dict(record)), record)
+        self.assertIs(to_dict(self.issue), self.issue)  # 普通字典原样返回
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,14 @@
 import sys
 import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
 # 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-from report_generator import ReportGenerator  # 导入要测试的 ReportGenerator 类
+from report_generator import ReportGenerator, normalize_content  # 导入要测试的 ReportGenerator 类
 
 class TestReportGenerator(unittest.TestCase):
     def setUp(self):
@@ -105,7 +107,8 @@ class TestReportGenerator(unittest.TestCase):
             self.assertEqual(content, mock_report)
 
         # 验证 LLM 的 generate_report 方法是否被正确调用，且传入了正确的参数
-        self.mock_llm.generate_report.assert_called_once_with(self.mock_prompts["github"], self.markdown_content)
+        self.mock_llm.generate_report.assert_called_once_with(self.mock_prompts["github"], self.markdown_content,
+                                                              report_type="github")
 
     @patch.object(ReportGenerator, '_preload_prompts', return_value=None)
     def test_generate_hn_topic_report(self, mock_preload_prompts):
@@ -133,7 +136,8 @@ class TestReportGenerator(unittest.TestCase):
             self.assertEqual(content, mock_report)
 
         # 验证 LLM 的 generate_report 方法是否被正确调用，且传入了正确的参数
-        self.mock_llm.generate_report.assert_called_once_with(self.mock_prompts["hacker_news_hours_topic"], self.markdown_content)
+        self.mock_llm.generate_report.assert_called_once_with(self.mock_prompts["hacker_news_hours_topic"], self.markdown_content,
+                                                              report_type="hacker_news_hours_topic")
 
     @patch.object(ReportGenerator, '_preload_prompts', return_value=None)
     def test_generate_hn_daily_report(self, mock_preload_prompts):
@@ -162,7 +166,141 @@ class TestReportGenerator(unittest.TestCase):
 
         # 验证 LLM 的 generate_report 方法是否被正确调用，且传入了正确的参数
         aggregated_content = self.report_generator._aggregate_topic_reports(self.test_hn_daily_dir_path)
-        self.mock_llm.generate_report.assert_called_once_with(self.mock_prompts["hacker_news_daily_report"], aggregated_content)
+        self.mock_llm.generate_report.assert_called_once_with(self.mock_prompts["hacker_news_daily_report"], aggregated_content,
+                                                              report_type="hacker_news_daily_report")
+    @patch.object(ReportGenerator, '_preload_prompts', return_value=None)
+    def test_unchanged_input_skips_llm(self, mock_preload_prompts):
+        """
+        测试输入、提示和模型均未变化时复用已有报告，不再调用 LLM；输入变化后重新生成。
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        cache_path = os.path.join(cache_dir, 'index.json')
+        self.report_generator = ReportGenerator(self.mock_llm, ["github"], cache_path)
+        self.report_generator.prompts = self.mock_prompts
+        self.mock_llm.generate_report.return_value = "This is a generated report."
+
+        self.report_generator.generate_github_report(self.test_markdown_file_path)
+        # 第二天导出的文件只有标题中的日期和空白不同
+        next_day_path = 'test_daily_progress_next.md'
+        self.addCleanup(lambda: [os.remove(path) for path in (next_day_path, 'test_daily_progress_next_report.md')
+                                 if os.path.exists(path)])
+        with open(next_day_path, 'w') as file:
+            file.write(self.markdown_content.replace('2024-08-24', '2024-08-25') + '\n\n')
+
+        # 重新创建实例，验证哈希索引已持久化
+        report_generator = ReportGenerator(self.mock_llm, ["github"], cache_path)
+        report_generator.prompts = self.mock_prompts
+        report, report_file_path = report_generator.generate_github_report(next_day_path)
+        self.assertEqual(report, "This is a generated report.")
+        with open(report_file_path, 'r') as file:
+            self.assertEqual(file.read(), report)
+        self.assertEqual(self.mock_llm.generate_report.call_count, 1)
+        self.assertEqual(report_generator.stats(), {'generated': 0, 'skipped': 1})
+
+        # 换用其他提示后需要重新生成
+        report_generator.prompts = dict(self.mock_prompts, github="Another prompt")
+        report_generator.generate_github_report(next_day_path)
+        self.assertEqual(self.mock_llm.generate_report.call_count, 2)
+        self.assertEqual(report_generator.stats(), {'generated': 1, 'skipped': 1})
+
+    @patch.object(ReportGenerator, '_preload_prompts', return_value=None)
+    def test_reused_report_carries_new_date(self, mock_preload_prompts):
+        """
+        测试复用的报告中的日期更新为本次输入的日期；报告中有无法对应的日期时重新生成。
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        report_generator = ReportGenerator(self.mock_llm, ["github"], os.path.join(cache_dir, 'index.json'))
+        report_generator.prompts = self.mock_prompts
+        self.mock_llm.generate_report.return_value = "# openai-quickstart 项目进展 (2024-08-24)\n\n无新动态。"
+        report_generator.generate_github_report(self.test_markdown_file_path)
+
+        next_day_path = 'test_daily_progress_next.md'
+        self.addCleanup(lambda: [os.remove(path) for path in (next_day_path, 'test_daily_progress_next_report.md')
+                                 if os.path.exists(path)])
+        with open(next_day_path, 'w') as file:
+            file.write(self.markdown_content.replace('2024-08-24', '2024-08-25'))
+        report, report_file_path = report_generator.generate_github_report(next_day_path)
+        self.assertEqual(report, "# openai-quickstart 项目进展 (2024-08-25)\n\n无新动态。")
+        with open(report_file_path, 'r') as file:
+            self.assertEqual(file.read(), report)
+        self.assertEqual(report_generator.stats(), {'generated': 1, 'skipped': 1})
+
+        # 报告中引用了标题以外的日期，无法确定如何更新，需要重新生成
+        report_generator.prompts = dict(self.mock_prompts, github="Another prompt")
+        self.mock_llm.generate_report.return_value = "# 项目进展 (2024-08-25)\n\n2024-08-20 发布了新版本。"
+        report_generator.generate_github_report(next_day_path)
+        with open(next_day_path, 'w') as file:
+            file.write(self.markdown_content.replace('2024-08-24', '2024-08-26'))
+        report, _ = report_generator.generate_github_report(next_day_path)
+        self.assertEqual(report, "# 项目进展 (2024-08-25)\n\n2024-08-20 发布了新版本。")
+        self.assertEqual(self.mock_llm.generate_report.call_count, 3)
+
+    @patch.object(ReportGenerator, '_preload_prompts', return_value=None)
+    def test_stream_github_report(self, mock_preload_prompts):
+        """
+        测试流式生成时每收到一段输出就写入报告文件，并返回当前已生成的内容。
+        """
+        self.report_generator = ReportGenerator(self.mock_llm, ["github"])
+        self.report_generator.prompts = self.mock_prompts
+        self.mock_llm.stream_report.return_value = iter(["# Report", "\n- Fix bug #123"])
+
+        written = []
+        for report, report_file_path in self.report_generator.stream_github_report(self.test_markdown_file_path):
+            with open(report_file_path, 'r') as file:
+                written.append(file.read())
+            self.assertEqual(written[-1], report)
+        self.assertEqual(written, ["# Report", "# Report\n- Fix bug #123"])
+        self.mock_llm.stream_report.assert_called_once_with(self.mock_prompts["github"], self.markdown_content,
+                                                            report_type="github")
+        self.assertEqual(self.report_generator.stats(), {'generated': 1, 'skipped': 0})
+
+    @patch.object(ReportGenerator, '_preload_prompts', return_value=None)
+    def test_github_reports_batch(self, mock_preload_prompts):
+        """
+        测试批量生成时所有项目一次提交给 LLM，任务完成后结果分别写入各自的报告文件，失败的项目不包含在结果中。
+        """
+        self.report_generator = ReportGenerator(self.mock_llm, ["github"])
+        self.report_generator.prompts = self.mock_prompts
+        self.mock_llm.submit_batch.return_value = {'batch_id': 'batch-1'}
+        self.mock_llm.collect_batch.side_effect = [None, {'0': "Batch report"}]
+        failed_report_path = os.path.splitext(self.test_hn_topic_file_path)[0] + "_report.md"
+
+        job = self.report_generator.submit_github_reports_batch([self.test_markdown_file_path,
+                                                                 self.test_hn_topic_file_path])
+        requests = self.mock_llm.submit_batch.call_args.args[0]
+        self.assertEqual(requests['0'], (self.mock_prompts["github"], self.markdown_content, "github"))
+        self.assertEqual(len(requests), 2)
+        self.assertIsNone(self.report_generator.collect_github_reports_batch(job))  # 任务尚未完成
+        results = self.report_generator.collect_github_reports_batch(job)
+        self.mock_llm.collect_batch.assert_called_with({'batch_id': 'batch-1'})
+        report, report_file_path = results[self.test_markdown_file_path]
+        self.assertEqual(report, "Batch report")
+        with open(report_file_path, 'r') as file:
+            self.assertEqual(file.read(), "Batch report")
+        self.assertNotIn(self.test_hn_topic_file_path, results)
+        self.assertFalse(os.path.exists(failed_report_path))
+        self.assertEqual(self.report_generator.stats(), {'generated': 1, 'skipped': 0})
+
+    @patch.object(ReportGenerator, '_preload_prompts', return_value=None)
+    def test_github_report_collapses_near_duplicates(self, mock_preload_prompts):
+        with open(self.test_markdown_file_path, 'a') as file:
+            file.write("- Fix bug #124\n- Bump version to 1.0.1 #125\n")
+        self.report_generator = ReportGenerator(self.mock_llm, ["github"], dedup_threshold=3)
+        self.report_generator.prompts = self.mock_prompts
+        self.mock_llm.generate_report.return_value = "This is a generated report."
+
+        self.report_generator.generate_github_report(self.test_markdown_file_path)
+        user_content = self.mock_llm.generate_report.call_args.args[1]
+        self.assertIn("- Fix bug (共 2 条：#123, #124)", user_content)
+        self.assertIn("- Bump version to 1.0.1 #125", user_content)
+
+    def test_normalize_content(self):
+        self.assertEqual(normalize_content("# Progress (2024-08-24 14:00)  \r\n\n\n- Fix bug\n"),
+                         normalize_content("# Progress (2024-08-25 18:00)\n\n- Fix bug"))
+        self.assertNotEqual(normalize_content("# Progress\n- Fixed on 2024-08-24"),
+                            normalize_content("# Progress\n- Fixed on 2024-08-25"))
 
 if __name__ == '__main__':
     unittest.main()
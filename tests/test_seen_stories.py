@@ -0,0 +1,59 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from seen_stories import SeenStoryIndex, normalize_url, story_key  # 导入要测试的索引
+
+
+class TestSeenStoryIndex(unittest.TestCase):
+    def setUp(self):
+        self.clock = [1000.0]
+        self.state_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.state_dir, 'seen.json')
+        self.index = SeenStoryIndex(self.path, window_hours=24, clock=lambda: self.clock[0])
+        self.stories = [{'id': 1, 'title': 'Story 1', 'link': 'https://example.com/1'},
+                        {'id': 2, 'title': 'Story 2', 'link': 'https://example.com/2'}]
+
+    def tearDown(self):
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def test_normalize_url(self):
+        self.assertEqual(normalize_url('HTTPS://www.Example.com/post/?utm_source=hn&b=2&a=1#comments'),
+                         'https://example.com/post?a=1&b=2')
+        self.assertEqual(story_key({'title': 'A', 'link': 'https://www.example.com/a/'}), 'url:https://example.com/a')
+        self.assertEqual(story_key({'id': 42, 'link': 'https://example.com/a'}), 'id:42')
+
+    def test_partition_returns_only_new_stories(self):
+        """
+        测试已标记的新闻在下一次快照中归为持续热门，新出现的新闻保持原有顺序。
+        """
+        self.assertEqual(self.index.partition(self.stories), (self.stories, []))
+        self.index.mark(self.stories)
+
+        self.clock[0] += 4 * 3600
+        snapshot = [{'id': 3, 'title': 'Story 3', 'link': 'https://example.com/3'}] + self.stories
+        new_stories, trending_stories = self.index.partition(snapshot)
+        self.assertEqual([story['id'] for story in new_stories], [3])
+        self.assertEqual([story['id'] for story in trending_stories], [1, 2])
+
+    def test_eviction_and_persistence(self):
+        """
+        测试索引写入文件后可以重新加载，超过时间窗口未再出现的新闻会被淘汰。
+        """
+        self.index.mark(self.stories[:1])
+        self.clock[0] += 12 * 3600
+        self.index.mark(self.stories[1:])
+
+        reloaded = SeenStoryIndex(self.path, window_hours=24, clock=lambda: self.clock[0])
+        self.assertEqual(len(reloaded), 2)
+        self.clock[0] += 13 * 3600  # Story 1 已超过 24 小时未出现
+        new_stories, _ = reloaded.partition(self.stories)
+        self.assertEqual([story['id'] for story in new_stories], [1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import sys
+import os
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from summarizer import MapReduceSummarizer, context_tokens, estimate_tokens, split_chunks  # 导入要测试的摘要模块
+
+
+def make_progress(issue_count):
+    issues = '\n'.join(f'- Fix parser bug number {number} in the tokenizer module #{number}'
+                       for number in range(issue_count))
+    return f"# Progress for octocat/hello-world (2024-08-24)\n\n## Issues Closed\n{issues}\n\n## Pull Requests\n- 增加中文文档 #1"
+
+
+class TestSummarizer(unittest.TestCase):
+    def test_context_tokens(self):
+        self.assertEqual(context_tokens('gpt-4o-mini'), 128000)
+        self.assertEqual(context_tokens('llama3.1:latest'), 8192)
+        self.assertEqual(context_tokens('unknown-model'), 8192)
+
+    def test_split_chunks_keeps_headers_and_lines(self):
+        content = make_progress(200)
+        chunks = split_chunks(content, 300)
+        self.assertGreater(len(chunks), 5)
+        for chunk in chunks:
+            self.assertLessEqual(estimate_tokens(chunk), 300)
+            self.assertTrue(chunk.startswith('# Progress for octocat/hello-world'))
+            self.assertIn('\n## ', chunk)
+        items = [line for chunk in chunks for line in chunk.split('\n') if line.startswith('- ')]
+        self.assertEqual(len(items), 201)
+        self.assertTrue(chunks[-1].endswith('## Pull Requests\n- 增加中文文档 #1'))
+
+    def test_fit_returns_small_input_unchanged(self):
+        llm = MagicMock()
+        summarizer = MapReduceSummarizer(llm, 'map prompt', context=8192)
+        content = make_progress(5)
+        self.assertEqual(summarizer.fit('report prompt', content), content)
+        llm.generate_report.assert_not_called()
+
+    def test_fit_maps_chunks_with_bounded_concurrency(self):
+        """
+        测试超出预算的输入被分块并发提取要点，并发数不超过 max_workers，合并结果在预算内。
+        """
+        lock = threading.Lock()
+        state = {'active': 0, 'max_active': 0}
+
+        def summarize(system_prompt, chunk, report_type=None):
+            with lock:
+                state['active'] += 1
+                state['max_active'] = max(state['max_active'], state['active'])
+            time.sleep(0.01)
+            with lock:
+                state['active'] -= 1
+            return f"- summary of {chunk.count(chr(10))} lines"
+
+        llm = MagicMock()
+        llm.generate_report.side_effect = summarize
+        summarizer = MapReduceSummarizer(llm, 'map prompt', max_workers=2, context=2600)
+        result = summarizer.fit('report prompt', make_progress(400))
+
+        self.assertGreater(llm.generate_report.call_count, 2)
+        self.assertLessEqual(state['max_active'], 2)
+        self.assertTrue(result.startswith('# Progress for octocat/hello-world'))
+        self.assertLessEqual(estimate_tokens(result), summarizer.budget('report prompt'))
+        self.assertTrue(all(call.args[0] == 'map prompt' and call.kwargs['report_type'] == 'chunk_summary'
+                            for call in llm.generate_report.call_args_list))
+
+
+if __name__ == '__main__':
+    unittest.main()
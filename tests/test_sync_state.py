@@ -0,0 +1,78 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+# 添加 src 目录到模块搜索路径，以便可以导入 src 目录中的模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from sync_state import SyncStateStore  # 导入要测试的 SyncStateStore 类
+
+def days_ago(days, hour=0):
+    # 返回若干天前的 ISO 时间字符串（GitHub 格式）
+    moment = datetime.now(timezone.utc).replace(hour=hour, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+class TestSyncStateStore(unittest.TestCase):
+    def setUp(self):
+        """
+        在每个测试方法之前运行，创建临时状态目录。
+        """
+        self.state_dir = tempfile.mkdtemp()
+        self.store = SyncStateStore(self.state_dir, retention_days=30)
+        self.repo = "DjangoPeng/openai-quickstart"
+
+    def tearDown(self):
+        """
+        在每个测试方法之后运行，删除临时状态目录。
+        """
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def test_fetch_since_without_state_returns_window_start(self):
+        """
+        测试没有本地数据时需要获取完整时间窗口。
+        """
+        self.assertEqual(self.store.fetch_since(self.repo, 'issues', days_ago(7)), days_ago(7))
+
+    def test_fetch_since_returns_high_water_mark(self):
+        """
+        测试本地数据覆盖时间窗口时只需从高水位开始获取。
+        """
+        self.store.merge(self.repo, 'issues', [{'number': 1, 'updated_at': days_ago(1, hour=8)}], days_ago(7))
+        self.assertEqual(self.store.fetch_since(self.repo, 'issues', days_ago(7)), days_ago(1, hour=8))
+        # 请求更大的时间窗口时，本地数据不完整，需要重新获取完整窗口
+        self.assertEqual(self.store.fetch_since(self.repo, 'issues', days_ago(14)), days_ago(14))
+
+    def test_merge_deduplicates_and_keeps_latest_version(self):
+        """
+        测试合并时按编号去重，并保留最新版本的数据。
+        """
+        self.store.merge(self.repo, 'issues', [{'number': 1, 'title': 'Old title', 'updated_at': days_ago(3)}], days_ago(7))
+        self.store.merge(self.repo, 'issues', [{'number': 1, 'title': 'New title', 'updated_at': days_ago(1)},
+                                               {'number': 2, 'title': 'Fix docs', 'updated_at': days_ago(2)}], days_ago(3))
+
+        items = self.store.items_since(self.repo, 'issues', days_ago(7))
+        self.assertEqual([item['number'] for item in items], [1, 2])  # 按更新时间倒序
+        self.assertEqual(items[0]['title'], 'New title')
+
+    def test_items_since_filters_window(self):
+        """
+        测试只返回时间窗口内的数据。
+        """
+        self.store.merge(self.repo, 'issues', [{'number': 1, 'updated_at': days_ago(1)},
+                                               {'number': 2, 'updated_at': days_ago(5)}], days_ago(7))
+        self.assertEqual([item['number'] for item in self.store.items_since(self.repo, 'issues', days_ago(2))], [1])
+
+    def test_prune_removes_expired_items(self):
+        """
+        测试超过保留期限的数据会被删除，且完整覆盖的起始时间相应推后。
+        """
+        self.store.merge(self.repo, 'issues', [{'number': 1, 'updated_at': days_ago(40)},
+                                               {'number': 2, 'updated_at': days_ago(1)}], days_ago(60))
+        self.assertEqual([item['number'] for item in self.store.items_since(self.repo, 'issues', days_ago(60))], [2])
+        self.assertEqual(self.store.fetch_since(self.repo, 'issues', days_ago(45)), days_ago(45))
+
+if __name__ == '__main__':
+    unittest.main()